@@ -1,9 +1,14 @@
-from typing import Annotated
+import math
+from typing import Annotated, Optional
 
-from fastapi import Depends, Header, HTTPException
+from fastapi import Depends, Header, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.crud.user import get_user_by_api_key
+from app.core.api_keys import authenticate_api_key
+from app.core.config import settings
+from app.core.loaders import Loaders
+from app.core.rate_limit import get_rate_limit_backend
+from app.crud.repository import Repository, create_repository
 from app.db.database import async_session
 
 
@@ -15,15 +20,86 @@ async def get_db():
         yield session
 
 
+async def get_repository(db: AsyncSession = Depends(get_db)) -> Repository:
+    """
+    Хранилище данных запроса (см. app.crud.repository): SqlRepository в сессии запроса
+    или MemoryRepository при REPOSITORY_BACKEND=memory.
+    """
+    return create_repository(db)
+
+
 async def get_current_user(
     api_key: Annotated[str, Header(alias="Api-Key")],
-    db: AsyncSession = Depends(get_db),
+    repository: Repository = Depends(get_repository),
 ):
     """
-    Функция возвращающая объект User из БД.
+    Функция возвращающая объект User из БД (без подписчиков и подписок).
+    Результат проверки ключа кэшируется (см. app.core.api_keys).
+    Хранилище запроса ограничивается организацией пользователя: дальше
+    эндпоинты видят только её твиты, пользователей, подписки и медиа.
+    Воркер с ORGANIZATION_ID принимает только пользователей своей организации.
     Если объект не найден - выбрасывается HTTPException с 201 статус кодом.
     """
-    user = await get_user_by_api_key(db=db, api_key=api_key)
-    if not user:
+    user_id = await authenticate_api_key(repository=repository, api_key=api_key)
+    user = await repository.get_user_by_id(user_id) if user_id else None
+    if not user or settings.ORGANIZATION_ID not in (0, user.organization_id):
         raise HTTPException(status_code=401, detail="Invalid API Key")
+    repository.organization_id = user.organization_id
     return user
+
+
+async def get_loaders(repository: Repository = Depends(get_repository)) -> Loaders:
+    """
+    Загрузчики одного запроса (см. app.core.loaders), работают с хранилищем запроса.
+    """
+    return Loaders(repository)
+
+
+class RateLimiter:
+    """
+    Зависимость, ограничивающая частоту запросов по ключу Api-Key + метод + путь эндпоинта.
+    Подключается через dependencies= у роутера или эндпоинта и отрабатывает
+    до get_current_user, то есть до любых обращений к БД.
+    При превышении лимита выбрасывается HTTPException с 429 статус кодом и заголовком Retry-After.
+    """
+
+    def __init__(
+        self,
+        scope: str = "default",
+        capacity: Optional[int] = None,
+        refill_rate: Optional[float] = None,
+    ):
+        self.scope = scope
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+
+    async def __call__(
+        self,
+        request: Request,
+        api_key: Annotated[Optional[str], Header(alias="Api-Key")] = None,
+    ):
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        capacity = self.capacity or settings.RATE_LIMIT_CAPACITY
+        refill_rate = self.refill_rate or settings.RATE_LIMIT_REFILL_RATE
+
+        route = request.scope.get("route")
+        path = getattr(route, "path", request.url.path)
+        client = api_key or (request.client.host if request.client else "anonymous")
+        key = f"{self.scope}:{client}:{request.method}:{path}"
+
+        retry_after = await get_rate_limit_backend().consume(key, capacity, refill_rate)
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+
+rate_limit = RateLimiter()
+likes_rate_limit = RateLimiter(
+    scope="likes",
+    capacity=settings.RATE_LIMIT_LIKES_CAPACITY,
+    refill_rate=settings.RATE_LIMIT_LIKES_REFILL_RATE,
+)
@@ -23,6 +23,7 @@ async def universal_exception_handler(request: Request, exc: Exception):
                 "error_type": f"HTTP_{exc.status_code}",
                 "error_message": exc.detail,
             },
+            headers=getattr(exc, "headers", None),
         )
 
     elif isinstance(exc, ValidationError):
@@ -0,0 +1,140 @@
+import hashlib
+
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.startup import startup_profile
+
+# Запас на границы и заголовки частей multipart-формы сверх размера файла
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Сжатие ответов gzip, если клиент его поддерживает и ответ не меньше minimum_size.
+    Потоки событий (text/event-stream) не сжимаются, пути из excluded_paths
+    (уже сжатые ответы) пропускаются без изменений.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        compresslevel: int = 6,
+        excluded_paths: tuple[str, ...] = (),
+    ):
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.excluded_paths = excluded_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+class CacheHeadersMiddleware:
+    """
+    Заголовки кэширования для ответов API.
+    Ответы зависят от пользователя, поэтому добавляется Vary: Api-Key,
+    а если эндпоинт не задал Cache-Control сам - Cache-Control: private, no-cache
+    (общие кэши ответ не сохраняют, клиент обязан перепроверить его перед использованием).
+    """
+
+    def __init__(self, app: ASGIApp, prefix: str = "/api/"):
+        self.app = app
+        self.prefix = prefix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.add_vary_header("Api-Key")
+                headers.setdefault("Cache-Control", "private, no-cache")
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Ограничивает тело запросов загрузки (paths) размером MEDIA_MAX_UPLOAD_BYTES
+    с запасом MULTIPART_OVERHEAD до разбора multipart-формы.
+    Запрос с большим Content-Length отклоняется с 413 без чтения тела,
+    тело без Content-Length считается по мере чтения и обрывается с 413
+    на превышении, поэтому форма не выгружается целиком во временный файл.
+    """
+
+    def __init__(self, app: ASGIApp, paths: tuple[str, ...]):
+        self.app = app
+        self.paths = paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        limit = settings.MEDIA_MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD
+        content_length = Headers(scope=scope).get("content-length", "")
+        if content_length.isdigit() and int(content_length) > limit:
+            response = JSONResponse(
+                status_code=413,
+                content={
+                    "result": False,
+                    "error_type": "HTTP_413",
+                    "error_message": "File is too large",
+                },
+                headers={"Connection": "close"},
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def receive_limited() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(status_code=413, detail="File is too large")
+            return message
+
+        await self.app(scope, receive_limited, send)
+
+
+class FirstRequestMiddleware:
+    """
+    Отмечает в профиле запуска время, когда воркер ответил на первый HTTP-запрос.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.app(scope, receive, send)
+        if scope["type"] == "http" and startup_profile.first_request is None:
+            startup_profile.mark_first_request()
+
+
+def etag_response(request: Request, content: BaseModel) -> Response:
+    """
+    JSON-ответ с ETag по содержимому.
+    Если клиент прислал совпадающий If-None-Match, возвращается 304 без тела.
+    """
+    body = content.model_dump_json(by_alias=True).encode()
+    etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("If-None-Match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")) or if_none_match == "*":
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,39 @@
+import hmac
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from app.core.config import settings
+from app.core.events import event_bus
+from app.core.single_flight import single_flight_stats
+from app.core.startup import startup_profile
+
+
+async def require_metrics_token(
+    token: Annotated[Optional[str], Header(alias="Metrics-Token")] = None,
+):
+    """
+    Пускает к метрикам только с токеном METRICS_TOKEN.
+    Без настроенного токена метрики недоступны.
+    """
+    if not settings.METRICS_TOKEN or not hmac.compare_digest(
+        token or "", settings.METRICS_TOKEN
+    ):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+metrics_routers = APIRouter(
+    prefix="/api", tags=["metrics"], dependencies=[Depends(require_metrics_token)]
+)
+
+
+@metrics_routers.get("/metrics")
+async def get_metrics():
+    """
+    Получить служебные метрики текущего воркера.
+    """
+    return {
+        "single_flight": single_flight_stats(),
+        "events": {"dropped_subscriptions": event_bus.dropped},
+        "startup": startup_profile.as_dict(),
+    }
@@ -0,0 +1,79 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.dependencies import get_current_user, get_db, rate_limit
+from app.core.pagination import decode_cursor, encode_cursor
+from app.crud.notifications import (
+    count_unread_notifications,
+    get_notifications,
+    mark_notifications_read,
+)
+from app.models import User
+from app.schemas.notification import NotificationSchema, NotificationsResponse
+from app.schemas.responses import ExceptionResponse, SuccessResponse
+
+notification_routers = APIRouter(
+    prefix="/api", tags=["notifications"], dependencies=[Depends(rate_limit)]
+)
+
+
+@notification_routers.get(
+    "/notifications",
+    response_model=NotificationsResponse,
+    responses={
+        200: {"model": NotificationsResponse, "description": "Successful response"},
+        400: {"model": ExceptionResponse, "description": "Invalid cursor"},
+        422: {"model": ExceptionResponse, "description": "Validation error"},
+        401: {"model": ExceptionResponse, "description": "Invalid API Key"},
+    },
+)
+async def get_my_notifications(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Получить уведомления текущего пользователя и количество непрочитанных.
+    """
+    position = decode_cursor(cursor, size=2)
+    try:
+        key = (datetime.fromisoformat(position[0]), int(position[1])) if position else None
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    notifications = await get_notifications(
+        db=db, user_id=user.id, limit=limit, cursor=key
+    )
+    next_cursor = None
+    if len(notifications) == limit:
+        last = notifications[-1]
+        next_cursor = encode_cursor(last.updated_at.isoformat(), last.id)
+    unread_count = await count_unread_notifications(db=db, user_id=user.id)
+    return NotificationsResponse(
+        result=True,
+        notifications=[NotificationSchema.model_validate(item) for item in notifications],
+        unread_count=unread_count,
+        next_cursor=next_cursor,
+    )
+
+
+@notification_routers.post(
+    "/notifications/read",
+    response_model=SuccessResponse,
+    responses={
+        200: {"model": SuccessResponse, "description": "Successful response"},
+        401: {"model": ExceptionResponse, "description": "Invalid API Key"},
+    },
+)
+async def read_notifications(
+    user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+):
+    """
+    Отметить все уведомления текущего пользователя прочитанными.
+    """
+    result = await mark_notifications_read(db=db, user_id=user.id)
+    return SuccessResponse(result=result)
@@ -0,0 +1,74 @@
+from decimal import Decimal
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.dependencies import get_current_user, get_db, rate_limit
+from app.core.pagination import decode_cursor, encode_cursor
+from app.crud.search import search_tweets, search_users
+from app.models import User
+from app.schemas.responses import ExceptionResponse
+from app.schemas.search import SearchResponse
+from app.schemas.tweet import TweetSchema
+from app.schemas.user import UserBaseSchema
+
+search_routers = APIRouter(
+    prefix="/api", tags=["search"], dependencies=[Depends(rate_limit)]
+)
+
+
+@search_routers.get(
+    "/search",
+    response_model=SearchResponse,
+    responses={
+        200: {"model": SearchResponse, "description": "Successful response"},
+        400: {"model": ExceptionResponse, "description": "Invalid cursor"},
+        422: {"model": ExceptionResponse, "description": "Validation error"},
+        401: {"model": ExceptionResponse, "description": "Invalid API Key"},
+    },
+)
+async def search(
+    q: str = Query(min_length=1, max_length=100),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Поиск по тексту твитов и именам пользователей.
+    Пользователи возвращаются только на первой странице.
+    Ищутся только твиты и пользователи организации текущего пользователя.
+    """
+    position = decode_cursor(cursor, size=2)
+    try:
+        key = (Decimal(position[0]), int(position[1])) if position else None
+    except (ArithmeticError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    rows = await search_tweets(
+        db=db,
+        q=q,
+        limit=limit + 1,
+        cursor=key,
+        organization_id=user.organization_id,
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_tweet, last_rank = rows[-1]
+        next_cursor = encode_cursor(last_rank, last_tweet.id)
+
+    users = (
+        []
+        if cursor
+        else await search_users(
+            db=db, q=q, limit=limit, organization_id=user.organization_id
+        )
+    )
+    return SearchResponse(
+        result=True,
+        tweets=[TweetSchema.model_validate(tweet) for tweet, _ in rows],
+        users=[UserBaseSchema.model_validate(item) for item in users],
+        next_cursor=next_cursor,
+    )
@@ -0,0 +1,75 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.dependencies import get_current_user, get_db, get_repository, rate_limit
+from app.core.config import settings
+from app.core.events import Subscription, event_bus
+from app.crud.repository import Repository
+from app.models import User
+from app.schemas.responses import ExceptionResponse
+
+stream_routers = APIRouter(
+    prefix="/api", tags=["stream"], dependencies=[Depends(rate_limit)]
+)
+
+
+async def _event_stream(request: Request, subscription: Subscription):
+    """
+    Генератор Server-Sent Events для одной подписки.
+    """
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(), timeout=settings.EVENTS_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": heartbeat\n\n"
+                continue
+            if event is None:
+                # Клиент не успевал читать события и был отключён
+                yield "event: dropped\ndata: {}\n\n"
+                break
+            yield f"event: {event.type}\ndata: {event.to_json()}\n\n"
+    finally:
+        event_bus.unsubscribe(subscription)
+
+
+@stream_routers.get(
+    "/stream",
+    responses={
+        200: {
+            "content": {"text/event-stream": {}},
+            "description": "Stream of feed events",
+        },
+        401: {"model": ExceptionResponse, "description": "Invalid API Key"},
+    },
+)
+async def stream_feed_events(
+    request: Request,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    repository: Repository = Depends(get_repository),
+):
+    """
+    Поток событий ленты (Server-Sent Events): новые и удалённые твиты,
+    лайки и снятие лайков у твитов авторов, на которых подписан пользователь,
+    и у своих твитов.
+    """
+    _, following = await repository.get_follow_ids(user.id)
+    author_ids = {*following, user.id}
+    # Соединение с БД не должно удерживаться на всё время жизни потока
+    await db.close()
+
+    subscription = event_bus.subscribe(user.id, author_ids)
+    return StreamingResponse(
+        _event_stream(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,26 +1,57 @@
 import os
-from pathlib import Path
+from datetime import datetime
+from typing import Literal, Optional
+from uuid import uuid4
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
 
-from app.api.dependencies import get_current_user, get_db
-from app.crud.like import create_like, delete_like
-from app.crud.media import attach_media_to_tweet, save_media_in_database
-from app.crud.tweet import create_tweet, delete_tweet, get_feed_for_user
+from app.api.dependencies import (
+    get_current_user,
+    get_loaders,
+    get_repository,
+    likes_rate_limit,
+    rate_limit,
+)
+from app.api.middleware import etag_response
+from app.core.config import settings
+from app.core.loaders import Loaders
+from app.core.media_validation import (
+    MediaTooLargeError,
+    MediaValidationBusyError,
+    MediaValidationError,
+    validate_upload,
+)
+from app.core.pagination import decode_cursor, decode_id_cursor, encode_cursor
+from app.core.storage import MediaStorageError, get_media_storage
+from app.core.threads import load_thread
+from app.core.trending import get_trending_snapshot
+from app.crud.repository import Repository
 from app.models import User
 from app.schemas.responses import ExceptionResponse, SuccessResponse
 from app.schemas.tweet import (
+    MediaConfirmRequest,
+    MediaPresignRequest,
     SuccessfullTweetGetResponse,
+    SuccessMediaPresignResponse,
     SuccessMediaUploadResponse,
     SuccessTweetCreateResponse,
+    SuccessTweetResponse,
+    ThreadResponse,
+    ThreadTweetSchema,
+    TrendingHashtagSchema,
+    TrendingResponse,
     TweetCreate,
-    TweetSchema,
+    TweetPageResponse,
 )
 
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Префикс ключей прямых загрузок, ещё не прошедших проверку
+PENDING_MEDIA_PREFIX = "pending"
 
-tweet_routers = APIRouter(prefix="/api", tags=["tweets"])
+tweet_routers = APIRouter(
+    prefix="/api", tags=["tweets"], dependencies=[Depends(rate_limit)]
+)
 
 
 @tweet_routers.post(
@@ -33,6 +64,10 @@ tweet_routers = APIRouter(prefix="/api", tags=["tweets"])
             "description": "Successful response with tweet ID",
         },
         400: {"model": ExceptionResponse, "description": "Bad request data"},
+        404: {
+            "model": ExceptionResponse,
+            "description": "Parent or quoted tweet not found",
+        },
         422: {"model": ExceptionResponse, "description": "Validation error"},
         401: {"model": ExceptionResponse, "description": "Invalid API Key"},
     },
@@ -40,16 +75,31 @@ tweet_routers = APIRouter(prefix="/api", tags=["tweets"])
 async def make_tweet(
     tweet_data: TweetCreate,
     user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    repository: Repository = Depends(get_repository),
 ):
     """
-    Написать новый твит.
+    Написать новый твит, ответ на твит parent_id или цитату твита quote_tweet_id.
+    Цитата без текста не принимается: ретвит делается через /tweets/{id}/retweet.
     """
     payload = {"content": tweet_data.content, "author_id": user.id}
-    new_tweet = await create_tweet(db=db, data=payload)
+    if tweet_data.parent_id is not None:
+        root_id = await repository.get_tweet_root_id(tweet_data.parent_id)
+        if root_id is None:
+            raise HTTPException(status_code=404, detail="Parent tweet not found")
+        payload.update(parent_id=tweet_data.parent_id, root_id=root_id)
+    if tweet_data.quote_tweet_id is not None:
+        if not tweet_data.content.strip():
+            raise HTTPException(status_code=400, detail="Quote text is required")
+        repost_of_id = await repository.get_repost_target_id(
+            tweet_data.quote_tweet_id
+        )
+        if repost_of_id is None:
+            raise HTTPException(status_code=404, detail="Quoted tweet not found")
+        payload["repost_of_id"] = repost_of_id
+    new_tweet = await repository.create_tweet(payload)
     if tweet_data.tweet_media_ids:
-        await attach_media_to_tweet(
-            db=db, media_ids=tweet_data.tweet_media_ids, tweet_id=new_tweet.id
+        await repository.attach_media_to_tweet(
+            media_ids=tweet_data.tweet_media_ids, tweet_id=new_tweet.id
         )
     if new_tweet:
         return SuccessTweetCreateResponse(result=True, tweet_id=new_tweet.id)
@@ -65,18 +115,23 @@ async def make_tweet(
             "description": "Successful upload media",
         },
         400: {"model": ExceptionResponse, "description": "Bad request data"},
+        413: {"model": ExceptionResponse, "description": "File is too large"},
         422: {"model": ExceptionResponse, "description": "Validation error"},
         401: {"model": ExceptionResponse, "description": "Invalid API Key"},
+        503: {"model": ExceptionResponse, "description": "Too many uploads"},
     },
 )
 async def upload_media(
     file: UploadFile = File(...),
     user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    repository: Repository = Depends(get_repository),
 ):
     """
     Эндпоинт для загрузки изображений и прикрепления их к твиту.
     На прямую не используется и вызывается в момент отправки твита, если в форму были добавлены изображения.
+    Формат определяется по содержимому файла, изображение проверяется целиком
+    и сохраняется без метаданных (см. app.core.media_validation).
+    Размер тела ограничивается ещё до разбора формы (см. UploadSizeLimitMiddleware).
     """
     filename = file.filename or "upload"
     file_extension = os.path.splitext(filename)[1].lower()
@@ -87,30 +142,178 @@ async def upload_media(
             detail=f"File format not allowed. Allowed formats: {', '.join(ALLOWED_EXTENSIONS)}",
         )
 
-    filename = os.path.basename(filename)
-    user_dir = Path(f"/app/uploads/{user.name}")
-    user_dir.mkdir(parents=True, exist_ok=True)
-    path = user_dir / filename
+    async def chunks():
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            yield chunk
+
+    try:
+        return await _store_validated_media(chunks(), user, repository)
+    finally:
+        await file.close()
+
+
+async def _store_validated_media(
+    chunks, user: User, repository: Repository
+) -> SuccessMediaUploadResponse:
+    """
+    Проверяет изображение, сохраняет его очищенную копию в хранилище
+    и создаёт запись в таблице media.
+    """
+    try:
+        image, content = await validate_upload(chunks)
+    except MediaTooLargeError as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+    except MediaValidationError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except MediaValidationBusyError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+
+    async def body():
+        yield content
 
-    data = await file.read()
-    with open(path, "wb") as f:
-        f.write(data)
-    await file.close()
+    key = f"{user.id}/{uuid4().hex}{image.extension}"
+    try:
+        await get_media_storage().save(key, body(), image.content_type)
+    except MediaStorageError:
+        raise HTTPException(status_code=503, detail="Media storage is unavailable")
 
-    media = await save_media_in_database(db=db, path=str(path)[5:])
+    media = await repository.save_media_in_database(path=key)
     if media:
         return SuccessMediaUploadResponse(result=True, media_id=media.id)
     raise HTTPException(status_code=400, detail="Bad request data")
 
 
+@tweet_routers.post(
+    "/medias/presign",
+    status_code=201,
+    response_model=SuccessMediaPresignResponse,
+    responses={
+        201: {
+            "model": SuccessMediaPresignResponse,
+            "description": "Signed URL for direct upload to media storage",
+        },
+        400: {"model": ExceptionResponse, "description": "Bad request data"},
+        422: {"model": ExceptionResponse, "description": "Validation error"},
+        401: {"model": ExceptionResponse, "description": "Invalid API Key"},
+    },
+)
+async def presign_media_upload(
+    data: MediaPresignRequest,
+    user: User = Depends(get_current_user),
+):
+    """
+    Получить подписанный URL для загрузки изображения напрямую в хранилище.
+    Байты изображения при этом не проходят через бэкенд. Файл загружается
+    под временным ключом и становится медиа только после /api/medias/confirm.
+    Неподтверждённые загрузки удаляет правило жизненного цикла бакета
+    для префикса pending/.
+    """
+    file_extension = os.path.splitext(data.filename)[1].lower()
+    if file_extension not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File format not allowed. Allowed formats: {', '.join(ALLOWED_EXTENSIONS)}",
+        )
+
+    key = f"{PENDING_MEDIA_PREFIX}/{user.id}/{uuid4().hex}{file_extension}"
+    upload = get_media_storage().presigned_upload(key, data.content_type)
+    if upload is None:
+        raise HTTPException(
+            status_code=400, detail="Direct uploads are not supported by media storage"
+        )
+    return SuccessMediaPresignResponse(
+        result=True,
+        upload_key=key,
+        upload_url=upload.url,
+        method=upload.method,
+        headers=upload.headers,
+    )
+
+
+@tweet_routers.post(
+    "/medias/confirm",
+    status_code=201,
+    responses={
+        201: {
+            "model": SuccessMediaUploadResponse,
+            "description": "Successful upload media",
+        },
+        400: {"model": ExceptionResponse, "description": "Bad request data"},
+        413: {"model": ExceptionResponse, "description": "File is too large"},
+        422: {"model": ExceptionResponse, "description": "Validation error"},
+        401: {"model": ExceptionResponse, "description": "Invalid API Key"},
+        503: {"model": ExceptionResponse, "description": "Too many uploads"},
+    },
+)
+async def confirm_media_upload(
+    data: MediaConfirmRequest,
+    user: User = Depends(get_current_user),
+    repository: Repository = Depends(get_repository),
+):
+    """
+    Подтвердить прямую загрузку: файл читается из хранилища и проверяется
+    так же, как в /api/medias, сохраняется очищенная копия, временный файл удаляется.
+    """
+    key = data.upload_key
+    if not key.startswith(f"{PENDING_MEDIA_PREFIX}/{user.id}/") or ".." in key:
+        raise HTTPException(status_code=400, detail="Unknown upload")
+    try:
+        content = await get_media_storage().read(key, settings.MEDIA_MAX_UPLOAD_BYTES + 1)
+    except MediaStorageError:
+        raise HTTPException(status_code=400, detail="Unknown upload")
+
+    async def chunks():
+        yield content
+
+    try:
+        response = await _store_validated_media(chunks(), user, repository)
+    except HTTPException as exc:
+        # При 503 временный файл остаётся, чтобы подтверждение можно было повторить
+        if exc.status_code != 503:
+            await _discard_pending_media(key)
+        raise
+    await _discard_pending_media(key)
+    return response
+
+
+async def _discard_pending_media(key: str):
+    try:
+        await get_media_storage().delete(key)
+    except MediaStorageError:
+        pass
+
+
+def _decode_feed_cursor(cursor: Optional[str], sort: str) -> Optional[tuple]:
+    """
+    Декодирует курсор ленты: (created_at, id) для recent, (лайки, id) для top
+    и (оценка, id, момент расчёта) для ranked.
+    """
+    position = decode_cursor(cursor, size=3 if sort == "ranked" else 2)
+    if position is None:
+        return None
+    try:
+        if sort == "recent":
+            return datetime.fromisoformat(position[0]), int(position[1])
+        if sort == "top":
+            return int(position[0]), int(position[1])
+        return float(position[0]), int(position[1]), datetime.fromisoformat(position[2])
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @tweet_routers.get(
     "/tweets",
-    response_model=SuccessfullTweetGetResponse,
+    response_model=TweetPageResponse,
     responses={
         200: {
-            "model": SuccessfullTweetGetResponse,
-            "description": "Successful response",
+            "model": TweetPageResponse,
+            "description": (
+                "Successful response. Without limit at most FEED_CANDIDATE_LIMIT "
+                "tweets are returned and next_cursor points to the rest. "
+                "top and ranked only rank the newest FEED_CANDIDATE_LIMIT tweets"
+            ),
         },
+        400: {"model": ExceptionResponse, "description": "Invalid cursor"},
         404: {
             "model": ExceptionResponse,
             "description": "Tweets not found for current user",
@@ -120,21 +323,121 @@ async def upload_media(
     },
 )
 async def get_tweets(
-    user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    sort: Literal["recent", "top", "ranked"] = "top",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    user: User = Depends(get_current_user),
+    repository: Repository = Depends(get_repository),
+    loaders: Loaders = Depends(get_loaders),
 ):
     """
     Получить ленту твитов для текущего аутентифицированного пользователя.
+    sort: recent - сначала новые, top - по количеству лайков,
+    ranked - по популярности с учётом возраста твита.
+    Без limit отдаётся не больше FEED_CANDIDATE_LIMIT (по умолчанию 1000) твитов:
+    если лента длиннее, в ответе есть next_cursor на продолжение.
+    top и ranked ранжируют только FEED_CANDIDATE_LIMIT последних твитов ленты,
+    более старые твиты в этих режимах не попадают ни на одну страницу
+    (в отличие от recent), поэтому их next_cursor после окна ведёт к пустой странице.
     """
-    tweets = await get_feed_for_user(db=db, user_id=user.id)
-    items = [
-        TweetSchema.model_validate(tweet, from_attributes=True).model_dump()
-        for tweet in tweets
-    ]
-    if tweets:
-        return SuccessfullTweetGetResponse(result=True, tweets=items) # type: ignore # noqa
+    rows, next_key = await repository.get_feed_for_user(
+        user_id=user.id,
+        sort=sort,
+        limit=limit or settings.FEED_CANDIDATE_LIMIT,
+        cursor=_decode_feed_cursor(cursor, sort),
+    )
+    loaders.prime_user(user)
+    items = await loaders.tweet_schemas([tweet for tweet, _ in rows])
+    next_cursor = encode_cursor(*next_key) if next_key else None
+    if rows or cursor:
+        return TweetPageResponse(result=True, tweets=items, next_cursor=next_cursor) # type: ignore # noqa
     raise HTTPException(status_code=404, detail="Tweets not found for current user")
 
 
+@tweet_routers.get(
+    "/tweets/{id}",
+    response_model=SuccessTweetResponse,
+    responses={
+        200: {"model": SuccessTweetResponse, "description": "Successful response"},
+        304: {"description": "Tweet not modified since the ETag from If-None-Match"},
+        404: {"model": ExceptionResponse, "description": "Tweet not found"},
+        422: {"model": ExceptionResponse, "description": "Validation error"},
+        401: {"model": ExceptionResponse, "description": "Invalid API Key"},
+    },
+)
+async def get_tweet_by_id(
+    id: int,
+    request: Request,
+    user: User = Depends(get_current_user),
+    repository: Repository = Depends(get_repository),
+    loaders: Loaders = Depends(get_loaders),
+):
+    """
+    Получить один твит.
+    """
+    tweet = await repository.get_tweet(id)
+    if tweet is None:
+        raise HTTPException(status_code=404, detail="Tweet not found")
+    [schema] = await loaders.tweet_schemas([tweet])
+    return etag_response(request, SuccessTweetResponse(result=True, tweet=schema))
+
+
+def _decode_thread_cursor(cursor: Optional[str]) -> Optional[tuple[int, ...]]:
+    """
+    Декодирует курсор ветки: путь от начала беседы до последнего твита страницы.
+    """
+    position = decode_cursor(cursor, size=1)
+    if position is None:
+        return None
+    path = position[0]
+    if not isinstance(path, list) or not all(isinstance(i, int) for i in path):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return tuple(path)
+
+
+@tweet_routers.get(
+    "/tweets/{id}/thread",
+    response_model=ThreadResponse,
+    responses={
+        200: {"model": ThreadResponse, "description": "Successful response"},
+        400: {"model": ExceptionResponse, "description": "Invalid cursor"},
+        404: {"model": ExceptionResponse, "description": "Tweet not found"},
+        422: {"model": ExceptionResponse, "description": "Validation error"},
+        401: {"model": ExceptionResponse, "description": "Invalid API Key"},
+    },
+)
+async def get_tweet_thread(
+    id: int,
+    depth: int = Query(10, ge=0, le=100),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    user: User = Depends(get_current_user),
+    repository: Repository = Depends(get_repository),
+):
+    """
+    Получить ветку беседы: цепочку твитов до запрошенного и ответы на него
+    не глубже depth уровней, в порядке обхода дерева (ответ сразу после твита,
+    на который он написан, соседние ответы - от старых к новым).
+    """
+    after = _decode_thread_cursor(cursor)
+    thread = await load_thread(repository=repository, tweet_id=id)
+    if thread is None:
+        raise HTTPException(status_code=404, detail="Tweet not found")
+    ancestors, page = thread.page(id, max_depth=depth, limit=limit, after=after)
+
+    def to_schema(item):
+        return ThreadTweetSchema(**item.tweet, depth=item.depth)
+
+    next_cursor = encode_cursor(list(page[-1].path)) if len(page) == limit else None
+    return ThreadResponse(
+        result=True,
+        root_id=thread.root_id,
+        ancestors=[to_schema(item) for item in ancestors] if after is None else [],
+        tweets=[to_schema(item) for item in page],
+        next_cursor=next_cursor,
+    )
+
+
 @tweet_routers.delete(
     "/tweets/{id}",
     response_model=SuccessResponse,
@@ -152,12 +455,14 @@ async def get_tweets(
     },
 )
 async def remove_tweet(
-    id: int, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    id: int,
+    user: User = Depends(get_current_user),
+    repository: Repository = Depends(get_repository),
 ):
     """
     Удалить твит.
     """
-    result = await delete_tweet(db=db, user_id=user.id, tweet_id=id)
+    result = await repository.delete_tweet(user_id=user.id, tweet_id=id)
     if result:
         return SuccessResponse(result=result)
     raise HTTPException(status_code=403, detail="You can only delete your own tweets")
@@ -166,6 +471,7 @@ async def remove_tweet(
 @tweet_routers.post(
     "/tweets/{id}/likes",
     response_model=SuccessResponse,
+    dependencies=[Depends(likes_rate_limit)],
     status_code=201,
     responses={
         201: {
@@ -175,15 +481,18 @@ async def remove_tweet(
         400: {"model": ExceptionResponse, "description": "Bad request data"},
         422: {"model": ExceptionResponse, "description": "Validation error"},
         401: {"model": ExceptionResponse, "description": "Invalid API Key"},
+        429: {"model": ExceptionResponse, "description": "Too many requests"},
     },
 )
 async def like_tweet(
-    id: int, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    id: int,
+    user: User = Depends(get_current_user),
+    repository: Repository = Depends(get_repository),
 ):
     """
     Поставить лайк на твит.
     """
-    new_like = await create_like(db=db, user_id=user.id, tweet_id=id)
+    new_like = await repository.create_like(user_id=user.id, tweet_id=id)
     if new_like:
         return SuccessResponse(result=True)
     raise HTTPException(status_code=400, detail="Bad request data")
@@ -192,6 +501,7 @@ async def like_tweet(
 @tweet_routers.delete(
     "/tweets/{id}/likes",
     response_model=SuccessResponse,
+    dependencies=[Depends(likes_rate_limit)],
     responses={
         200: {
             "model": SuccessfullTweetGetResponse,
@@ -200,15 +510,141 @@ async def like_tweet(
         400: {"model": ExceptionResponse, "description": "Bad request data"},
         422: {"model": ExceptionResponse, "description": "Validation error"},
         401: {"model": ExceptionResponse, "description": "Invalid API Key"},
+        429: {"model": ExceptionResponse, "description": "Too many requests"},
     },
 )
 async def remove_like(
-    id: int, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    id: int,
+    user: User = Depends(get_current_user),
+    repository: Repository = Depends(get_repository),
 ):
     """
     Убрать лайк с твита.
     """
-    result = await delete_like(db=db, user_id=user.id, tweet_id=id)
+    result = await repository.delete_like(user_id=user.id, tweet_id=id)
     if result:
         return SuccessResponse(result=result)
     raise HTTPException(status_code=400, detail="Bad request data")
+
+
+@tweet_routers.post(
+    "/tweets/{id}/retweet",
+    response_model=SuccessTweetCreateResponse,
+    status_code=201,
+    responses={
+        201: {
+            "model": SuccessTweetCreateResponse,
+            "description": "Successful response with retweet ID",
+        },
+        400: {"model": ExceptionResponse, "description": "Already retweeted"},
+        404: {"model": ExceptionResponse, "description": "Tweet not found"},
+        422: {"model": ExceptionResponse, "description": "Validation error"},
+        401: {"model": ExceptionResponse, "description": "Invalid API Key"},
+    },
+)
+async def retweet(
+    id: int,
+    user: User = Depends(get_current_user),
+    repository: Repository = Depends(get_repository),
+):
+    """
+    Ретвитнуть твит. Ретвит ретвита ссылается на оригинал.
+    """
+    original_id = await repository.get_repost_target_id(id)
+    if original_id is None:
+        raise HTTPException(status_code=404, detail="Tweet not found")
+    new_retweet = await repository.create_retweet(
+        user_id=user.id, tweet_id=original_id
+    )
+    if new_retweet:
+        return SuccessTweetCreateResponse(result=True, tweet_id=new_retweet.id)
+    raise HTTPException(status_code=400, detail="Already retweeted")
+
+
+@tweet_routers.delete(
+    "/tweets/{id}/retweet",
+    response_model=SuccessResponse,
+    responses={
+        200: {"model": SuccessResponse, "description": "Successful response"},
+        400: {"model": ExceptionResponse, "description": "Bad request data"},
+        422: {"model": ExceptionResponse, "description": "Validation error"},
+        401: {"model": ExceptionResponse, "description": "Invalid API Key"},
+    },
+)
+async def remove_retweet(
+    id: int,
+    user: User = Depends(get_current_user),
+    repository: Repository = Depends(get_repository),
+):
+    """
+    Отменить ретвит.
+    """
+    original_id = await repository.get_repost_target_id(id)
+    if original_id is not None and await repository.delete_retweet(
+        user_id=user.id, tweet_id=original_id
+    ):
+        return SuccessResponse(result=True)
+    raise HTTPException(status_code=400, detail="Bad request data")
+
+
+@tweet_routers.get(
+    "/hashtags/trending",
+    response_model=TrendingResponse,
+    responses={
+        200: {"model": TrendingResponse, "description": "Successful response"},
+        422: {"model": ExceptionResponse, "description": "Validation error"},
+        401: {"model": ExceptionResponse, "description": "Invalid API Key"},
+    },
+)
+async def get_trending_hashtags(
+    window: Literal["hour", "day"] = "hour",
+    limit: int = Query(10, ge=1, le=50),
+    user: User = Depends(get_current_user),
+):
+    """
+    Получить самые популярные хэштеги организации пользователя
+    за последний час или сутки.
+    Данные берутся из снимка, который обновляется в фоне раз в несколько секунд.
+    """
+    snapshot = get_trending_snapshot()
+    hashtags = [
+        TrendingHashtagSchema(tag=tag, count=count)
+        for tag, count in snapshot.top(window, user.organization_id)[:limit]
+    ]
+    return TrendingResponse(
+        result=True, window=window, hashtags=hashtags, updated_at=snapshot.updated_at
+    )
+
+
+@tweet_routers.get(
+    "/hashtags/{tag}/tweets",
+    response_model=TweetPageResponse,
+    responses={
+        200: {"model": TweetPageResponse, "description": "Successful response"},
+        400: {"model": ExceptionResponse, "description": "Invalid cursor"},
+        422: {"model": ExceptionResponse, "description": "Validation error"},
+        401: {"model": ExceptionResponse, "description": "Invalid API Key"},
+    },
+)
+async def get_hashtag_tweets(
+    tag: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    user: User = Depends(get_current_user),
+    repository: Repository = Depends(get_repository),
+    loaders: Loaders = Depends(get_loaders),
+):
+    """
+    Получить твиты организации с хэштегом, от новых к старым.
+    """
+    before_id = decode_id_cursor(cursor)
+    tweets = await repository.get_tweets_by_hashtag(
+        tag=tag.lstrip("#"), limit=limit, before_id=before_id
+    )
+    loaders.prime_user(user)
+    next_cursor = encode_cursor(tweets[-1].id) if len(tweets) == limit else None
+    return TweetPageResponse(
+        result=True,
+        tweets=await loaders.tweet_schemas(tweets),
+        next_cursor=next_cursor,
+    )
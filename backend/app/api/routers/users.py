@@ -1,15 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.dependencies import get_current_user, get_db
-from app.crud.followers import delete_follow_association
-from app.crud.followers import follow_user as crud_follow_user
-from app.crud.user import get_user_by_id as crud_get_user_by_id
+from app.api.dependencies import (
+    RateLimiter,
+    get_current_user,
+    get_db,
+    get_loaders,
+    get_repository,
+    rate_limit,
+)
+from app.api.middleware import etag_response
+from app.core.api_keys import api_key_cache
+from app.core.export import gzip_ndjson
+from app.core.graph import follow_graph
+from app.core.loaders import Loaders
+from app.core.pagination import decode_id_cursor, encode_cursor
+from app.crud.api_keys import create_api_key, get_api_keys, revoke_api_key
+from app.crud.export import stream_user_export
+from app.crud.repository import Repository
 from app.models import User
+from app.schemas.api_key import (
+    ApiKeyCreate,
+    ApiKeyCreateResponse,
+    ApiKeyListResponse,
+    ApiKeySchema,
+)
 from app.schemas.responses import ExceptionResponse, SuccessResponse
-from app.schemas.user import UserInfoSchema, UserSuccessResponse
+from app.schemas.tweet import TweetPageResponse
+from app.schemas.user import (
+    UserBaseSchema,
+    UserSuccessResponse,
+    UserSuggestionsResponse,
+)
+
+user_routers = APIRouter(
+    prefix="/api", tags=["users"], dependencies=[Depends(rate_limit)]
+)
 
-user_routers = APIRouter(prefix="/api", tags=["users"])
+export_rate_limit = RateLimiter(scope="export", capacity=2, refill_rate=1 / 60)
 
 
 @user_routers.get(
@@ -25,17 +57,188 @@ user_routers = APIRouter(prefix="/api", tags=["users"])
     },
 )
 async def get_user_by_api(
-    user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    user: User = Depends(get_current_user), loaders: Loaders = Depends(get_loaders)
 ):
     """
     Получить информацию о текущем аутентифицированном пользователе.
     """
     if user:
-        user_schema = UserInfoSchema.model_validate(user)
+        user_schema = await loaders.user_profile(user)
         return UserSuccessResponse(result=True, user=user_schema)
     raise HTTPException(status_code=401, detail="Invalid API Key")
 
 
+@user_routers.get(
+    "/users/me/mentions",
+    response_model=TweetPageResponse,
+    responses={
+        200: {"model": TweetPageResponse, "description": "Successful response"},
+        400: {"model": ExceptionResponse, "description": "Invalid cursor"},
+        422: {"model": ExceptionResponse, "description": "Validation error"},
+        401: {"model": ExceptionResponse, "description": "Invalid API Key"},
+    },
+)
+async def get_my_mentions(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    user: User = Depends(get_current_user),
+    repository: Repository = Depends(get_repository),
+    loaders: Loaders = Depends(get_loaders),
+):
+    """
+    Получить твиты, в которых упомянут текущий пользователь, от новых к старым.
+    """
+    before_id = decode_id_cursor(cursor)
+    tweets = await repository.get_mentions_for_user(
+        user_id=user.id, limit=limit, before_id=before_id
+    )
+    loaders.prime_user(user)
+    next_cursor = encode_cursor(tweets[-1].id) if len(tweets) == limit else None
+    return TweetPageResponse(
+        result=True,
+        tweets=await loaders.tweet_schemas(tweets),
+        next_cursor=next_cursor,
+    )
+
+
+@user_routers.get(
+    "/users/me/suggestions",
+    response_model=UserSuggestionsResponse,
+    responses={
+        200: {"model": UserSuggestionsResponse, "description": "Successful response"},
+        422: {"model": ExceptionResponse, "description": "Validation error"},
+        401: {"model": ExceptionResponse, "description": "Invalid API Key"},
+    },
+)
+async def get_my_suggestions(
+    limit: int = Query(10, ge=1, le=50),
+    user: User = Depends(get_current_user),
+    repository: Repository = Depends(get_repository),
+):
+    """
+    Получить рекомендации «кого читать» для текущего пользователя.
+    Граф строит фоновая задача при запуске, запрос ждёт его только до первого построения.
+    """
+    await follow_graph.ensure_loaded(repository)
+    suggestions = follow_graph.suggest(user.id, limit)
+    users = await repository.get_users_by_ids([user_id for user_id, _ in suggestions])
+    return UserSuggestionsResponse(
+        result=True, users=[UserBaseSchema.model_validate(item) for item in users]
+    )
+
+
+@user_routers.get(
+    "/users/me/export",
+    dependencies=[Depends(export_rate_limit)],
+    responses={
+        200: {
+            "content": {"application/gzip": {}},
+            "description": "Gzip-compressed NDJSON with all user data",
+        },
+        401: {"model": ExceptionResponse, "description": "Invalid API Key"},
+        429: {"model": ExceptionResponse, "description": "Too many requests"},
+    },
+)
+async def export_my_data(
+    user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+):
+    """
+    Выгрузить все данные текущего пользователя в формате NDJSON, сжатом gzip.
+    Данные читаются серверными курсорами и отдаются потоком,
+    поэтому расход памяти не зависит от размера аккаунта.
+    """
+    user_id = user.id
+    bind = db.bind
+
+    async def records():
+        # Сессия запроса закрывается до начала отправки ответа,
+        # поэтому выгрузка читает данные через собственную сессию
+        async with AsyncSession(bind) as export_db:
+            async for record in stream_user_export(db=export_db, user_id=user_id):
+                yield record
+
+    filename = f"tribe-export-{user_id}.ndjson.gz"
+    return StreamingResponse(
+        gzip_ndjson(records()),
+        media_type="application/gzip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@user_routers.get(
+    "/users/me/api-keys",
+    response_model=ApiKeyListResponse,
+    responses={
+        200: {"model": ApiKeyListResponse, "description": "Active API keys"},
+        401: {"model": ExceptionResponse, "description": "Invalid API Key"},
+    },
+)
+async def get_my_api_keys(
+    user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+):
+    """
+    Получить действующие API-ключи текущего пользователя.
+    """
+    keys = await get_api_keys(db=db, user_id=user.id)
+    return ApiKeyListResponse(
+        result=True, api_keys=[ApiKeySchema.model_validate(key) for key in keys]
+    )
+
+
+@user_routers.post(
+    "/users/me/api-keys",
+    status_code=201,
+    response_model=ApiKeyCreateResponse,
+    responses={
+        201: {"model": ApiKeyCreateResponse, "description": "New API key"},
+        401: {"model": ExceptionResponse, "description": "Invalid API Key"},
+        422: {"model": ExceptionResponse, "description": "Validation error"},
+    },
+)
+async def issue_api_key(
+    data: ApiKeyCreate,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Выпустить новый API-ключ. Ключ возвращается только в этом ответе.
+    """
+    expires_at = None
+    if data.expires_in_days:
+        expires_at = datetime.now(timezone.utc) + timedelta(days=data.expires_in_days)
+    api_key, record = await create_api_key(
+        db=db,
+        user_id=user.id,
+        organization_id=user.organization_id,
+        name=data.name,
+        expires_at=expires_at,
+    )
+    return ApiKeyCreateResponse(
+        result=True, api_key=api_key, key=ApiKeySchema.model_validate(record)
+    )
+
+
+@user_routers.delete(
+    "/users/me/api-keys/{key_id}",
+    response_model=SuccessResponse,
+    responses={
+        200: {"model": SuccessResponse, "description": "API key revoked"},
+        404: {"model": ExceptionResponse, "description": "API key not found"},
+        401: {"model": ExceptionResponse, "description": "Invalid API Key"},
+    },
+)
+async def revoke_my_api_key(
+    key_id: int, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+):
+    """
+    Отозвать API-ключ текущего пользователя.
+    """
+    if not await revoke_api_key(db=db, user_id=user.id, key_id=key_id):
+        raise HTTPException(status_code=404, detail="API key not found")
+    api_key_cache.invalidate_user(user.id)
+    return SuccessResponse(result=True)
+
+
 @user_routers.get(
     "/users/{id}",
     response_model=UserSuccessResponse,
@@ -44,19 +247,27 @@ async def get_user_by_api(
             "model": UserSuccessResponse,
             "description": "Successful response with user data",
         },
+        304: {"description": "Not modified"},
         404: {"model": ExceptionResponse, "description": "User not found"},
         422: {"model": ExceptionResponse, "description": "Validation error"},
         401: {"model": ExceptionResponse, "description": "Invalid API Key"},
     },
 )
-async def get_user_by_id(id: int, db: AsyncSession = Depends(get_db)):
+async def get_user_by_id(
+    id: int,
+    request: Request,
+    user: User = Depends(get_current_user),
+    repository: Repository = Depends(get_repository),
+    loaders: Loaders = Depends(get_loaders),
+):
     """
-    Получить информацию о пользователе по его ID.
+    Получить информацию о пользователе своей организации по его ID.
+    Поддерживает условные запросы: при совпадении If-None-Match возвращается 304.
     """
-    user = await crud_get_user_by_id(user_id=id, db=db)
-    if user:
-        user_schema = UserInfoSchema.model_validate(user)
-        return UserSuccessResponse(result=True, user=user_schema)
+    target_user = await repository.get_user_by_id(id)
+    if target_user:
+        user_schema = await loaders.user_profile(target_user)
+        return etag_response(request, UserSuccessResponse(result=True, user=user_schema))
     raise HTTPException(status_code=404, detail=f"User with ID {id} not found")
 
 
@@ -72,7 +283,9 @@ async def get_user_by_id(id: int, db: AsyncSession = Depends(get_db)):
     },
 )
 async def follow_user(
-    id: int, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    id: int,
+    user: User = Depends(get_current_user),
+    repository: Repository = Depends(get_repository),
 ):
     """
     Подписаться на пользователя.
@@ -80,12 +293,12 @@ async def follow_user(
     if id == user.id:
         raise HTTPException(status_code=400, detail="Cannot follow yourself")
 
-    target_user = await crud_get_user_by_id(user_id=id, db=db)
+    target_user = await repository.get_user_by_id(id)
     if not target_user:
         raise HTTPException(status_code=404, detail="User to follow not found")
 
-    result = await crud_follow_user(
-        db=db, following_id=target_user.id, follower_id=user.id
+    result = await repository.follow_user(
+        following_id=target_user.id, follower_id=user.id
     )
     if result:
         return SuccessResponse(result=True)
@@ -106,14 +319,16 @@ async def follow_user(
     },
 )
 async def unfollow_user(
-    id: int, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    id: int,
+    user: User = Depends(get_current_user),
+    repository: Repository = Depends(get_repository),
 ):
     """
     Отписаться от пользователя.
     """
     follower_id = user.id
-    result = await delete_follow_association(
-        db=db, following_id=id, follower_id=follower_id
+    result = await repository.delete_follow_association(
+        following_id=id, follower_id=follower_id
     )
     if result:
         return SuccessResponse(result=True)
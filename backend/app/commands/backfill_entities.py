@@ -0,0 +1,57 @@
+"""
+Заполнение таблиц tweet_hashtags и tweet_mentions для уже существующих твитов.
+
+Запуск:
+    python -m app.commands.backfill_entities --batch-size 1000
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.orm import load_only
+
+from app.crud.hashtags import save_tweet_entities
+from app.db.database import async_session, engine
+from app.models import Tweet
+
+
+async def backfill(batch_size: int) -> int:
+    """
+    Проходит по таблице tweets пачками по id и сохраняет хэштеги и упоминания.
+    Каждая пачка коммитится отдельно, повторный запуск безопасен.
+    """
+    last_id = 0
+    processed = 0
+    while True:
+        async with async_session() as db:
+            result = await db.execute(
+                select(Tweet)
+                .options(load_only(Tweet.id, Tweet.content, Tweet.organization_id))
+                .where(Tweet.id > last_id)
+                .order_by(Tweet.id)
+                .limit(batch_size)
+            )
+            tweets = list(result.scalars().all())
+            if not tweets:
+                break
+            await save_tweet_entities(db=db, tweets=tweets)
+            await db.commit()
+        last_id = tweets[-1].id
+        processed += len(tweets)
+        print(f"processed {processed} tweets (last id {last_id})")
+    return processed
+
+
+async def main(batch_size: int):
+    try:
+        await backfill(batch_size)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
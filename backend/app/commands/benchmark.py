@@ -0,0 +1,100 @@
+"""
+Микробенчмарк роутеров и сериализации без Postgres и сети:
+данные генерируются в хранилище в памяти (REPOSITORY_BACKEND=memory),
+запросы выполняются через ASGI-транспорт httpx прямо в приложение.
+
+Запуск:
+    python -m app.commands.benchmark
+    python -m app.commands.benchmark --users 1000 --tweets 50000 --requests 500
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from app.core.config import settings
+
+ENDPOINTS = {
+    "feed_recent": "/api/tweets?sort=recent&limit=50",
+    "feed_top": "/api/tweets?sort=top&limit=50",
+    "feed_ranked": "/api/tweets?sort=ranked&limit=50",
+    "profile": "/api/users/me",
+    "tweet": "/api/tweets/{tweet_id}",
+}
+
+
+async def seed(users: int, follows: int, tweets: int, likes: int) -> list[str]:
+    """
+    Заполняет хранилище в памяти и возвращает API-ключи пользователей.
+    """
+    from app.crud.memory import MemoryRepository, MemoryStore, set_memory_store
+
+    store = MemoryStore()
+    set_memory_store(store)
+    repository = MemoryRepository(store)
+    user_ids = [store.add_user(f"user{i}", api_key=f"bench-{i}").id for i in range(users)]
+    for user_id in user_ids:
+        for following_id in random.sample(user_ids, min(follows, users)):
+            if following_id != user_id:
+                await repository.follow_user(following_id, user_id)
+    for i in range(tweets):
+        await repository.create_tweet(
+            {"content": f"tweet {i} #bench", "author_id": random.choice(user_ids)}
+        )
+    tweet_ids = list(store.tweets)
+    for _ in range(likes):
+        await repository.create_like(random.choice(user_ids), random.choice(tweet_ids))
+    return [f"bench-{i}" for i in range(users)]
+
+
+async def run(users: int, follows: int, tweets: int, likes: int, requests: int):
+    from httpx import ASGITransport, AsyncClient
+
+    from app.main import app
+
+    started = time.perf_counter()
+    api_keys = await seed(users, follows, tweets, likes)
+    print(
+        f"seeded {users} users, {tweets} tweets, {likes} likes "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{'endpoint':<12} {'req/s':>8} {'p50, ms':>8} {'p95, ms':>8} {'KiB':>6}")
+        for name, path in ENDPOINTS.items():
+            timings, size = [], 0
+            for _ in range(requests):
+                url = path.format(tweet_id=random.randint(1, tweets))
+                headers = {"Api-Key": random.choice(api_keys)}
+                request_started = time.perf_counter()
+                response = await client.get(url, headers=headers)
+                timings.append(time.perf_counter() - request_started)
+                size += len(response.content)
+            timings.sort()
+            print(
+                f"{name:<12} {len(timings) / sum(timings):>8.0f} "
+                f"{statistics.median(timings) * 1000:>8.2f} "
+                f"{timings[int(len(timings) * 0.95)] * 1000:>8.2f} "
+                f"{size / len(timings) / 1024:>6.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--follows", type=int, default=20)
+    parser.add_argument("--tweets", type=int, default=10_000)
+    parser.add_argument("--likes", type=int, default=50_000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    settings.REPOSITORY_BACKEND = "memory"
+    settings.RATE_LIMIT_ENABLED = False
+    settings.COMPRESSION_ENABLED = False
+    asyncio.run(run(args.users, args.follows, args.tweets, args.likes, args.requests))
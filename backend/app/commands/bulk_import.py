@@ -0,0 +1,257 @@
+"""
+Массовая загрузка данных из CSV/NDJSON через Postgres COPY.
+
+Запуск:
+    python -m app.commands.bulk_import users users.csv
+    python -m app.commands.bulk_import tweets tweets.ndjson --batch-size 100000
+
+CSV-файлы должны содержать строку заголовка с именами колонок.
+Пустые ячейки необязательных колонок загружаются как NULL, строкам
+с пустым id номера выдаются из последовательности таблицы.
+Строки, конфликтующие с уже существующими (по первичному или уникальному ключу),
+пропускаются. Хэштеги и упоминания загруженных твитов заполняются отдельно
+командой app.commands.backfill_entities.
+Организация задаётся только пользователям (колонка organization_id),
+подпискам, твитам, лайкам и медиа она проставляется по пользователю или твиту.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from app.core.partitions import (
+    PARTITIONED_TABLES,
+    create_partition_sql,
+    partition_index,
+)
+from app.crud.like import SYNC_LIKES_COUNT_SQL
+from app.crud.organizations import sync_organization_sql
+from app.db.database import DATABASE_URL
+
+
+@dataclass(frozen=True)
+class ImportTable:
+    """
+    Описание таблицы для загрузки: колонки с функциями приведения типов
+    и SQL для обслуживания после загрузки.
+    """
+
+    name: str
+    columns: dict[str, Callable]
+    required: tuple[str, ...]
+    post_load: tuple[str, ...] = ()
+
+
+def _optional_int(value) -> Optional[int]:
+    return None if value in (None, "") else int(value)
+
+
+def _sync_sequence(table: str) -> str:
+    return (
+        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+        f"COALESCE((SELECT max(id) FROM {table}), 0) + 1, false)"
+    )
+
+
+TABLES = {
+    "users": ImportTable(
+        name="users",
+        columns={
+            "id": _optional_int,
+            "name": str,
+            "api_key": str,
+            "organization_id": int,
+        },
+        required=("name", "api_key"),
+        post_load=(_sync_sequence("users"),),
+    ),
+    "follows": ImportTable(
+        name="follower_association",
+        columns={"follower_id": int, "following_id": int},
+        required=("follower_id", "following_id"),
+        post_load=(sync_organization_sql("follower_association"),),
+    ),
+    "tweets": ImportTable(
+        name="tweets",
+        columns={
+            "id": _optional_int,
+            "content": str,
+            "author_id": int,
+            "parent_id": _optional_int,
+            "root_id": _optional_int,
+            "repost_of_id": _optional_int,
+        },
+        required=("content", "author_id"),
+        post_load=(_sync_sequence("tweets"), sync_organization_sql("tweets")),
+    ),
+    "likes": ImportTable(
+        name="likes",
+        columns={"id": _optional_int, "user_id": int, "tweet_id": int},
+        required=("user_id", "tweet_id"),
+        post_load=(
+            _sync_sequence("likes"),
+            sync_organization_sql("likes"),
+            SYNC_LIKES_COUNT_SQL,
+        ),
+    ),
+    "media": ImportTable(
+        name="media",
+        columns={"id": _optional_int, "path": str, "tweet_id": _optional_int},
+        required=("path",),
+        post_load=(
+            _sync_sequence("media"),
+            sync_organization_sql("media"),
+        ),
+    ),
+}
+
+
+def read_records(path: Path) -> Iterator[dict]:
+    """
+    Построчно читает CSV (с заголовком) или NDJSON файл.
+    """
+    with open(path, encoding="utf-8", newline="") as file:
+        if path.suffix in (".ndjson", ".jsonl"):
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(file)
+
+
+async def assign_ids(
+    connection, table: str, position: int, batch: list[tuple]
+) -> list[tuple]:
+    """
+    Проставляет строкам пачки с пустым id номера из последовательности таблицы.
+    Перед выдачей последовательность сдвигается за максимальный id таблицы и пачки,
+    чтобы выданные номера не совпали с уже загруженными или явно заданными.
+    """
+    explicit = [row[position] for row in batch if row[position] is not None]
+    if len(explicit) == len(batch):
+        return batch
+    sequence = f"pg_get_serial_sequence('{table}', 'id')"
+    await connection.execute(
+        f"SELECT setval({sequence}, GREATEST("
+        f"(SELECT COALESCE(max(id), 0) FROM {table}), $1::bigint) + 1, false)",
+        max(explicit, default=0),
+    )
+    ids = iter(
+        await connection.fetchval(
+            f"SELECT array_agg(nextval({sequence})) FROM generate_series(1, $1)",
+            len(batch) - len(explicit),
+        )
+    )
+    return [
+        (
+            row
+            if row[position] is not None
+            else row[:position] + (next(ids),) + row[position + 1 :]
+        )
+        for row in batch
+    ]
+
+
+def batches(
+    records: Iterator[dict], table: ImportTable, columns: list[str], size: int
+) -> Iterator[list[tuple]]:
+    """
+    Группирует записи в пачки кортежей в порядке columns с приведением типов.
+    """
+    batch = []
+    for record in records:
+        batch.append(tuple(table.columns[name](record[name]) for name in columns))
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def load(table_key: str, path: Path, batch_size: int) -> int:
+    """
+    Загружает файл в таблицу пачками: каждая пачка копируется через COPY
+    во временную таблицу и переносится в целевую INSERT ... ON CONFLICT DO NOTHING
+    в отдельной транзакции. После загрузки выполняются post_load-запросы и ANALYZE.
+    Для секционированных таблиц заранее создаются секции под id из пачки.
+    """
+    import asyncpg
+
+    table = TABLES[table_key]
+    records = read_records(path)
+    first = next(records, None)
+    if first is None:
+        return 0
+    columns = [name for name in table.columns if name in first]
+    missing = set(table.required) - set(columns)
+    if missing:
+        names = ", ".join(sorted(missing))
+        raise SystemExit(f"Missing columns for {table_key}: {names}")
+
+    def all_records():
+        yield first
+        yield from records
+
+    partition_key = PARTITIONED_TABLES.get(table.name)
+    if partition_key not in columns:
+        partition_key = None
+
+    dsn = DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
+    connection = await asyncpg.connect(dsn)
+    column_list = ", ".join(columns)
+    loaded = inserted = 0
+    started = time.monotonic()
+    try:
+        for batch in batches(all_records(), table, columns, batch_size):
+            if "id" in columns:
+                batch = await assign_ids(
+                    connection, table.name, columns.index("id"), batch
+                )
+            if partition_key:
+                last = partition_index(
+                    max(row[columns.index(partition_key)] for row in batch)
+                )
+                for index in range(last + 1):
+                    await connection.execute(create_partition_sql(table.name, index))
+            async with connection.transaction():
+                await connection.execute(
+                    f"CREATE TEMP TABLE import_staging ON COMMIT DROP AS "
+                    f"SELECT {column_list} FROM {table.name} WITH NO DATA"
+                )
+                await connection.copy_records_to_table(
+                    "import_staging", records=batch, columns=columns
+                )
+                status = await connection.execute(
+                    f"INSERT INTO {table.name} ({column_list}) "
+                    f"SELECT {column_list} FROM import_staging ON CONFLICT DO NOTHING"
+                )
+            loaded += len(batch)
+            inserted += int(status.rsplit(" ", 1)[-1])
+            elapsed = time.monotonic() - started
+            print(
+                f"{table_key}: {loaded} rows read, {inserted} inserted, "
+                f"{loaded / elapsed:,.0f} rows/s"
+            )
+
+        for query in table.post_load:
+            await connection.execute(query)
+        await connection.execute(f"ANALYZE {table.name}")
+    finally:
+        await connection.close()
+    return inserted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("table", choices=sorted(TABLES))
+    parser.add_argument("file", type=Path)
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    args = parser.parse_args()
+    asyncio.run(load(args.table, args.file, args.batch_size))
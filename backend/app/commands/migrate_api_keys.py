@@ -0,0 +1,58 @@
+"""
+Перенос API-ключей из users.api_key (открытый вид) в таблицу api_keys (хэши).
+Без запуска команды ключи переносятся по одному при первом использовании.
+
+Запуск:
+    python -m app.commands.migrate_api_keys --batch-size 1000
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import select, text
+
+from app.crud.api_keys import migrate_legacy_api_key
+from app.db.database import async_session, engine
+from app.models import User
+
+
+async def migrate(batch_size: int) -> int:
+    """
+    Переносит ключи пачками по id пользователя. Повторный запуск безопасен.
+    """
+    async with engine.begin() as conn:
+        await conn.execute(text("ALTER TABLE users ALTER COLUMN api_key DROP NOT NULL"))
+
+    last_id = 0
+    migrated = 0
+    while True:
+        async with async_session() as db:
+            result = await db.execute(
+                select(User.id, User.api_key)
+                .where(User.id > last_id, User.api_key.is_not(None))
+                .order_by(User.id)
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            for user_id, api_key in rows:
+                await migrate_legacy_api_key(db, user_id, api_key)
+        last_id = rows[-1][0]
+        migrated += len(rows)
+        print(f"migrated {migrated} keys (last user id {last_id})")
+    return migrated
+
+
+async def main(batch_size: int):
+    try:
+        await migrate(batch_size)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
@@ -0,0 +1,93 @@
+"""
+Перевод существующей базы на организации: добавляет колонки organization_id
+в users, follower_association, tweets, likes и media, заполняет их
+по пользователям и пересоздаёт индексы, начинающиеся с organization_id.
+Счётчики трендов hashtag_counts получают organization_id в первичном ключе,
+уже накопленные счётчики относятся к DEFAULT_ORGANIZATION_ID и устаревают за сутки.
+Все пользователи получают DEFAULT_ORGANIZATION_ID, другие организации
+назначаются через UPDATE users и повторный запуск команды.
+Базу, созданную до появления ответов, ретвитов и мягкого удаления, сначала
+нужно перевести командой app.commands.migrate_tweets.
+Выполняется в одной транзакции, повторный запуск безопасен.
+
+Запуск:
+    python -m app.commands.migrate_organizations
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.schema import AddConstraint, CreateIndex
+
+from app.core.config import settings
+from app.crud.organizations import sync_organizations
+from app.db.database import async_session, engine
+from app.models import FollowerAssociation, HashtagCount, Like, Media, Tweet, User
+
+# Индексы и ограничения до появления организаций
+LEGACY_INDEXES = (
+    "ix_users_name_lower",
+    "ix_tweets_author_created_live",
+    "ix_tweets_created_at",
+    "ix_tweets_root_id",
+    "ix_tweets_repost_of",
+)
+ORGANIZATION_CONSTRAINTS = {
+    "likes": "unique_user_like",
+    "follower_association": "unique_followership",
+}
+# Первичный ключ счётчиков трендов без organization_id
+LEGACY_HASHTAG_COUNTS_PKEY = "hashtag_counts_pkey"
+
+
+async def migrate():
+    models = (User, FollowerAssociation, Tweet, Like, Media)
+    async with async_session() as db:
+        for model in (*models, HashtagCount):
+            await db.execute(
+                text(
+                    f"ALTER TABLE {model.__tablename__} ADD COLUMN IF NOT EXISTS "
+                    f"organization_id integer NOT NULL "
+                    f"DEFAULT {settings.DEFAULT_ORGANIZATION_ID}"
+                )
+            )
+        updated = await sync_organizations(db)
+
+        for name in LEGACY_INDEXES:
+            await db.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        for table, name in ORGANIZATION_CONSTRAINTS.items():
+            await db.execute(
+                text(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name}")
+            )
+        for model in models:
+            for index in model.__table__.indexes:
+                await db.execute(CreateIndex(index, if_not_exists=True))
+            for constraint in model.__table__.constraints:
+                if constraint.name in ORGANIZATION_CONSTRAINTS.values():
+                    await db.execute(AddConstraint(constraint))
+        await db.execute(
+            text(
+                f"ALTER TABLE hashtag_counts "
+                f"DROP CONSTRAINT IF EXISTS {LEGACY_HASHTAG_COUNTS_PKEY}"
+            )
+        )
+        await db.execute(AddConstraint(HashtagCount.__table__.primary_key))
+        await db.commit()
+    for table, count in updated.items():
+        print(f"{table}: {count} rows moved to their user's organization")
+
+
+async def main():
+    try:
+        await migrate()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.parse_args()
+    asyncio.run(main())
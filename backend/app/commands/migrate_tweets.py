@@ -0,0 +1,146 @@
+"""
+Перевод базы, созданной до появления ответов, ретвитов, мягкого удаления,
+счётчиков лайков и секционирования: создаёт недостающие таблицы,
+пересоздаёт несекционированные tweets и likes секционированными с переносом строк,
+добавляет в tweets и likes новые колонки, заполняет tweets.likes_count
+по таблице likes и создаёт индексы по новым колонкам.
+У существующих твитов и лайков created_at - время запуска команды.
+Индексы, начинающиеся с organization_id, создаёт app.commands.migrate_organizations,
+её нужно запускать после этой команды.
+Выполняется в одной транзакции и блокирует tweets и likes на время переноса,
+поэтому запускается при остановленном бэкенде. Повторный запуск безопасен.
+
+Запуск:
+    python -m app.commands.migrate_tweets
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.schema import AddConstraint, CreateColumn, CreateIndex
+
+from app.core.partitions import create_partition_sql, partition_index
+from app.crud.like import SYNC_LIKES_COUNT_SQL
+from app.db.database import Base, async_session, engine
+from app.models import Like, Tweet, User
+
+# Колонки, которых нет в таблицах старых баз
+NEW_COLUMNS = {
+    Tweet: (
+        "parent_id",
+        "root_id",
+        "repost_of_id",
+        "search_vector",
+        "likes_count",
+        "created_at",
+        "deleted_at",
+    ),
+    Like: ("created_at",),
+}
+
+
+def add_column_sql(model, name: str) -> str:
+    column = CreateColumn(model.__table__.c[name]).compile(dialect=postgresql.dialect())
+    return f"ALTER TABLE {model.__tablename__} ADD COLUMN IF NOT EXISTS {column}"
+
+
+async def is_partitioned(db: AsyncSession, table: str) -> bool:
+    partitioned = await db.scalar(
+        text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": table},
+    )
+    return bool(partitioned)
+
+
+async def partition_tables(db: AsyncSession) -> dict[str, int]:
+    """
+    Пересоздаёт несекционированные tweets и likes по моделям.
+    Строки копируются во временные таблицы, старые таблицы удаляются вместе
+    с внешними ключами других таблиц на tweets, новые получают секции под все
+    перенесённые id. Затем строки (колонки, которые есть и в старой таблице)
+    возвращаются, а последовательности id и внешние ключи восстанавливаются.
+    Возвращает количество перенесённых строк по таблицам.
+    """
+    if await is_partitioned(db, "tweets"):
+        return {}
+    models = (Tweet, Like)
+    for model in models:
+        table = model.__tablename__
+        await db.execute(
+            text(
+                f"CREATE TEMP TABLE {table}_copy ON COMMIT DROP AS SELECT * FROM {table}"
+            )
+        )
+    await db.execute(text("DROP TABLE likes, tweets CASCADE"))
+
+    connection = await db.connection()
+    max_id = await db.scalar(text("SELECT COALESCE(max(id), 0) FROM tweets_copy"))
+    copied = {}
+    for model in models:
+        table = model.__tablename__
+        await connection.run_sync(model.__table__.create)
+        for index in range(partition_index(max_id) + 1):
+            await db.execute(text(create_partition_sql(table, index)))
+
+        result = await db.execute(text(f"SELECT * FROM {table}_copy LIMIT 0"))
+        existing = set(result.keys())
+        columns = ", ".join(
+            column.name
+            for column in model.__table__.columns
+            if column.computed is None and column.name in existing
+        )
+        result = await db.execute(
+            text(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {table}_copy")
+        )
+        copied[table] = result.rowcount
+        await db.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"COALESCE((SELECT max(id) FROM {table}), 0) + 1, false)"
+            )
+        )
+
+    for table in Base.metadata.sorted_tables:
+        if table.name in copied:
+            continue
+        for constraint in table.foreign_key_constraints:
+            if constraint.referred_table.name == "tweets":
+                await db.execute(AddConstraint(constraint))
+    return copied
+
+
+async def migrate():
+    async with async_session() as db:
+        connection = await db.connection()
+        await connection.run_sync(Base.metadata.create_all)
+        copied = await partition_tables(db)
+        for model, names in NEW_COLUMNS.items():
+            for name in names:
+                await db.execute(text(add_column_sql(model, name)))
+        result = await db.execute(text(SYNC_LIKES_COUNT_SQL))
+        for model in (User, Tweet, Like):
+            for index in model.__table__.indexes:
+                if "organization_id" not in index.columns:
+                    await db.execute(CreateIndex(index, if_not_exists=True))
+        await db.commit()
+    for table, count in copied.items():
+        print(f"{table}: {count} rows moved to the partitioned table")
+    print(f"tweets: likes_count updated for {result.rowcount} rows")
+
+
+async def main():
+    try:
+        await migrate()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.parse_args()
+    asyncio.run(main())
@@ -0,0 +1,28 @@
+"""
+Приведение путей медиафайлов, сохранённых до появления хранилища, к ключам
+вида <каталог>/<файл>. Повторный запуск безопасен.
+
+Запуск:
+    python -m app.commands.normalize_media_paths
+"""
+
+import argparse
+import asyncio
+
+from app.crud.media import normalize_media_paths
+from app.db.database import async_session, engine
+
+
+async def main():
+    try:
+        async with async_session() as db:
+            updated = await normalize_media_paths(db)
+        print(f"normalized {updated} media paths")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.parse_args()
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+"""
+Профиль импорта приложения: общее время импорта app.main в чистом процессе
+и самые тяжёлые модули по данным python -X importtime.
+
+Запуск:
+    python -m app.commands.profile_startup
+    python -m app.commands.profile_startup --top 30 --sort self
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ImportTiming:
+    """
+    Время импорта одного модуля в микросекундах: собственное и вместе с зависимостями.
+    """
+
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def profile_import(module: str = "app.main") -> tuple[float, list[ImportTiming]]:
+    """
+    Импортирует module в отдельном процессе и возвращает
+    время работы процесса в секундах и замеры importtime по модулям.
+    """
+    started = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed = time.perf_counter() - started
+    timings = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            continue
+        timings.append(ImportTiming(name.strip(), int(self_us), int(cumulative_us)))
+    return elapsed, timings
+
+
+def main(top: int, sort: str):
+    elapsed, timings = profile_import()
+    key = (lambda t: t.self_us) if sort == "self" else (lambda t: t.cumulative_us)
+    app_us = sum(t.self_us for t in timings if t.module.split(".")[0] == "app")
+    total_us = sum(t.self_us for t in timings)
+    print(f"import app.main: {elapsed:.3f}s (process), {total_us / 1e6:.3f}s (importtime)")
+    print(f"own app modules: {app_us / 1e6:.3f}s")
+    print(f"{'self, ms':>10} {'cumulative, ms':>15}  module")
+    for timing in sorted(timings, key=key, reverse=True)[:top]:
+        print(
+            f"{timing.self_us / 1000:>10.1f} {timing.cumulative_us / 1000:>15.1f}  "
+            f"{timing.module}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--sort", choices=("cumulative", "self"), default="cumulative")
+    args = parser.parse_args()
+    main(args.top, args.sort)
@@ -0,0 +1,105 @@
+import hashlib
+import hmac
+import re
+import secrets
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Optional
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from app.crud.repository import Repository
+
+
+# Ключ начинается с организации владельца ("org7."): по нему прокси
+# направляет запросы организации с отдельной БД на её воркеры (см. nginx.conf)
+ORGANIZATION_KEY_PREFIX = re.compile(r"^org\d+\.")
+
+
+def generate_api_key(organization_id: int) -> str:
+    return f"org{organization_id}.{secrets.token_urlsafe(32)}"
+
+
+def hash_api_key(api_key: str) -> str:
+    """
+    HMAC-SHA256 от ключа с серверным секретом API_KEY_SECRET.
+    """
+    return hmac.new(
+        settings.API_KEY_SECRET.encode(), api_key.encode(), hashlib.sha256
+    ).hexdigest()
+
+
+def api_key_prefix(api_key: str) -> str:
+    """
+    Префикс для поиска ключа в БД: начало случайной части ключа,
+    без организации, общей для всех её ключей.
+    """
+    secret = ORGANIZATION_KEY_PREFIX.sub("", api_key, count=1)
+    return secret[: settings.API_KEY_PREFIX_LENGTH]
+
+
+class ApiKeyCache:
+    """
+    Кэш результатов проверки API-ключей в памяти процесса.
+    Ключ кэша - сам API-ключ из заголовка (как и у ограничителя частоты запросов),
+    значение - id пользователя (None для неверного ключа) и момент,
+    до которого результат действителен. Запись живёт не дольше ttl
+    и не дольше срока действия самого ключа, самые давние записи вытесняются.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[Optional[int], float]] = OrderedDict()
+
+    def get(self, api_key: str) -> tuple[bool, Optional[int]]:
+        """
+        Возвращает (найдено ли в кэше, id пользователя).
+        """
+        entry = self._entries.get(api_key)
+        if entry is None:
+            return False, None
+        user_id, deadline = entry
+        if deadline <= time.monotonic():
+            del self._entries[api_key]
+            return False, None
+        return True, user_id
+
+    def set(
+        self, api_key: str, user_id: Optional[int], expires_at: Optional[datetime] = None
+    ):
+        ttl = settings.API_KEY_CACHE_TTL if user_id else settings.API_KEY_NEGATIVE_CACHE_TTL
+        if expires_at is not None:
+            ttl = min(ttl, (expires_at - datetime.now(timezone.utc)).total_seconds())
+        self._entries[api_key] = (user_id, time.monotonic() + ttl)
+        self._entries.move_to_end(api_key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int):
+        """
+        Удаляет из кэша все ключи пользователя (после отзыва ключа).
+        Другие воркеры увидят отзыв не позже чем через API_KEY_CACHE_TTL.
+        """
+        for api_key in [k for k, (uid, _) in self._entries.items() if uid == user_id]:
+            del self._entries[api_key]
+
+    def clear(self):
+        self._entries.clear()
+
+
+api_key_cache = ApiKeyCache(settings.API_KEY_CACHE_SIZE)
+
+
+async def authenticate_api_key(repository: "Repository", api_key: str) -> Optional[int]:
+    """
+    Возвращает id владельца API-ключа или None.
+    Хэширование и поиск в БД выполняются один раз на ключ за API_KEY_CACHE_TTL.
+    """
+    cached, user_id = api_key_cache.get(api_key)
+    if cached:
+        return user_id
+    user_id, expires_at = await repository.verify_api_key(api_key)
+    api_key_cache.set(api_key, user_id, expires_at)
+    return user_id
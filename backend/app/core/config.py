@@ -9,12 +9,174 @@ class Settings(BaseSettings):
 
     Attributes:
         DATABASE_URL (str): URL для подключения к PostgreSQL базе данных
+        REPOSITORY_BACKEND (str): Хранилище данных основных эндпоинтов: sql или memory (без Postgres)
+        DEFAULT_ORGANIZATION_ID (int): Организация пользователей, созданных без указания организации
+        ORGANIZATION_ID (int): Организация, которую обслуживает воркер, 0 - все организации общей БД
+        ORGANIZATION_DATABASE_URLS (str): Отдельные БД организаций в виде id=URL через запятую
         PUBLIC_BASE_URL (str): Базовый URL фронтенда
+        RATE_LIMIT_ENABLED (bool): Включено ли ограничение частоты запросов
+        RATE_LIMIT_CAPACITY (int): Размер ведра токенов по умолчанию
+        RATE_LIMIT_REFILL_RATE (float): Скорость пополнения ведра (токенов в секунду)
+        RATE_LIMIT_LIKES_CAPACITY (int): Размер ведра для эндпоинтов лайков
+        RATE_LIMIT_LIKES_REFILL_RATE (float): Скорость пополнения ведра для лайков
+        SEARCH_CANDIDATE_LIMIT (int): Сколько последних совпадений ранжируется при поиске
+        TRENDING_BUCKET_SECONDS (int): Размер временной корзины счётчиков хэштегов
+        TRENDING_CAPACITY (int): Максимум хэштегов в одной корзине в памяти
+        TRENDING_REFRESH_SECONDS (float): Период сброса счётчиков и обновления топа
+        TRENDING_TOP_SIZE (int): Размер топа хэштегов
+        GRAPH_REBUILD_SECONDS (float): Период перестроения графа подписок в памяти
+        GRAPH_RECENT_TWEETS (int): Для скольких последних твитов в граф загружаются лайки
+        GRAPH_MAX_FANOUT (int): Ограничение обхода соседей на каждом уровне графа
+        GRAPH_LIKES_WEIGHT (float): Вес сигнала «лайкали те же твиты» в рекомендациях
+        EVENTS_BROADCASTER (str): Рассылка событий ленты между воркерами: local или postgres
+        EVENTS_QUEUE_SIZE (int): Размер очереди событий одного клиента
+        EVENTS_HEARTBEAT_SECONDS (float): Период отправки heartbeat в поток событий
+        NOTIFICATIONS_FLUSH_SECONDS (float): Период записи буфера уведомлений в БД
+        MEDIA_STORAGE (str): Хранилище медиафайлов: local или s3
+        MEDIA_ROOT (str): Каталог локального хранилища медиафайлов
+        S3_ENDPOINT_URL (str): URL S3-совместимого хранилища
+        S3_BUCKET (str): Имя бакета для медиафайлов
+        S3_ACCESS_KEY (str): Ключ доступа к S3
+        S3_SECRET_KEY (str): Секретный ключ S3
+        S3_REGION (str): Регион S3
+        S3_PUBLIC_URL (str): Публичный URL бакета (если отличается от S3_ENDPOINT_URL/бакет)
+        S3_PART_SIZE (int): Размер части при multipart-загрузке
+        S3_PRESIGN_EXPIRES (int): Время жизни подписанных URL для прямой загрузки, в секундах
+        MEDIA_CDN_URLS (str): Базовые URL доменов раздачи медиа через запятую (шардирование)
+        MEDIA_URL_SECRET (str): Секрет подписи URL медиа (nginx secure_link), пусто - без подписи
+        MEDIA_URL_CACHE_SIZE (int): Сколько готовых URL медиа держать в памяти
+        MEDIA_MAX_UPLOAD_BYTES (int): Максимальный размер загружаемого изображения в байтах
+        MEDIA_MAX_PIXELS (int): Максимальное число пикселей изображения (ширина × высота)
+        MEDIA_MAX_DIMENSION (int): Максимальная ширина и высота изображения в пикселях
+        MEDIA_MAX_JPEG_SCANS (int): Максимальное число сканов в прогрессивном JPEG
+        MEDIA_VALIDATION_WORKERS (int): Число процессов проверки загружаемых изображений
+        MEDIA_VALIDATION_TASKS_PER_WORKER (int): Через сколько проверок процесс перезапускается
+        MEDIA_VALIDATION_CONCURRENCY (int): Сколько загрузок проверяется одновременно
+        MEDIA_VALIDATION_WAIT_SECONDS (float): Сколько загрузка ждёт свободного слота проверки
+        REAPER_INTERVAL_SECONDS (float): Период физического удаления помеченных твитов
+        REAPER_TWEETS_BATCH (int): Сколько удалённых твитов обрабатывается за один проход
+        REAPER_LIKES_BATCH (int): Сколько лайков удаляется в одной транзакции
+        PARTITION_SIZE (int): Сколько id твитов покрывает одна секция tweets/likes
+        PARTITION_PREMAKE (int): Сколько секций создаётся наперёд
+        PARTITION_CHECK_SECONDS (float): Период обслуживания секций
+        PARTITION_RETENTION_DAYS (int): Через сколько дней секция архивируется, 0 - никогда
+        FEED_WINDOW_DAYS (int): За сколько последних дней твиты попадают в ленту, 0 - без ограничения
+        FEED_CANDIDATE_LIMIT (int): Сколько последних твитов ранжируется в режимах top и ranked
+        FEED_RANKING_GRAVITY (float): Скорость затухания оценки твита со временем в режиме ranked
+        LIKES_WRITE_BEHIND (bool): Записывать лайки в БД пакетами из буфера в памяти
+        LIKES_FLUSH_SECONDS (float): Период сброса буфера лайков
+        LIKES_BUFFER_SIZE (int): Максимум лайков в буфере, сверх него лайки пишутся сразу
+        COMPRESSION_ENABLED (bool): Сжимать ответы API gzip
+        COMPRESSION_MIN_SIZE (int): Минимальный размер ответа в байтах для сжатия
+        COMPRESSION_LEVEL (int): Уровень сжатия gzip (1-9)
+        API_KEY_SECRET (str): Секрет HMAC для хэширования API-ключей, обязателен с БД (смена делает ключи недействительными)
+        API_KEY_PREFIX_LENGTH (int): Длина префикса ключа, по которому ключ ищется в БД
+        API_KEY_CACHE_TTL (float): Сколько секунд результат проверки ключа хранится в памяти
+        API_KEY_NEGATIVE_CACHE_TTL (float): Сколько секунд помнится неверный ключ
+        API_KEY_CACHE_SIZE (int): Максимум ключей в кэше проверки
+        THREAD_CACHE_TTL (float): Сколько секунд загруженная беседа хранится в памяти
+        THREAD_CACHE_SIZE (int): Максимум бесед в кэше
+        THREAD_MAX_TWEETS (int): Максимум твитов беседы, загружаемых для просмотра ветки
+        USER_CACHE_TTL (float): Сколько секунд имя пользователя хранится в общем кэше
+        USER_CACHE_SIZE (int): Максимум имён пользователей в общем кэше
+        DB_CREATE_SCHEMA (bool): Создавать недостающие таблицы при запуске воркера
+        DOCS_ENABLED (bool): Отдавать схему OpenAPI и страницы /docs и /redoc
+        STARTUP_WARMUP (bool): Прогревать мапперы и схему OpenAPI в фоне после запуска
+        METRICS_TOKEN (str): Токен для GET /api/metrics (заголовок Metrics-Token), пусто - метрики отключены
     """
 
     DATABASE_URL: str = "postgresql+asyncpg://user:password@db:5432/tribe"
+    REPOSITORY_BACKEND: str = "sql"
+    DEFAULT_ORGANIZATION_ID: int = 1
+    ORGANIZATION_ID: int = 0
+    ORGANIZATION_DATABASE_URLS: str = ""
     PUBLIC_BASE_URL: str = "http://localhost"
 
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_CAPACITY: int = 100
+    RATE_LIMIT_REFILL_RATE: float = 10.0
+    RATE_LIMIT_LIKES_CAPACITY: int = 20
+    RATE_LIMIT_LIKES_REFILL_RATE: float = 1.0
+
+    SEARCH_CANDIDATE_LIMIT: int = 1000
+
+    TRENDING_BUCKET_SECONDS: int = 60
+    TRENDING_CAPACITY: int = 1000
+    TRENDING_REFRESH_SECONDS: float = 5.0
+    TRENDING_TOP_SIZE: int = 50
+
+    GRAPH_REBUILD_SECONDS: float = 600.0
+    GRAPH_RECENT_TWEETS: int = 1_000_000
+    GRAPH_MAX_FANOUT: int = 200
+    GRAPH_LIKES_WEIGHT: float = 0.5
+
+    EVENTS_BROADCASTER: str = "local"
+    EVENTS_QUEUE_SIZE: int = 100
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0
+
+    NOTIFICATIONS_FLUSH_SECONDS: float = 1.0
+
+    MEDIA_STORAGE: str = "local"
+    MEDIA_ROOT: str = "/app/uploads"
+    S3_ENDPOINT_URL: str = "http://localhost:9000"
+    S3_BUCKET: str = "tribe-media"
+    S3_ACCESS_KEY: str = ""
+    S3_SECRET_KEY: str = ""
+    S3_REGION: str = "us-east-1"
+    S3_PUBLIC_URL: str = ""
+    S3_PART_SIZE: int = 8 * 1024 * 1024
+    S3_PRESIGN_EXPIRES: int = 900
+    MEDIA_CDN_URLS: str = ""
+    MEDIA_URL_SECRET: str = ""
+    MEDIA_URL_CACHE_SIZE: int = 100_000
+    MEDIA_MAX_UPLOAD_BYTES: int = 10 * 1024 * 1024
+    MEDIA_MAX_PIXELS: int = 40_000_000
+    MEDIA_MAX_DIMENSION: int = 10_000
+    MEDIA_MAX_JPEG_SCANS: int = 64
+    MEDIA_VALIDATION_WORKERS: int = 2
+    MEDIA_VALIDATION_TASKS_PER_WORKER: int = 500
+    MEDIA_VALIDATION_CONCURRENCY: int = 4
+    MEDIA_VALIDATION_WAIT_SECONDS: float = 5.0
+
+    REAPER_INTERVAL_SECONDS: float = 30.0
+    REAPER_TWEETS_BATCH: int = 100
+    REAPER_LIKES_BATCH: int = 5000
+
+    PARTITION_SIZE: int = 5_000_000
+    PARTITION_PREMAKE: int = 2
+    PARTITION_CHECK_SECONDS: float = 3600.0
+    PARTITION_RETENTION_DAYS: int = 0
+
+    FEED_WINDOW_DAYS: int = 0
+    FEED_CANDIDATE_LIMIT: int = 1000
+    FEED_RANKING_GRAVITY: float = 1.5
+
+    LIKES_WRITE_BEHIND: bool = False
+    LIKES_FLUSH_SECONDS: float = 0.05
+    LIKES_BUFFER_SIZE: int = 50_000
+
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_LEVEL: int = 6
+
+    API_KEY_SECRET: str = ""
+    API_KEY_PREFIX_LENGTH: int = 8
+    API_KEY_CACHE_TTL: float = 60.0
+    API_KEY_NEGATIVE_CACHE_TTL: float = 5.0
+    API_KEY_CACHE_SIZE: int = 100_000
+
+    THREAD_CACHE_TTL: float = 5.0
+    THREAD_CACHE_SIZE: int = 1000
+    THREAD_MAX_TWEETS: int = 5000
+
+    USER_CACHE_TTL: float = 60.0
+    USER_CACHE_SIZE: int = 100_000
+
+    DB_CREATE_SCHEMA: bool = True
+    DOCS_ENABLED: bool = True
+    STARTUP_WARMUP: bool = True
+    METRICS_TOKEN: str = ""
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,18 @@
+import re
+
+HASHTAG_RE = re.compile(r"(?<![\w#])#(\w{1,100})")
+MENTION_RE = re.compile(r"(?<![\w@])@(\w{1,50})")
+
+
+def extract_hashtags(content: str) -> list[str]:
+    """
+    Извлекает уникальные хэштеги из текста твита в нижнем регистре, без символа #.
+    """
+    return list(dict.fromkeys(tag.lower() for tag in HASHTAG_RE.findall(content)))
+
+
+def extract_mentions(content: str) -> list[str]:
+    """
+    Извлекает уникальные упоминания (@имя) из текста твита в нижнем регистре, без символа @.
+    """
+    return list(dict.fromkeys(name.lower() for name in MENTION_RE.findall(content)))
@@ -0,0 +1,225 @@
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from typing import Iterable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class FeedEvent:
+    """
+    Событие ленты.
+    author_id - автор твита, к которому относится событие: по нему событие
+    доставляется подписчикам автора.
+    """
+
+    type: str
+    tweet_id: int
+    author_id: int
+    user_id: int
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, payload: str) -> "FeedEvent":
+        return cls(**json.loads(payload))
+
+
+class Subscription:
+    """
+    Подписка одного клиента на события авторов, которых он читает.
+    Очередь ограничена: если клиент не успевает читать, подписка закрывается.
+    """
+
+    def __init__(self, user_id: int, author_ids: Iterable[int], queue_size: int):
+        self.user_id = user_id
+        self.author_ids = set(author_ids)
+        self.queue: asyncio.Queue[Optional[FeedEvent]] = asyncio.Queue(queue_size)
+        self.dropped = False
+
+    def push(self, event: FeedEvent) -> bool:
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def close(self):
+        """
+        Закрывает подписку: очередь очищается, клиент получает признак конца потока.
+        """
+        self.dropped = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class EventBus:
+    """
+    Шина событий ленты внутри воркера.
+    Подписки индексируются по автору, поэтому рассылка события стоит
+    O(число подписчиков автора), а не O(число подключений).
+    """
+
+    def __init__(self):
+        self._by_author: dict[int, set[Subscription]] = {}
+        self.dropped = 0
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._by_author)
+
+    def subscribe(self, user_id: int, author_ids: Iterable[int]) -> Subscription:
+        subscription = Subscription(
+            user_id, author_ids, queue_size=settings.EVENTS_QUEUE_SIZE
+        )
+        for author_id in subscription.author_ids:
+            self._by_author.setdefault(author_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        for author_id in subscription.author_ids:
+            subscribers = self._by_author.get(author_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._by_author[author_id]
+
+    def dispatch(self, event: FeedEvent):
+        """
+        Доставляет событие подписчикам автора. Медленные клиенты отключаются.
+        """
+        for subscription in list(self._by_author.get(event.author_id, ())):
+            if not subscription.push(event):
+                self.unsubscribe(subscription)
+                subscription.close()
+                self.dropped += 1
+
+
+class Broadcaster(ABC):
+    """
+    Интерфейс рассылки событий между воркерами.
+    """
+
+    def __init__(self, bus: EventBus):
+        self.bus = bus
+
+    @abstractmethod
+    def publish(self, event: FeedEvent):
+        """
+        Публикует событие. Не блокирует вызывающий код.
+        """
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+
+class LocalBroadcaster(Broadcaster):
+    """
+    Рассылка только внутри текущего воркера.
+    """
+
+    def publish(self, event: FeedEvent):
+        self.bus.dispatch(event)
+
+
+class PostgresBroadcaster(Broadcaster):
+    """
+    Рассылка между воркерами через Postgres LISTEN/NOTIFY.
+    События отправляются из ограниченной очереди фоновой задачей,
+    при переполнении очереди новые события отбрасываются.
+    """
+
+    channel = "tribe_feed_events"
+
+    def __init__(self, bus: EventBus, dsn: str):
+        super().__init__(bus)
+        self.dsn = dsn
+        self._outgoing: asyncio.Queue[FeedEvent] = asyncio.Queue(
+            settings.EVENTS_QUEUE_SIZE * 10
+        )
+        self._connection = None
+        self._sender: Optional[asyncio.Task] = None
+
+    def publish(self, event: FeedEvent):
+        try:
+            self._outgoing.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning("Feed event dropped: outgoing queue is full")
+
+    def _on_notify(self, connection, pid, channel, payload):
+        self.bus.dispatch(FeedEvent.from_json(payload))
+
+    async def _send(self):
+        while True:
+            event = await self._outgoing.get()
+            try:
+                await self._connection.execute(
+                    "SELECT pg_notify($1, $2)", self.channel, event.to_json()
+                )
+            except Exception:
+                logger.exception("Failed to publish feed event")
+
+    async def start(self):
+        import asyncpg
+
+        self._connection = await asyncpg.connect(self.dsn)
+        await self._connection.add_listener(self.channel, self._on_notify)
+        self._sender = asyncio.create_task(self._send())
+
+    async def stop(self):
+        if self._sender is not None:
+            self._sender.cancel()
+        if self._connection is not None:
+            await self._connection.close()
+
+
+event_bus = EventBus()
+_broadcaster: Broadcaster = LocalBroadcaster(event_bus)
+
+
+def get_broadcaster() -> Broadcaster:
+    return _broadcaster
+
+
+def set_broadcaster(broadcaster: Broadcaster):
+    global _broadcaster
+    _broadcaster = broadcaster
+
+
+def create_broadcaster() -> Broadcaster:
+    """
+    Создаёт рассыльщик событий согласно настройке EVENTS_BROADCASTER.
+    """
+    if settings.EVENTS_BROADCASTER == "postgres":
+        from app.db.database import DATABASE_URL
+
+        dsn = DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
+        return PostgresBroadcaster(event_bus, dsn)
+    return LocalBroadcaster(event_bus)
+
+
+def events_enabled() -> bool:
+    """
+    Есть ли кому доставлять события: подписчики в этом воркере или рассылка между воркерами.
+    Позволяет не делать лишних запросов к БД на горячих путях, когда слушателей нет.
+    """
+    return event_bus.has_subscribers or not isinstance(_broadcaster, LocalBroadcaster)
+
+
+def publish_event(event_type: str, tweet_id: int, author_id: int, user_id: int):
+    """
+    Публикует событие ленты через текущий рассыльщик.
+    """
+    _broadcaster.publish(
+        FeedEvent(type=event_type, tweet_id=tweet_id, author_id=author_id, user_id=user_id)
+    )
@@ -0,0 +1,28 @@
+import json
+import zlib
+from typing import AsyncIterable, AsyncIterator
+
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+CHUNK_SIZE = 64 * 1024
+
+
+async def gzip_ndjson(
+    records: AsyncIterable[dict], level: int = 6
+) -> AsyncIterator[bytes]:
+    """
+    Кодирует поток записей в NDJSON и сжимает его gzip на лету.
+    В памяти держится не больше CHUNK_SIZE несжатых байт.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, GZIP_WBITS)
+    buffer: list[bytes] = []
+    size = 0
+    async for record in records:
+        line = json.dumps(record, ensure_ascii=False, default=str).encode() + b"\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            chunk = compressor.compress(b"".join(buffer))
+            buffer, size = [], 0
+            if chunk:
+                yield chunk
+    yield compressor.compress(b"".join(buffer)) + compressor.flush()
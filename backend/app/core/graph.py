@@ -0,0 +1,227 @@
+import asyncio
+import logging
+from array import array
+from collections import Counter
+from typing import TYPE_CHECKING, AsyncIterator, Iterable
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from app.crud.repository import Repository
+
+logger = logging.getLogger(__name__)
+
+
+class CSRAdjacency:
+    """
+    Список смежности в формате CSR на массивах array:
+    соседи вершины base + i лежат в targets[offsets[i]:offsets[i + 1]].
+    Занимает 4 байта на ребро и 4 байта на вершину.
+    """
+
+    def __init__(self, base: int = 0):
+        self.base = base
+        self.offsets = array("I")
+        self.targets = array("i")
+
+    @classmethod
+    async def build(
+        cls, partitions: AsyncIterator[list[tuple[int, int]]], base: int = 0
+    ) -> "CSRAdjacency":
+        """
+        Строит CSR из потока пар (вершина, сосед), отсортированных по вершине.
+        """
+        adjacency = cls(base)
+        offsets, targets = adjacency.offsets, adjacency.targets
+        async for partition in partitions:
+            for source, target in partition:
+                index = source - base
+                while len(offsets) <= index:
+                    offsets.append(len(targets))
+                targets.append(target)
+        offsets.append(len(targets))
+        return adjacency
+
+    def neighbors(self, node: int) -> array:
+        index = node - self.base
+        if index < 0 or index + 1 >= len(self.offsets):
+            return array("i")
+        return self.targets[self.offsets[index] : self.offsets[index + 1]]
+
+    @property
+    def edges(self) -> int:
+        return len(self.targets)
+
+
+class DynamicAdjacency:
+    """
+    CSR-снимок плюс наложенные изменения (добавленные и удалённые рёбра),
+    накопленные с момента построения снимка.
+    """
+
+    def __init__(self, snapshot: CSRAdjacency):
+        self.snapshot = snapshot
+        self.added: dict[int, set[int]] = {}
+        self.removed: dict[int, set[int]] = {}
+
+    def add(self, source: int, target: int):
+        self.removed.get(source, set()).discard(target)
+        self.added.setdefault(source, set()).add(target)
+
+    def remove(self, source: int, target: int):
+        self.added.get(source, set()).discard(target)
+        self.removed.setdefault(source, set()).add(target)
+
+    def neighbors(self, node: int) -> Iterable[int]:
+        base = self.snapshot.neighbors(node)
+        added, removed = self.added.get(node), self.removed.get(node)
+        if not added and not removed:
+            return base
+        return (set(base) | (added or set())) - (removed or set())
+
+
+class FollowGraph:
+    """
+    Граф подписок и лайков в памяти процесса для рекомендаций «кого читать».
+    Снимок периодически перестраивается из БД, между перестроениями
+    изменения применяются инкрементально из follow_user / delete_follow_association
+    и create_like / delete_like.
+    """
+
+    def __init__(self):
+        self.following = DynamicAdjacency(CSRAdjacency())
+        self.liked_tweets = DynamicAdjacency(CSRAdjacency())
+        self.tweet_likers = DynamicAdjacency(CSRAdjacency())
+        self.loaded = False
+        self._journal: list[tuple[str, int, int, bool]] | None = None
+        self._lock = asyncio.Lock()
+
+    def _apply(self, kind: str, source: int, target: int, add: bool):
+        if kind == "follow":
+            pairs = [(self.following, source, target)]
+        else:
+            pairs = [
+                (self.liked_tweets, source, target),
+                (self.tweet_likers, target, source),
+            ]
+        for adjacency, node, neighbor in pairs:
+            if add:
+                adjacency.add(node, neighbor)
+            else:
+                adjacency.remove(node, neighbor)
+        if self._journal is not None:
+            self._journal.append((kind, source, target, add))
+
+    def follow(self, follower_id: int, following_id: int):
+        self._apply("follow", follower_id, following_id, True)
+
+    def unfollow(self, follower_id: int, following_id: int):
+        self._apply("follow", follower_id, following_id, False)
+
+    def like(self, user_id: int, tweet_id: int):
+        self._apply("like", user_id, tweet_id, True)
+
+    def unlike(self, user_id: int, tweet_id: int):
+        self._apply("like", user_id, tweet_id, False)
+
+    async def rebuild(self, repository: "Repository"):
+        """
+        Перестраивает снимки из хранилища и атомарно подменяет текущие.
+        Изменения, пришедшие во время перестроения, переносятся в новые снимки.
+        Лайки загружаются только для последних GRAPH_RECENT_TWEETS твитов.
+        """
+        async with self._lock:
+            await self._rebuild(repository)
+
+    async def ensure_loaded(self, repository: "Repository"):
+        """
+        Строит граф, если фоновая задача ещё не успела его построить.
+        Конкурентные запросы ждут одного построения, а не строят граф каждый.
+        """
+        if self.loaded:
+            return
+        async with self._lock:
+            if not self.loaded:
+                await self._rebuild(repository)
+
+    async def _rebuild(self, repository: "Repository"):
+        self._journal = []
+        try:
+            min_tweet_id = max(
+                1,
+                await repository.get_max_tweet_id() - settings.GRAPH_RECENT_TWEETS + 1,
+            )
+            following = await CSRAdjacency.build(repository.stream_follow_edges())
+            liked_tweets = await CSRAdjacency.build(
+                repository.stream_like_edges(min_tweet_id)
+            )
+            tweet_likers = await CSRAdjacency.build(
+                repository.stream_like_edges(min_tweet_id, by_tweet=True),
+                base=min_tweet_id,
+            )
+            journal = self._journal
+        finally:
+            self._journal = None
+
+        self.following = DynamicAdjacency(following)
+        self.liked_tweets = DynamicAdjacency(liked_tweets)
+        self.tweet_likers = DynamicAdjacency(tweet_likers)
+        for kind, source, target, add in journal:
+            self._apply(kind, source, target, add)
+        self.loaded = True
+        logger.info(
+            "Follow graph rebuilt: %s follows, %s likes",
+            following.edges,
+            liked_tweets.edges,
+        )
+
+    def suggest(self, user_id: int, limit: int) -> list[tuple[int, float]]:
+        """
+        Возвращает до limit пар (user_id, score) с рекомендациями для пользователя.
+        Сигналы: подписки подписок (друзья друзей) и пользователи,
+        лайкавшие те же твиты. Обход каждого уровня ограничен GRAPH_MAX_FANOUT.
+        """
+        fanout = settings.GRAPH_MAX_FANOUT
+        following = list(self.following.neighbors(user_id))
+        scores: Counter = Counter()
+
+        for friend in following[:fanout]:
+            scores.update(list(self.following.neighbors(friend))[:fanout])
+
+        co_likers: Counter = Counter()
+        for tweet_id in list(self.liked_tweets.neighbors(user_id))[-fanout:]:
+            co_likers.update(list(self.tweet_likers.neighbors(tweet_id))[:fanout])
+        for candidate, count in co_likers.items():
+            scores[candidate] += count * settings.GRAPH_LIKES_WEIGHT
+
+        excluded = set(following)
+        excluded.add(user_id)
+        ranked = (
+            (candidate, float(score))
+            for candidate, score in scores.most_common()
+            if candidate not in excluded
+        )
+        result = []
+        for item in ranked:
+            result.append(item)
+            if len(result) == limit:
+                break
+        return result
+
+
+follow_graph = FollowGraph()
+
+
+async def run_graph_worker(session_factory):
+    """
+    Фоновая задача: строит граф при запуске и перестраивает раз в GRAPH_REBUILD_SECONDS.
+    """
+    from app.crud.repository import SqlRepository
+
+    while True:
+        try:
+            async with session_factory() as db:
+                await follow_graph.rebuild(SqlRepository(db))
+        except Exception:
+            logger.exception("Failed to rebuild follow graph")
+        await asyncio.sleep(settings.GRAPH_REBUILD_SECONDS)
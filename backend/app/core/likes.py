@@ -0,0 +1,130 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.events import publish_event
+from app.core.graph import follow_graph
+from app.core.notifications import notification_buffer
+
+logger = logging.getLogger(__name__)
+
+
+class LikeBuffer:
+    """
+    Буфер лайков в памяти воркера для режима LIKES_WRITE_BEHIND.
+    Повторные лайки одного пользователя одному твиту схлопываются.
+    Буфер ограничен LIKES_BUFFER_SIZE: при переполнении лайки пишутся в БД сразу.
+    Лайки, снятые во время сброса, который их записывает, запоминаются
+    и удаляются сбросом после записи. lock только не даёт сбросам пересекаться:
+    методы буфера не ждут, поэтому снятие лайка его не берёт.
+    """
+
+    def __init__(self):
+        self._pending: dict[tuple[int, int], datetime] = {}
+        self._flushing: set[tuple[int, int]] = set()
+        self._unliked: set[tuple[int, int]] = set()
+        self.lock = asyncio.Lock()
+
+    def add(self, user_id: int, tweet_id: int) -> bool:
+        if len(self._pending) >= settings.LIKES_BUFFER_SIZE:
+            return False
+        self._pending.setdefault((user_id, tweet_id), datetime.now(timezone.utc))
+        return True
+
+    def __contains__(self, like: tuple[int, int]) -> bool:
+        return like in self._pending
+
+    def discard(self, user_id: int, tweet_id: int) -> bool:
+        """
+        Убирает лайк из буфера. Лайк из идущего сброса помечается снятым:
+        сброс удалит его после записи. Возвращает True, если лайк был в буфере.
+        """
+        like = (user_id, tweet_id)
+        if like in self._flushing:
+            self._unliked.add(like)
+            self._pending.pop(like, None)
+            return True
+        return self._pending.pop(like, None) is not None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def drain(self) -> list[tuple[int, int, datetime]]:
+        pending, self._pending = self._pending, {}
+        self._flushing = set(pending)
+        return [(user_id, tweet_id, at) for (user_id, tweet_id), at in pending.items()]
+
+    def finish_flush(self) -> set[tuple[int, int]]:
+        """
+        Завершает сброс и возвращает лайки, снятые во время записи.
+        """
+        unliked, self._unliked, self._flushing = self._unliked, set(), set()
+        return unliked
+
+    def restore(self, rows: list[tuple[int, int, datetime]]):
+        """
+        Возвращает в буфер лайки, которые не удалось записать в БД,
+        кроме снятых во время сброса.
+        """
+        unliked = self.finish_flush()
+        for user_id, tweet_id, at in rows:
+            if (user_id, tweet_id) not in unliked:
+                self._pending.setdefault((user_id, tweet_id), at)
+
+
+like_buffer = LikeBuffer()
+
+
+def likes_write_behind() -> bool:
+    return settings.LIKES_WRITE_BEHIND
+
+
+async def flush_like_buffer(db: AsyncSession):
+    """
+    Записывает накопленные лайки в БД одним пакетом и применяет
+    их побочные эффекты: граф рекомендаций, уведомления и события ленты.
+    Лайки, снятые во время записи, сразу удаляются и побочных эффектов не дают.
+    """
+    from app.crud.like import delete_stored_like, flush_likes
+
+    async with like_buffer.lock:
+        rows = like_buffer.drain()
+        if not rows:
+            return
+        try:
+            inserted = await flush_likes(db=db, rows=rows)
+        except BaseException:
+            like_buffer.restore(rows)
+            raise
+        unliked = like_buffer.finish_flush()
+        for user_id, tweet_id in unliked:
+            await delete_stored_like(db, user_id, tweet_id)
+    for user_id, tweet_id, author_id in inserted:
+        if (user_id, tweet_id) in unliked:
+            continue
+        follow_graph.like(user_id, tweet_id)
+        notification_buffer.add_like(tweet_id=tweet_id, actor_id=user_id)
+        if author_id is not None:
+            publish_event("like_created", tweet_id, author_id, user_id)
+
+
+async def run_like_worker(session_factory):
+    """
+    Фоновая задача: раз в LIKES_FLUSH_SECONDS записывает буфер лайков.
+    При отмене выполняет последний сброс. Запускается только при LIKES_WRITE_BEHIND.
+    """
+    try:
+        while True:
+            await asyncio.sleep(settings.LIKES_FLUSH_SECONDS)
+            try:
+                async with session_factory() as db:
+                    await flush_like_buffer(db)
+            except Exception:
+                logger.exception("Failed to flush likes")
+    except asyncio.CancelledError:
+        async with session_factory() as db:
+            await flush_like_buffer(db)
+        raise
@@ -0,0 +1,183 @@
+import time
+from collections import OrderedDict
+from typing import (
+    TYPE_CHECKING,
+    Awaitable,
+    Callable,
+    Generic,
+    Hashable,
+    Iterable,
+    Optional,
+    TypeVar,
+)
+
+from app.core.config import settings
+from app.core.storage import get_media_storage
+from app.models import Tweet, User
+from app.schemas.likes import LikeSchema
+from app.schemas.tweet import TweetSchema
+from app.schemas.user import UserBaseSchema, UserInfoSchema
+
+if TYPE_CHECKING:
+    from app.crud.repository import Repository
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class UserNameCache:
+    """
+    Общий для всех запросов кэш имён пользователей по id.
+    Имена меняются редко, поэтому запись живёт USER_CACHE_TTL секунд,
+    самые давние записи вытесняются.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[int, tuple[str, float]] = OrderedDict()
+
+    def get_many(self, user_ids: Iterable[int]) -> dict[int, str]:
+        now = time.monotonic()
+        names = {}
+        for user_id in user_ids:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                continue
+            if entry[1] <= now:
+                del self._entries[user_id]
+                continue
+            names[user_id] = entry[0]
+        return names
+
+    def set_many(self, names: dict[int, str]):
+        deadline = time.monotonic() + settings.USER_CACHE_TTL
+        for user_id, name in names.items():
+            self._entries[user_id] = (name, deadline)
+            self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+user_name_cache = UserNameCache(settings.USER_CACHE_SIZE)
+
+
+class BatchLoader(Generic[K, V]):
+    """
+    Загрузчик значений по ключам в пределах одного запроса:
+    ключи из load_many дедуплицируются, уже загруженные берутся из памяти,
+    остальные загружаются одним вызовом fetch (одним запросом с IN).
+    Для ключей, которых fetch не вернул, запоминается None.
+    """
+
+    def __init__(self, fetch: Callable[[list[K]], Awaitable[dict[K, V]]]):
+        self._fetch = fetch
+        self._values: dict[K, Optional[V]] = {}
+
+    async def load_many(self, keys: Iterable[K]) -> dict[K, Optional[V]]:
+        keys = list(dict.fromkeys(keys))
+        missing = [key for key in keys if key not in self._values]
+        if missing:
+            fetched = await self._fetch(missing)
+            for key in missing:
+                self._values[key] = fetched.get(key)
+        return {key: self._values[key] for key in keys}
+
+    async def load(self, key: K) -> Optional[V]:
+        return (await self.load_many([key]))[key]
+
+    def prime(self, key: K, value: V):
+        self._values.setdefault(key, value)
+
+
+class Loaders:
+    """
+    Загрузчики пользователей, твитов, лайков и медиа одного запроса.
+    Твиты и профили собираются в схемы ответа из плоских строк:
+    все упомянутые на странице пользователи (авторы, лайкнувшие, подписчики)
+    загружаются одним запросом, а имена, уже известные воркеру,
+    берутся из user_name_cache без обращения к БД.
+    """
+
+    def __init__(self, repository: "Repository"):
+        self.repository = repository
+        self.users: BatchLoader[int, str] = BatchLoader(self._fetch_user_names)
+        self.tweets: BatchLoader[int, Tweet] = BatchLoader(repository.get_tweets_by_ids)
+        self.likers: BatchLoader[int, list[int]] = BatchLoader(
+            repository.get_likers_by_tweet_ids
+        )
+        self.media: BatchLoader[int, list[str]] = BatchLoader(
+            repository.get_media_paths_by_tweet_ids
+        )
+
+    async def _fetch_user_names(self, user_ids: list[int]) -> dict[int, str]:
+        names = user_name_cache.get_many(user_ids)
+        missing = [user_id for user_id in user_ids if user_id not in names]
+        if missing:
+            fetched = await self.repository.get_user_names(missing)
+            user_name_cache.set_many(fetched)
+            names.update(fetched)
+        return names
+
+    def prime_user(self, user: User):
+        self.users.prime(user.id, user.name)
+
+    async def tweet_schemas(self, tweets: list[Tweet]) -> list[TweetSchema]:
+        """
+        Собирает схемы твитов вместе с оригиналами ретвитов и цитат.
+        Сколько бы ни было твитов, выполняется не больше четырёх запросов:
+        оригиналы, лайки, медиа и имена пользователей.
+        """
+        for tweet in tweets:
+            self.tweets.prime(tweet.id, tweet)
+        originals = await self.tweets.load_many(
+            tweet.repost_of_id for tweet in tweets if tweet.repost_of_id is not None
+        )
+        everything = tweets + [tweet for tweet in originals.values() if tweet]
+        tweet_ids = [tweet.id for tweet in everything]
+        likers = await self.likers.load_many(tweet_ids)
+        media = await self.media.load_many(tweet_ids)
+        user_ids = [tweet.author_id for tweet in everything]
+        for ids in likers.values():
+            user_ids.extend(ids or ())
+        names = await self.users.load_many(user_ids)
+        storage = get_media_storage()
+
+        def build(tweet: Tweet, original: Optional[TweetSchema] = None) -> TweetSchema:
+            return TweetSchema(
+                id=tweet.id,
+                content=tweet.content,
+                author=UserBaseSchema(
+                    id=tweet.author_id, name=names[tweet.author_id] or ""
+                ),
+                likes=[
+                    LikeSchema(user_id=user_id, name=names[user_id] or "")
+                    for user_id in likers[tweet.id] or ()
+                ],
+                attachments=[storage.url(path) for path in media[tweet.id] or ()],
+                parent_id=tweet.parent_id,
+                is_retweet=tweet.is_retweet,
+                repost_of=original,
+            )
+
+        result = []
+        for tweet in tweets:
+            original = originals.get(tweet.repost_of_id) if tweet.repost_of_id else None
+            result.append(build(tweet, build(original) if original else None))
+        return result
+
+    async def user_profile(self, user: User) -> UserInfoSchema:
+        """
+        Собирает профиль пользователя с подписчиками и подписками.
+        """
+        self.prime_user(user)
+        followers, following = await self.repository.get_follow_ids(user.id)
+        names = await self.users.load_many([*followers, *following])
+        return UserInfoSchema(
+            id=user.id,
+            name=user.name,
+            followers=[UserBaseSchema(id=i, name=names[i] or "") for i in followers],
+            following=[UserBaseSchema(id=i, name=names[i] or "") for i in following],
+        )
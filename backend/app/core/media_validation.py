@@ -0,0 +1,418 @@
+import asyncio
+import multiprocessing
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+from app.core.config import settings
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+JPEG_SIGNATURE = b"\xff\xd8\xff"
+
+# Критические чанки PNG и вспомогательные, влияющие на отображение.
+# Остальные (tEXt, zTXt, iTXt, eXIf, tIME, чанки APNG и частные) удаляются
+PNG_CRITICAL = {b"IHDR", b"PLTE", b"IDAT", b"IEND"}
+PNG_KEEP = PNG_CRITICAL | {
+    b"tRNS",
+    b"gAMA",
+    b"cHRM",
+    b"sRGB",
+    b"iCCP",
+    b"sBIT",
+    b"bKGD",
+    b"pHYs",
+}
+PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+PNG_BIT_DEPTHS = {
+    0: {1, 2, 4, 8, 16},
+    2: {8, 16},
+    3: {1, 2, 4, 8},
+    4: {8, 16},
+    6: {8, 16},
+}
+# Проходы Adam7: смещение и шаг по x и y
+PNG_ADAM7 = (
+    (0, 0, 8, 8),
+    (4, 0, 8, 8),
+    (0, 4, 4, 8),
+    (2, 0, 4, 4),
+    (0, 2, 2, 4),
+    (1, 0, 2, 2),
+    (0, 1, 1, 2),
+)
+
+# Маркеры SOF0-SOF15, кроме DHT (C4), JPG (C8) и DAC (CC)
+JPEG_FRAME_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+JPEG_STANDALONE_MARKERS = {0x01, *range(0xD0, 0xD8)}
+# APP1 (EXIF, XMP), APP3-APP13 (в том числе IPTC), APP15 и комментарии.
+# APP0 (JFIF), APP2 (ICC-профиль) и APP14 (Adobe) нужны для правильных цветов
+JPEG_DROP_MARKERS = {0xE1, *range(0xE3, 0xEE), 0xEF, 0xFE}
+
+# Сколько байт начала файла просматривается в поисках размеров изображения
+HEADER_LIMIT = 1024 * 1024
+INFLATE_STEP = 1024 * 1024
+
+
+class MediaValidationError(Exception):
+    """
+    Загруженный файл не является допустимым изображением.
+    """
+
+
+class MediaTooLargeError(MediaValidationError):
+    """
+    Загруженный файл больше MEDIA_MAX_UPLOAD_BYTES.
+    """
+
+
+class MediaValidationBusyError(Exception):
+    """
+    Все слоты проверки заняты дольше MEDIA_VALIDATION_WAIT_SECONDS
+    или пул проверки недоступен.
+    """
+
+
+@dataclass(frozen=True)
+class ImageInfo:
+    """
+    Формат и размеры изображения, прочитанные из заголовка.
+    """
+
+    format: str
+    width: int
+    height: int
+
+    @property
+    def extension(self) -> str:
+        return ".png" if self.format == "png" else ".jpg"
+
+    @property
+    def content_type(self) -> str:
+        return f"image/{self.format}"
+
+
+def check_dimensions(width: int, height: int, max_pixels: int, max_dimension: int):
+    if not width or not height:
+        raise MediaValidationError("Image has no pixels")
+    if width > max_dimension or height > max_dimension or width * height > max_pixels:
+        raise MediaValidationError(
+            f"Image dimensions {width}x{height} exceed the allowed limit"
+        )
+
+
+class ImageSniffer:
+    """
+    Инкрементальный разбор заголовка загружаемого файла.
+    Формат определяется по сигнатуре, а не по расширению, размеры -
+    по IHDR (PNG) или маркеру SOF (JPEG). Слишком большие изображения
+    отклоняются, как только прочитан заголовок, не дожидаясь конца загрузки.
+    """
+
+    def __init__(self, max_pixels: int, max_dimension: int):
+        self.max_pixels = max_pixels
+        self.max_dimension = max_dimension
+        self.info: Optional[ImageInfo] = None
+        self._buffer = bytearray()
+        self._format: Optional[str] = None
+        self._position = 2
+
+    def feed(self, chunk: bytes):
+        if self.info is not None:
+            return
+        self._buffer += chunk[: HEADER_LIMIT - len(self._buffer)]
+        if self._format is None:
+            self._detect_format()
+        if self._format == "png":
+            self._parse_png()
+        elif self._format == "jpeg":
+            self._parse_jpeg()
+        if self.info is None and len(self._buffer) >= HEADER_LIMIT:
+            raise MediaValidationError("Image header not found")
+
+    def finish(self) -> ImageInfo:
+        if self.info is None:
+            raise MediaValidationError("Image is truncated")
+        return self.info
+
+    def _detect_format(self):
+        if self._buffer.startswith(PNG_SIGNATURE):
+            self._format = "png"
+        elif self._buffer.startswith(JPEG_SIGNATURE):
+            self._format = "jpeg"
+        elif len(self._buffer) >= len(PNG_SIGNATURE):
+            raise MediaValidationError("File is not a PNG or JPEG image")
+
+    def _found(self, width: int, height: int):
+        check_dimensions(width, height, self.max_pixels, self.max_dimension)
+        self.info = ImageInfo(self._format, width, height)
+
+    def _parse_png(self):
+        if len(self._buffer) < 24:
+            return
+        length, kind, width, height = struct.unpack(">I4sII", self._buffer[8:24])
+        if kind != b"IHDR" or length != 13:
+            raise MediaValidationError("PNG header is missing")
+        self._found(width, height)
+
+    def _parse_jpeg(self):
+        buffer = self._buffer
+        while self._position + 4 <= len(buffer):
+            position = self._position
+            if buffer[position] != 0xFF:
+                raise MediaValidationError("Corrupt JPEG marker")
+            marker = buffer[position + 1]
+            if marker == 0xFF:
+                self._position += 1
+                continue
+            if marker in JPEG_STANDALONE_MARKERS:
+                self._position += 2
+                continue
+            if marker in (0xD8, 0xD9, 0xDA):
+                raise MediaValidationError("JPEG frame header is missing")
+            if marker in JPEG_FRAME_MARKERS:
+                if position + 9 > len(buffer):
+                    return
+                height, width = struct.unpack(">HH", buffer[position + 5 : position + 9])
+                self._found(width, height)
+                return
+            (length,) = struct.unpack(">H", buffer[position + 2 : position + 4])
+            self._position += 2 + length
+
+
+def _png_raw_size(width: int, height: int, bits_per_pixel: int, interlace: int) -> int:
+    """
+    Размер распакованных данных PNG: строки пикселей с байтом фильтра в начале,
+    для чересстрочных изображений - сумма по семи проходам Adam7.
+    """
+
+    def size(w: int, h: int) -> int:
+        return h * (1 + (w * bits_per_pixel + 7) // 8) if w and h else 0
+
+    if not interlace:
+        return size(width, height)
+    return sum(
+        size((width - x + dx - 1) // dx, (height - y + dy - 1) // dy)
+        for x, y, dx, dy in PNG_ADAM7
+    )
+
+
+def _inflate(decompressor, data: bytes, budget: int) -> int:
+    """
+    Распаковывает данные шагами по INFLATE_STEP, не держа результат в памяти,
+    и возвращает число распакованных байт. Больше budget распаковать нельзя.
+    """
+    produced = 0
+    while data:
+        produced += len(decompressor.decompress(data, INFLATE_STEP))
+        if produced > budget:
+            raise MediaValidationError("PNG image data exceeds its dimensions")
+        data = decompressor.unconsumed_tail
+    return produced
+
+
+def _sanitize_png(data: bytes, max_pixels: int, max_dimension: int) -> bytes:
+    output = [PNG_SIGNATURE]
+    position = len(PNG_SIGNATURE)
+    decompressor = zlib.decompressobj()
+    expected = produced = 0
+    header_seen = idat_seen = idat_done = False
+    while True:
+        if position + 12 > len(data):
+            raise MediaValidationError("PNG is truncated")
+        length, kind = struct.unpack(">I4s", data[position : position + 8])
+        end = position + 12 + length
+        if end > len(data):
+            raise MediaValidationError("PNG is truncated")
+        body = data[position + 8 : end - 4]
+        if zlib.crc32(kind + body) != struct.unpack(">I", data[end - 4 : end])[0]:
+            raise MediaValidationError("PNG chunk checksum mismatch")
+        if not header_seen:
+            if kind != b"IHDR" or length != 13:
+                raise MediaValidationError("PNG header is missing")
+            width, height, depth, color, compression, filtering, interlace = (
+                struct.unpack(">IIBBBBB", body)
+            )
+            check_dimensions(width, height, max_pixels, max_dimension)
+            if depth not in PNG_BIT_DEPTHS.get(color, ()) or compression or filtering:
+                raise MediaValidationError("Unsupported PNG format")
+            if interlace > 1:
+                raise MediaValidationError("Unsupported PNG format")
+            expected = _png_raw_size(width, height, depth * PNG_CHANNELS[color], interlace)
+            header_seen = True
+        elif kind == b"IHDR":
+            raise MediaValidationError("Duplicate PNG header")
+        elif kind == b"IDAT":
+            if idat_done:
+                raise MediaValidationError("PNG image data is not contiguous")
+            idat_seen = True
+            produced += _inflate(decompressor, body, expected - produced)
+        else:
+            idat_done = idat_seen
+            if not kind[0] & 0x20 and kind not in PNG_CRITICAL:
+                raise MediaValidationError("Unknown critical PNG chunk")
+        if kind in PNG_KEEP:
+            output.append(data[position:end])
+        position = end
+        if kind == b"IEND":
+            break
+    if not decompressor.eof or decompressor.unused_data or produced != expected:
+        raise MediaValidationError("PNG image data is corrupt")
+    return b"".join(output)
+
+
+def _jpeg_scan_end(data: bytes, position: int) -> int:
+    """
+    Находит конец энтропийно-кодированных данных скана: первый маркер,
+    кроме вставленных нулевых байт и маркеров перезапуска.
+    """
+    while True:
+        position = data.find(b"\xff", position)
+        if position < 0 or position + 1 >= len(data):
+            raise MediaValidationError("JPEG is truncated")
+        following = data[position + 1]
+        if following == 0xFF:
+            position += 1
+        elif following == 0x00 or 0xD0 <= following <= 0xD7:
+            position += 2
+        else:
+            return position
+
+
+def _sanitize_jpeg(
+    data: bytes, max_pixels: int, max_dimension: int, max_scans: int
+) -> bytes:
+    output = [data[:2]]
+    position = 2
+    frame_seen = False
+    scans = 0
+    while True:
+        if position + 2 > len(data) or data[position] != 0xFF:
+            raise MediaValidationError("Corrupt JPEG marker")
+        marker = data[position + 1]
+        if marker == 0xFF:
+            position += 1
+            continue
+        if marker == 0xD9:
+            if not scans:
+                raise MediaValidationError("JPEG has no image data")
+            output.append(b"\xff\xd9")
+            break
+        if marker in JPEG_STANDALONE_MARKERS:
+            position += 2
+            continue
+        if marker in (0x00, 0xD8) or position + 4 > len(data):
+            raise MediaValidationError("Corrupt JPEG marker")
+        (length,) = struct.unpack(">H", data[position + 2 : position + 4])
+        end = position + 2 + length
+        if length < 2 or end > len(data):
+            raise MediaValidationError("JPEG is truncated")
+        if marker in JPEG_FRAME_MARKERS:
+            if frame_seen or length < 8:
+                raise MediaValidationError("Corrupt JPEG frame header")
+            height, width = struct.unpack(">HH", data[position + 5 : position + 9])
+            check_dimensions(width, height, max_pixels, max_dimension)
+            frame_seen = True
+        if marker == 0xDA:
+            scans += 1
+            if not frame_seen:
+                raise MediaValidationError("JPEG frame header is missing")
+            if scans > max_scans:
+                raise MediaValidationError("JPEG has too many scans")
+            end = _jpeg_scan_end(data, end)
+        if marker not in JPEG_DROP_MARKERS:
+            output.append(data[position:end])
+        position = end
+    return b"".join(output)
+
+
+def sanitize_image(
+    data: bytes, max_pixels: int, max_dimension: int, max_scans: int
+) -> bytes:
+    """
+    Полностью проверяет изображение и возвращает его копию без метаданных.
+    PNG: контрольные суммы чанков, допустимость формата и распаковка всех IDAT
+    с проверкой, что данных ровно столько, сколько следует из размеров.
+    JPEG: структура сегментов и сканов до маркера EOI и число сканов.
+    EXIF, XMP, текстовые чанки и комментарии удаляются, данные после конца
+    изображения отбрасываются. Выполняется в процессе пула проверки.
+    """
+    try:
+        if data.startswith(PNG_SIGNATURE):
+            return _sanitize_png(data, max_pixels, max_dimension)
+        if data.startswith(JPEG_SIGNATURE):
+            return _sanitize_jpeg(data, max_pixels, max_dimension, max_scans)
+    except (struct.error, zlib.error) as exc:
+        raise MediaValidationError("Image is corrupt") from exc
+    raise MediaValidationError("File is not a PNG or JPEG image")
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_slots = asyncio.Semaphore(settings.MEDIA_VALIDATION_CONCURRENCY)
+
+
+def get_validation_pool() -> ProcessPoolExecutor:
+    """
+    Пул процессов проверки изображений, создаётся при первой загрузке.
+    Процессы запускаются через spawn и перезапускаются после
+    MEDIA_VALIDATION_TASKS_PER_WORKER проверок, чтобы не накапливать память.
+    """
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.MEDIA_VALIDATION_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            max_tasks_per_child=settings.MEDIA_VALIDATION_TASKS_PER_WORKER,
+        )
+    return _pool
+
+
+def shutdown_validation_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def validate_upload(chunks: AsyncIterator[bytes]) -> tuple[ImageInfo, bytes]:
+    """
+    Читает загружаемый файл, проверяя заголовок и размеры по мере чтения,
+    затем проверяет изображение целиком и удаляет метаданные в пуле процессов.
+    Одновременно обрабатывается не больше MEDIA_VALIDATION_CONCURRENCY файлов
+    не больше MEDIA_MAX_UPLOAD_BYTES каждый, поэтому поток загрузок не может
+    занять больше памяти, чем их произведение. Остальные ждут свободного слота
+    не дольше MEDIA_VALIDATION_WAIT_SECONDS.
+    """
+    try:
+        await asyncio.wait_for(_slots.acquire(), settings.MEDIA_VALIDATION_WAIT_SECONDS)
+    except asyncio.TimeoutError:
+        raise MediaValidationBusyError("Too many uploads in progress")
+    try:
+        sniffer = ImageSniffer(settings.MEDIA_MAX_PIXELS, settings.MEDIA_MAX_DIMENSION)
+        data = bytearray()
+        async for chunk in chunks:
+            if len(data) + len(chunk) > settings.MEDIA_MAX_UPLOAD_BYTES:
+                raise MediaTooLargeError("File is too large")
+            sniffer.feed(chunk)
+            data += chunk
+        info = sniffer.finish()
+        loop = asyncio.get_running_loop()
+        try:
+            content = await loop.run_in_executor(
+                get_validation_pool(),
+                sanitize_image,
+                bytes(data),
+                settings.MEDIA_MAX_PIXELS,
+                settings.MEDIA_MAX_DIMENSION,
+                settings.MEDIA_MAX_JPEG_SCANS,
+            )
+        except BrokenProcessPool:
+            # Процесс проверки упал (например, убит по памяти) - следующая
+            # загрузка создаст новый пул
+            shutdown_validation_pool()
+            raise MediaValidationBusyError("Media validation is unavailable")
+    finally:
+        _slots.release()
+    return info, content
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.notifications import flush_notifications
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationBuffer:
+    """
+    Буфер уведомлений в памяти воркера.
+    Уведомления об одном твите (или о подписках на одного пользователя),
+    пришедшие между сбросами, схлопываются в одну строку, поэтому вирусный твит
+    порождает одно обновление записи за период сброса, а не вставку на каждый лайк.
+    """
+
+    def __init__(self):
+        self._likes: dict[int, dict] = {}
+        self._follows: dict[int, dict] = {}
+
+    @staticmethod
+    def _add(pending: dict[int, dict], key: int, actor_id: int, row: dict):
+        entry = pending.get(key)
+        if entry is None:
+            pending[key] = {**row, "actor_id": actor_id, "actors_count": 1}
+        else:
+            entry["actor_id"] = actor_id
+            entry["actors_count"] += 1
+            entry["updated_at"] = row["updated_at"]
+
+    def add_like(self, tweet_id: int, actor_id: int):
+        now = datetime.now(timezone.utc)
+        row = {"tweet_id": tweet_id, "updated_at": now}
+        self._add(self._likes, tweet_id, actor_id, row)
+
+    def add_follow(self, user_id: int, actor_id: int):
+        now = datetime.now(timezone.utc)
+        row = {"user_id": user_id, "updated_at": now}
+        self._add(self._follows, user_id, actor_id, row)
+
+    def __len__(self) -> int:
+        return len(self._likes) + len(self._follows)
+
+    def drain(self) -> tuple[list[dict], list[dict]]:
+        likes, self._likes = self._likes, {}
+        follows, self._follows = self._follows, {}
+        return list(likes.values()), list(follows.values())
+
+    def restore(self, likes: list[dict], follows: list[dict]):
+        """
+        Возвращает в буфер строки, которые не удалось записать в БД.
+        """
+        for pending, rows, key in (
+            (self._likes, likes, "tweet_id"),
+            (self._follows, follows, "user_id"),
+        ):
+            for row in rows:
+                entry = pending.get(row[key])
+                if entry is None:
+                    pending[row[key]] = row
+                else:
+                    entry["actors_count"] += row["actors_count"]
+
+
+notification_buffer = NotificationBuffer()
+
+
+async def flush_notification_buffer(db: AsyncSession):
+    """
+    Записывает накопленные уведомления в БД одним пакетом.
+    """
+    likes, follows = notification_buffer.drain()
+    if not likes and not follows:
+        return
+    try:
+        await flush_notifications(db=db, likes=likes, follows=follows)
+    except BaseException:
+        notification_buffer.restore(likes, follows)
+        raise
+
+
+async def run_notification_worker(session_factory):
+    """
+    Фоновая задача: раз в NOTIFICATIONS_FLUSH_SECONDS записывает буфер уведомлений.
+    При отмене выполняет последний сброс.
+    """
+    try:
+        while True:
+            await asyncio.sleep(settings.NOTIFICATIONS_FLUSH_SECONDS)
+            try:
+                async with session_factory() as db:
+                    await flush_notification_buffer(db)
+            except Exception:
+                logger.exception("Failed to flush notifications")
+    except asyncio.CancelledError:
+        async with session_factory() as db:
+            await flush_notification_buffer(db)
+        raise
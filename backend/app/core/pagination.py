@@ -0,0 +1,42 @@
+import base64
+import json
+from typing import Any, Optional
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Кодирует значения ключа последней записи страницы в непрозрачный курсор.
+    """
+    raw = json.dumps(values, default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], size: int) -> Optional[list]:
+    """
+    Декодирует курсор, полученный от клиента.
+    Если курсор повреждён - выбрасывается HTTPException с 400 статус кодом.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
+
+
+def decode_id_cursor(cursor: Optional[str]) -> Optional[int]:
+    """
+    Декодирует курсор, состоящий из одного id записи.
+    """
+    values = decode_cursor(cursor, size=1)
+    if values is None:
+        return None
+    if not isinstance(values[0], int):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values[0]
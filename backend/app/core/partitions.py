@@ -0,0 +1,121 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import DDL, Table, event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Таблица -> столбец ключа секционирования.
+# Секции tweets и likes выровнены: likes_pNNNN содержит лайки твитов из tweets_pNNNN.
+PARTITIONED_TABLES = {"tweets": "id", "likes": "tweet_id"}
+
+
+def partition_name(table: str, index: int) -> str:
+    return f"{table}_p{index:04d}"
+
+
+def partition_index(tweet_id: int) -> int:
+    """
+    Номер секции, в которую попадает твит.
+    """
+    return max(tweet_id - 1, 0) // settings.PARTITION_SIZE
+
+
+def partition_bounds(index: int) -> tuple[int, int]:
+    """
+    Границы секции [lower, upper) по id твита.
+    """
+    lower = index * settings.PARTITION_SIZE + 1
+    return lower, lower + settings.PARTITION_SIZE
+
+
+def create_partition_sql(table: str, index: int) -> str:
+    lower, upper = partition_bounds(index)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, index)} "
+        f"PARTITION OF {table} FOR VALUES FROM ({lower}) TO ({upper})"
+    )
+
+
+def add_initial_partitions(table: Table):
+    """
+    Создаёт первые секции сразу после создания таблицы в create_all.
+    """
+    for index in range(settings.PARTITION_PREMAKE + 1):
+        event.listen(table, "after_create", DDL(create_partition_sql(table.name, index)))
+
+
+async def ensure_partitions(db: AsyncSession) -> list[str]:
+    """
+    Создаёт секции tweets и likes наперёд: на PARTITION_PREMAKE секций
+    дальше той, в которую пишутся новые твиты.
+    """
+    from app.crud.graph import get_max_tweet_id
+    from app.crud.partitions import create_partition, get_partition_indexes
+
+    last = partition_index(await get_max_tweet_id(db)) + settings.PARTITION_PREMAKE
+    created = []
+    for table in PARTITIONED_TABLES:
+        existing = set(await get_partition_indexes(db, table))
+        for index in range(last + 1):
+            if index not in existing:
+                await create_partition(db, table, index)
+                created.append(partition_name(table, index))
+    await db.commit()
+    return created
+
+
+async def archive_partitions(db: AsyncSession) -> list[str]:
+    """
+    Отсоединяет секции, все твиты которых старше PARTITION_RETENTION_DAYS.
+    Отсоединённые таблицы tweets_pNNNN и likes_pNNNN (и media_pNNNN с медиа
+    этих твитов) остаются в БД как архив и больше не участвуют в запросах.
+    Текущая секция не архивируется никогда.
+    """
+    from app.crud.graph import get_max_tweet_id
+    from app.crud.partitions import (
+        archive_partition_dependents,
+        detach_partition,
+        get_partition_indexes,
+        get_partition_latest_created_at,
+    )
+
+    if not settings.PARTITION_RETENTION_DAYS:
+        return []
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.PARTITION_RETENTION_DAYS)
+    current = partition_index(await get_max_tweet_id(db))
+    archived = []
+    for index in sorted(await get_partition_indexes(db, "tweets")):
+        if index >= current:
+            break
+        latest = await get_partition_latest_created_at(db, partition_name("tweets", index))
+        if latest is not None and latest >= cutoff:
+            break
+        await detach_partition(db, "likes", partition_name("likes", index))
+        await archive_partition_dependents(db, index)
+        await detach_partition(db, "tweets", partition_name("tweets", index))
+        await db.commit()
+        archived.append(partition_name("tweets", index))
+        logger.info("Archived partition %s", partition_name("tweets", index))
+    return archived
+
+
+async def run_partition_worker(session_factory):
+    """
+    Фоновая задача: раз в PARTITION_CHECK_SECONDS создаёт будущие секции
+    и архивирует устаревшие.
+    """
+    while True:
+        try:
+            async with session_factory() as db:
+                created = await ensure_partitions(db)
+                if created:
+                    logger.info("Created partitions: %s", ", ".join(created))
+                await archive_partitions(db)
+        except Exception:
+            logger.exception("Failed to maintain partitions")
+        await asyncio.sleep(settings.PARTITION_CHECK_SECONDS)
@@ -0,0 +1,98 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Optional
+
+from app.core.config import settings
+
+
+@dataclass
+class Candidate:
+    """
+    Твит-кандидат в ленту с признаками для ранжирования.
+    """
+
+    tweet_id: int
+    author_id: int
+    created_at: datetime
+    likes: int = 0
+    score: float = 0.0
+
+
+class RankingStage(ABC):
+    """
+    Шаг конвейера ранжирования. Обрабатывает сразу всю пачку кандидатов.
+    """
+
+    @abstractmethod
+    def apply(self, candidates: list[Candidate], now: datetime) -> None:
+        """
+        Обновляет score кандидатов.
+        """
+
+
+class LikesStage(RankingStage):
+    """
+    Оценка - количество лайков.
+    """
+
+    def apply(self, candidates: list[Candidate], now: datetime) -> None:
+        for candidate in candidates:
+            candidate.score = float(candidate.likes)
+
+
+class TimeDecayStage(RankingStage):
+    """
+    Оценка с затуханием по времени: (лайки + 1) / (возраст в часах + 2) ** gravity.
+    Старые популярные твиты постепенно уступают место новым.
+    """
+
+    def __init__(self, gravity: float):
+        self.gravity = gravity
+
+    def apply(self, candidates: list[Candidate], now: datetime) -> None:
+        for candidate in candidates:
+            age_hours = max((now - candidate.created_at).total_seconds(), 0) / 3600
+            candidate.score = (candidate.likes + 1) / (age_hours + 2) ** self.gravity
+
+
+class RankingPipeline:
+    """
+    Последовательность шагов ранжирования и сортировка по убыванию score,
+    при равенстве - по возрастанию tweet_id.
+    """
+
+    def __init__(self, stages: Iterable[RankingStage]):
+        self.stages = list(stages)
+
+    def rank(
+        self,
+        candidates: list[Candidate],
+        now: datetime,
+        limit: int,
+        after: Optional[tuple[float, int]] = None,
+    ) -> list[Candidate]:
+        """
+        Возвращает до limit лучших кандидатов, начиная после ключа after = (score, tweet_id).
+        """
+        for stage in self.stages:
+            stage.apply(candidates, now)
+        ranked = sorted(candidates, key=lambda c: (-c.score, c.tweet_id))
+        if after is not None:
+            score, tweet_id = after
+            ranked = [c for c in ranked if (-c.score, c.tweet_id) > (-score, tweet_id)]
+        return ranked[:limit]
+
+
+_pipelines: dict[str, RankingPipeline] = {
+    "top": RankingPipeline([LikesStage()]),
+    "ranked": RankingPipeline([TimeDecayStage(settings.FEED_RANKING_GRAVITY)]),
+}
+
+
+def get_ranking_pipeline(name: str) -> RankingPipeline:
+    return _pipelines[name]
+
+
+def set_ranking_pipeline(name: str, pipeline: RankingPipeline):
+    _pipelines[name] = pipeline
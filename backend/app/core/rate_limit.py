@@ -0,0 +1,95 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+
+
+@dataclass
+class TokenBucket:
+    """
+    Ведро токенов для одного ключа (Api-Key + эндпоинт).
+    """
+
+    tokens: float
+    updated_at: float
+
+    def consume(self, capacity: int, refill_rate: float, now: float) -> float:
+        """
+        Пополняет ведро за прошедшее время и пытается забрать один токен.
+        Возвращает 0, если запрос разрешён, иначе - количество секунд до появления токена.
+        """
+        elapsed = max(0.0, now - self.updated_at)
+        self.tokens = min(float(capacity), self.tokens + elapsed * refill_rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / refill_rate
+
+
+class RateLimitBackend(ABC):
+    """
+    Интерфейс хранилища ведер токенов.
+    Для одного узла используется InMemoryRateLimitBackend,
+    для нескольких узлов реализуется поверх общего хранилища (Redis и т.п.).
+    """
+
+    @abstractmethod
+    async def consume(self, key: str, capacity: int, refill_rate: float) -> float:
+        """
+        Забирает токен из ведра по ключу.
+        Возвращает 0, если запрос разрешён, иначе - значение для Retry-After в секундах.
+        """
+
+    async def reset(self) -> None:
+        """
+        Очищает все ведра.
+        """
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Ведра токенов в памяти процесса.
+    Количество ключей ограничено max_keys, самые давние ключи вытесняются.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._lock = asyncio.Lock()
+
+    async def consume(self, key: str, capacity: int, refill_rate: float) -> float:
+        now = time.monotonic()
+        async with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(tokens=float(capacity), updated_at=now)
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            return bucket.consume(capacity, refill_rate, now)
+
+    async def reset(self) -> None:
+        async with self._lock:
+            self._buckets.clear()
+
+
+_backend: RateLimitBackend = InMemoryRateLimitBackend()
+
+
+def get_rate_limit_backend() -> RateLimitBackend:
+    """
+    Возвращает текущее хранилище ведер токенов.
+    """
+    return _backend
+
+
+def set_rate_limit_backend(backend: RateLimitBackend) -> None:
+    """
+    Подменяет хранилище ведер токенов (например, на общее для нескольких узлов).
+    """
+    global _backend
+    _backend = backend
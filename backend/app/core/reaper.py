@@ -0,0 +1,53 @@
+import asyncio
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.storage import MediaStorageError, get_media_storage
+from app.crud.tweet import (
+    get_deleted_tweet_ids,
+    purge_tweet_likes,
+    purge_tweet_media,
+    purge_tweets,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def reap_deleted_tweets(db: AsyncSession) -> int:
+    """
+    Физически удаляет до REAPER_TWEETS_BATCH твитов, помеченных удалёнными.
+    Лайки удаляются пачками по REAPER_LIKES_BATCH в отдельных транзакциях,
+    чтобы не держать долгих блокировок на таблице likes.
+    Возвращает количество удалённых твитов.
+    """
+    tweet_ids = await get_deleted_tweet_ids(db, settings.REAPER_TWEETS_BATCH)
+    if not tweet_ids:
+        return 0
+
+    while await purge_tweet_likes(db, tweet_ids, settings.REAPER_LIKES_BATCH):
+        await asyncio.sleep(0)
+
+    storage = get_media_storage()
+    for key in await purge_tweet_media(db, tweet_ids):
+        try:
+            await storage.delete(key)
+        except MediaStorageError:
+            logger.warning("Failed to delete media file %s", key)
+
+    return await purge_tweets(db, tweet_ids)
+
+
+async def run_reaper_worker(session_factory):
+    """
+    Фоновая задача: раз в REAPER_INTERVAL_SECONDS удаляет помеченные удалёнными твиты.
+    """
+    while True:
+        try:
+            async with session_factory() as db:
+                while await reap_deleted_tweets(db):
+                    pass
+        except Exception:
+            logger.exception("Failed to purge deleted tweets")
+        await asyncio.sleep(settings.REAPER_INTERVAL_SECONDS)
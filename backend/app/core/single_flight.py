@@ -0,0 +1,103 @@
+import asyncio
+import functools
+import inspect
+from typing import Any, Awaitable, Callable, Hashable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class SingleFlight:
+    """
+    Объединение одинаковых конкурентных запросов (single-flight).
+    Пока выполняется вызов с некоторым ключом, все остальные вызовы с тем же ключом
+    не идут в БД, а ожидают результат уже запущенного вызова.
+    """
+
+    def __init__(self):
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.executions = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Выполняет fn или присоединяется к уже выполняющемуся вызову с тем же ключом.
+        """
+        self.calls += 1
+        future = self._in_flight.get(key)
+        if future is None:
+            self.executions += 1
+            future = asyncio.ensure_future(fn())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # shield не даёт отмене одного из ожидающих запросов отменить общий вызов
+        return await asyncio.shield(future)
+
+    @property
+    def shared(self) -> int:
+        return self.calls - self.executions
+
+    @property
+    def coalescing_ratio(self) -> float:
+        """
+        Доля вызовов, получивших результат чужого запроса к БД.
+        """
+        return self.shared / self.calls if self.calls else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "shared": self.shared,
+            "in_flight": len(self._in_flight),
+            "coalescing_ratio": round(self.coalescing_ratio, 4),
+        }
+
+
+_groups: dict[str, SingleFlight] = {}
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """
+    Возвращает (создавая при необходимости) группу single-flight по имени.
+    """
+    if name not in _groups:
+        _groups[name] = SingleFlight()
+    return _groups[name]
+
+
+def single_flight_stats() -> dict:
+    """
+    Статистика по всем группам single-flight текущего воркера.
+    """
+    return {name: group.stats() for name, group in _groups.items()}
+
+
+def single_flight(func: Callable[..., Awaitable[Any]]):
+    """
+    Декоратор для читающих crud-функций.
+    Ключом служат имя функции и все аргументы, кроме сессии db.
+    Общий запрос выполняется в собственной короткой сессии на том же engine,
+    что и db: отмена или закрытие сессии запроса, начавшего вызов, не обрывает
+    его для остальных ожидающих. После закрытия этой сессии объекты результата
+    ни к чему не привязаны и не подгружают атрибуты лениво.
+    """
+    signature = inspect.signature(func)
+    group = get_single_flight(func.__name__)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = tuple(
+            (name, value) for name, value in bound.arguments.items() if name != "db"
+        )
+        bind = bound.arguments["db"].bind
+
+        async def call():
+            async with AsyncSession(bind=bind, expire_on_commit=False) as db:
+                arguments = {**bound.arguments, "db": db}
+                return await func(**arguments)
+
+        return await group.do(key, call)
+
+    return wrapper
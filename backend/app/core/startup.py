@@ -0,0 +1,66 @@
+import logging
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfile:
+    """
+    Профиль запуска воркера: длительность этапов от начала импорта app.main
+    и время до обработки первого запроса.
+    Модуль импортируется в app.main первым и сам не тянет тяжёлых зависимостей,
+    поэтому этап imports включает загрузку FastAPI, SQLAlchemy и pydantic.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.ready: Optional[float] = None
+        self.first_request: Optional[float] = None
+        self._last = self.started
+
+    def mark(self, phase: str):
+        """
+        Завершает этап phase: его длительность отсчитывается от конца предыдущего этапа.
+        """
+        now = time.perf_counter()
+        self.phases[phase] = now - self._last
+        self._last = now
+
+    def mark_ready(self):
+        self.ready = time.perf_counter() - self.started
+        logger.info("Worker ready in %.3fs: %s", self.ready, self.phases)
+
+    def mark_first_request(self):
+        if self.first_request is None:
+            self.first_request = time.perf_counter() - self.started
+            logger.info("First request served %.3fs after start", self.first_request)
+
+    def as_dict(self) -> dict:
+        return {
+            "phases": {phase: round(seconds, 4) for phase, seconds in self.phases.items()},
+            "ready_seconds": self.ready and round(self.ready, 4),
+            "first_request_seconds": self.first_request and round(self.first_request, 4),
+        }
+
+
+startup_profile = StartupProfile()
+
+
+def warm_up(app):
+    """
+    Выполняет отложенную подготовку, которую иначе оплатил бы первый запрос:
+    конфигурацию мапперов SQLAlchemy и, если документация включена, сборку схемы OpenAPI.
+    """
+    from sqlalchemy.orm import configure_mappers
+
+    started = time.perf_counter()
+    try:
+        configure_mappers()
+        if app.openapi_url:
+            app.openapi()
+    except Exception:
+        logger.exception("Warm-up failed")
+        return
+    logger.info("Warm-up finished in %.3fs", time.perf_counter() - started)
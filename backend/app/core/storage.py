@@ -0,0 +1,485 @@
+import base64
+import datetime
+import hashlib
+import hmac
+import os
+import re
+import urllib.error
+import urllib.request
+import zlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import AsyncIterator, Optional, Sequence
+from urllib.parse import quote, unquote, urlsplit
+from xml.etree import ElementTree
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+
+def _query_string(query: dict[str, str]) -> str:
+    """
+    Строка запроса в каноничном для AWS Signature V4 виде.
+    """
+    return "&".join(
+        f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}"
+        for k, v in sorted(query.items())
+    )
+
+
+@dataclass(frozen=True)
+class PresignedUpload:
+    """
+    Данные для прямой загрузки файла клиентом в хранилище, минуя бэкенд.
+    """
+
+    url: str
+    method: str = "PUT"
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+# Префикс старых путей медиафайлов. Одно и то же регулярное выражение
+# используется в normalize_media_key и в SQL (app.crud.media.normalize_media_paths),
+# поэтому синтаксис ограничен общим для Python и Postgres.
+LEGACY_MEDIA_PREFIX = "^/*(app/)?(uploads/)?"
+
+
+def normalize_media_key(path: str) -> str:
+    """
+    Приводит путь медиафайла к ключу хранилища.
+    Старые записи хранят путь вида uploads/<имя>/<файл> или /app/uploads/<имя>/<файл>.
+    """
+    return re.sub(LEGACY_MEDIA_PREFIX, "", path, count=1)
+
+
+class MediaURLResolver:
+    """
+    Строит публичные URL медиафайлов.
+    Файл закрепляется за одним из base_urls по хэшу ключа, так что запросы
+    распределяются между доменами, а URL файла всегда один и тот же.
+    Ключи не перезаписываются (каждая загрузка получает новое имя), поэтому
+    URL неизменяем и может кэшироваться клиентами бессрочно.
+    Если задан secret, к URL добавляется подпись ?s=, совместимая
+    с модулем nginx secure_link: md5("<путь> <secret>") в base64url.
+    Готовые URL кэшируются, повторная отрисовка ленты не строит строки заново.
+    """
+
+    def __init__(self, base_urls: Sequence[str], secret: str = "", cache_size: int = 0):
+        self.base_urls = [url.rstrip("/") for url in base_urls]
+        self.secret = secret
+        self.url = lru_cache(maxsize=cache_size or settings.MEDIA_URL_CACHE_SIZE)(
+            self._build
+        )
+
+    def _sign(self, path: str) -> str:
+        digest = hashlib.md5(f"{path} {self.secret}".encode()).digest()
+        return base64.urlsafe_b64encode(digest).decode().rstrip("=")
+
+    def _build(self, key: str) -> str:
+        key = quote(normalize_media_key(key), safe="/-_.~")
+        base_url = self.base_urls[zlib.crc32(key.encode()) % len(self.base_urls)]
+        url = f"{base_url}/{key}"
+        if self.secret:
+            url = f"{url}?s={self._sign(unquote(urlsplit(url).path))}"
+        return url
+
+
+class MediaStorageError(Exception):
+    """
+    Ошибка при обращении к хранилищу медиафайлов.
+    """
+
+
+class MediaStorage(ABC):
+    """
+    Интерфейс хранилища медиафайлов. Файлы адресуются ключом вида "<user_id>/<имя>".
+    Публичные URL строит urls.
+    """
+
+    urls: MediaURLResolver
+
+    @abstractmethod
+    async def save(
+        self, key: str, chunks: AsyncIterator[bytes], content_type: str
+    ) -> int:
+        """
+        Сохраняет файл, читая его потоком. Возвращает размер в байтах.
+        """
+
+    @abstractmethod
+    async def read(self, key: str, limit: int) -> bytes:
+        """
+        Читает не больше limit первых байт файла.
+        """
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """
+        Удаляет файл. Отсутствие файла ошибкой не считается.
+        """
+
+    def url(self, key: str) -> str:
+        """
+        Публичный URL файла.
+        """
+        return self.urls.url(key)
+
+    def presigned_upload(
+        self, key: str, content_type: str
+    ) -> Optional[PresignedUpload]:
+        """
+        Подписанный URL для прямой загрузки. None, если хранилище это не поддерживает.
+        """
+        return None
+
+
+class LocalMediaStorage(MediaStorage):
+    """
+    Хранилище на локальном диске. Файлы раздаются nginx из общего тома.
+    """
+
+    def __init__(
+        self, root: str, base_url: str, urls: Optional[MediaURLResolver] = None
+    ):
+        self.root = Path(root)
+        self.urls = urls or MediaURLResolver([base_url])
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root.resolve() not in path.parents:
+            raise MediaStorageError(f"Invalid media key: {key}")
+        return path
+
+    async def save(
+        self, key: str, chunks: AsyncIterator[bytes], content_type: str
+    ) -> int:
+        path = self._path(key)
+        await run_in_threadpool(path.parent.mkdir, parents=True, exist_ok=True)
+        size = 0
+        file = await run_in_threadpool(open, path, "wb")
+        try:
+            async for chunk in chunks:
+                await run_in_threadpool(file.write, chunk)
+                size += len(chunk)
+        finally:
+            await run_in_threadpool(file.close)
+        return size
+
+    async def read(self, key: str, limit: int) -> bytes:
+        path = self._path(key)
+        try:
+            file = await run_in_threadpool(open, path, "rb")
+        except FileNotFoundError as exc:
+            raise MediaStorageError(f"Media file not found: {key}") from exc
+        try:
+            return await run_in_threadpool(file.read, limit)
+        finally:
+            await run_in_threadpool(file.close)
+
+    async def delete(self, key: str) -> None:
+        path = self._path(key)
+        try:
+            await run_in_threadpool(os.remove, path)
+        except FileNotFoundError:
+            pass
+
+
+class S3MediaStorage(MediaStorage):
+    """
+    Хранилище в S3-совместимом объектном хранилище (AWS S3, MinIO и т.п.).
+    Запросы подписываются AWS Signature V4, используется path-style адресация.
+    Большие файлы загружаются multipart-загрузкой частями по part_size байт,
+    поэтому в памяти держится не больше одной части.
+    """
+
+    def __init__(
+        self,
+        endpoint_url: str,
+        bucket: str,
+        access_key: str,
+        secret_key: str,
+        region: str = "us-east-1",
+        public_url: str = "",
+        part_size: int = 8 * 1024 * 1024,
+        presign_expires: int = 900,
+        urls: Optional[MediaURLResolver] = None,
+    ):
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.public_url = (public_url or f"{self.endpoint_url}/{bucket}").rstrip("/")
+        self.part_size = max(part_size, 5 * 1024 * 1024)
+        self.presign_expires = presign_expires
+        self.host = urlsplit(self.endpoint_url).netloc
+        self.urls = urls or MediaURLResolver([self.public_url])
+
+    # --- Подпись запросов (AWS Signature V4) ---
+
+    def _object_path(self, key: str) -> str:
+        return f"/{self.bucket}/{quote(key.lstrip('/'), safe='/-_.~')}"
+
+    def _signing_key(self, date: str) -> bytes:
+        key = ("AWS4" + self.secret_key).encode()
+        for part in (date, self.region, "s3", "aws4_request"):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+        return key
+
+    def _signature(
+        self,
+        method: str,
+        path: str,
+        query: dict[str, str],
+        headers: dict[str, str],
+        payload_hash: str,
+        timestamp: str,
+    ) -> str:
+        canonical_query = _query_string(query)
+        canonical_headers = "".join(
+            f"{k}:{v.strip()}\n" for k, v in sorted(headers.items())
+        )
+        signed_headers = ";".join(sorted(headers))
+        canonical_request = "\n".join(
+            [
+                method,
+                path,
+                canonical_query,
+                canonical_headers,
+                signed_headers,
+                payload_hash,
+            ]
+        )
+        scope = f"{timestamp[:8]}/{self.region}/s3/aws4_request"
+        string_to_sign = "\n".join(
+            [
+                "AWS4-HMAC-SHA256",
+                timestamp,
+                scope,
+                hashlib.sha256(canonical_request.encode()).hexdigest(),
+            ]
+        )
+        return hmac.new(
+            self._signing_key(timestamp[:8]), string_to_sign.encode(), hashlib.sha256
+        ).hexdigest()
+
+    @staticmethod
+    def _timestamp() -> str:
+        return datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    def _request_sync(
+        self,
+        method: str,
+        key: str,
+        query: Optional[dict[str, str]] = None,
+        body: bytes = b"",
+        extra_headers: Optional[dict[str, str]] = None,
+    ) -> tuple[dict[str, str], bytes]:
+        query = query or {}
+        path = self._object_path(key)
+        timestamp = self._timestamp()
+        payload_hash = hashlib.sha256(body).hexdigest()
+        headers = {
+            "host": self.host,
+            "x-amz-content-sha256": payload_hash,
+            "x-amz-date": timestamp,
+            **{k.lower(): v for k, v in (extra_headers or {}).items()},
+        }
+        signature = self._signature(
+            method, path, query, headers, payload_hash, timestamp
+        )
+        scope = f"{timestamp[:8]}/{self.region}/s3/aws4_request"
+        headers["authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key}/{scope}, "
+            f"SignedHeaders={';'.join(sorted(headers))}, "
+            f"Signature={signature}"
+        )
+        url = self.endpoint_url + path
+        if query:
+            url += "?" + _query_string(query)
+        request = urllib.request.Request(
+            url, data=body if method in ("PUT", "POST") else None, method=method
+        )
+        for name, value in headers.items():
+            if name != "host":
+                request.add_header(name, value)
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return dict(response.headers), response.read()
+        except urllib.error.HTTPError as exc:
+            if method == "DELETE" and exc.code == 404:
+                return {}, b""
+            raise MediaStorageError(f"S3 {method} {key} failed: {exc.code}") from exc
+        except urllib.error.URLError as exc:
+            raise MediaStorageError(f"S3 {method} {key} failed: {exc.reason}") from exc
+
+    async def _request(self, *args, **kwargs) -> tuple[dict[str, str], bytes]:
+        return await run_in_threadpool(self._request_sync, *args, **kwargs)
+
+    # --- Операции с файлами ---
+
+    async def save(
+        self, key: str, chunks: AsyncIterator[bytes], content_type: str
+    ) -> int:
+        buffer = bytearray()
+        size = 0
+        upload_id: Optional[str] = None
+        parts: list[tuple[int, str]] = []
+        try:
+            async for chunk in chunks:
+                buffer += chunk
+                size += len(chunk)
+                while len(buffer) >= self.part_size:
+                    if upload_id is None:
+                        upload_id = await self._create_multipart(key, content_type)
+                    part, buffer = (
+                        bytes(buffer[: self.part_size]),
+                        buffer[self.part_size :],
+                    )
+                    parts.append(
+                        await self._upload_part(key, upload_id, len(parts) + 1, part)
+                    )
+
+            if upload_id is None:
+                await self._request(
+                    "PUT",
+                    key,
+                    body=bytes(buffer),
+                    extra_headers={"content-type": content_type},
+                )
+                return size
+            if buffer:
+                parts.append(
+                    await self._upload_part(
+                        key, upload_id, len(parts) + 1, bytes(buffer)
+                    )
+                )
+            await self._complete_multipart(key, upload_id, parts)
+            return size
+        except BaseException:
+            if upload_id is not None:
+                await self._request("DELETE", key, query={"uploadId": upload_id})
+            raise
+
+    async def _create_multipart(self, key: str, content_type: str) -> str:
+        _, body = await self._request(
+            "POST",
+            key,
+            query={"uploads": ""},
+            extra_headers={"content-type": content_type},
+        )
+        root = ElementTree.fromstring(body)
+        upload_id = next(
+            (el.text for el in root.iter() if el.tag.endswith("UploadId")), None
+        )
+        if not upload_id:
+            raise MediaStorageError("S3 did not return UploadId")
+        return upload_id
+
+    async def _upload_part(
+        self, key: str, upload_id: str, number: int, data: bytes
+    ) -> tuple[int, str]:
+        headers, _ = await self._request(
+            "PUT",
+            key,
+            query={"partNumber": str(number), "uploadId": upload_id},
+            body=data,
+        )
+        etag = next((v for k, v in headers.items() if k.lower() == "etag"), "")
+        return number, etag
+
+    async def _complete_multipart(
+        self, key: str, upload_id: str, parts: list[tuple[int, str]]
+    ) -> None:
+        body = "".join(
+            f"<Part><PartNumber>{number}</PartNumber><ETag>{etag}</ETag></Part>"
+            for number, etag in parts
+        )
+        await self._request(
+            "POST",
+            key,
+            query={"uploadId": upload_id},
+            body=f"<CompleteMultipartUpload>{body}</CompleteMultipartUpload>".encode(),
+        )
+
+    async def read(self, key: str, limit: int) -> bytes:
+        _, body = await self._request(
+            "GET", key, extra_headers={"range": f"bytes=0-{limit - 1}"}
+        )
+        return body[:limit]
+
+    async def delete(self, key: str) -> None:
+        await self._request("DELETE", key)
+
+    def presigned_upload(
+        self, key: str, content_type: str
+    ) -> Optional[PresignedUpload]:
+        timestamp = self._timestamp()
+        path = self._object_path(key)
+        query = {
+            "X-Amz-Algorithm": "AWS4-HMAC-SHA256",
+            "X-Amz-Credential": (
+                f"{self.access_key}/{timestamp[:8]}/{self.region}/s3/aws4_request"
+            ),
+            "X-Amz-Date": timestamp,
+            "X-Amz-Expires": str(self.presign_expires),
+            "X-Amz-SignedHeaders": "content-type;host",
+        }
+        headers = {"content-type": content_type, "host": self.host}
+        query["X-Amz-Signature"] = self._signature(
+            "PUT", path, query, headers, "UNSIGNED-PAYLOAD", timestamp
+        )
+        url = f"{self.endpoint_url}{path}?{_query_string(query)}"
+        return PresignedUpload(url=url, headers={"Content-Type": content_type})
+
+
+_storage: Optional[MediaStorage] = None
+
+
+def create_media_storage() -> MediaStorage:
+    """
+    Создаёт хранилище медиафайлов согласно настройке MEDIA_STORAGE.
+    """
+    if settings.MEDIA_STORAGE == "s3":
+        base_url = settings.S3_PUBLIC_URL or (
+            f"{settings.S3_ENDPOINT_URL.rstrip('/')}/{settings.S3_BUCKET}"
+        )
+    else:
+        base_url = f"{settings.PUBLIC_BASE_URL}/uploads"
+    cdn_urls = [url.strip() for url in settings.MEDIA_CDN_URLS.split(",") if url.strip()]
+    urls = MediaURLResolver(cdn_urls or [base_url], secret=settings.MEDIA_URL_SECRET)
+
+    if settings.MEDIA_STORAGE == "s3":
+        return S3MediaStorage(
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            bucket=settings.S3_BUCKET,
+            access_key=settings.S3_ACCESS_KEY,
+            secret_key=settings.S3_SECRET_KEY,
+            region=settings.S3_REGION,
+            public_url=settings.S3_PUBLIC_URL,
+            part_size=settings.S3_PART_SIZE,
+            presign_expires=settings.S3_PRESIGN_EXPIRES,
+            urls=urls,
+        )
+    return LocalMediaStorage(root=settings.MEDIA_ROOT, base_url=base_url, urls=urls)
+
+
+def get_media_storage() -> MediaStorage:
+    """
+    Возвращает текущее хранилище медиафайлов.
+    """
+    global _storage
+    if _storage is None:
+        _storage = create_media_storage()
+    return _storage
+
+
+def set_media_storage(storage: MediaStorage) -> None:
+    """
+    Подменяет хранилище медиафайлов.
+    """
+    global _storage
+    _storage = storage
@@ -0,0 +1,221 @@
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from app.crud.repository import Repository
+
+
+@dataclass(frozen=True)
+class ThreadItem:
+    """
+    Твит беседы: path - id твитов от начала беседы до него самого,
+    tweet - твит, уже приведённый к TweetSchema.
+    """
+
+    path: tuple[int, ...]
+    tweet: dict
+
+    @property
+    def depth(self) -> int:
+        return len(self.path) - 1
+
+
+class Thread:
+    """
+    Дерево беседы, развёрнутое в список в порядке обхода в глубину:
+    ответы идут сразу после твита, на который отвечают, соседние ответы - по id.
+    Такой порядок совпадает с лексикографическим порядком путей,
+    поэтому страницы ищутся бинарным поиском по пути.
+    organization_id - организация, для которой беседа загружена.
+    capped - загружены не все твиты беседы (см. THREAD_MAX_TWEETS).
+    """
+
+    def __init__(
+        self,
+        root_id: int,
+        items: list[ThreadItem],
+        organization_id: Optional[int] = None,
+        capped: bool = False,
+    ):
+        self.root_id = root_id
+        self.items = items
+        self.organization_id = organization_id
+        self.capped = capped
+        self.paths = [item.path for item in items]
+        self.positions = {item.path[-1]: index for index, item in enumerate(items)}
+
+    @classmethod
+    def build(
+        cls,
+        root_id: int,
+        tweets: list[tuple[int, Optional[int], dict]],
+        organization_id: Optional[int] = None,
+        capped: bool = False,
+    ) -> "Thread":
+        """
+        Строит беседу из троек (id, parent_id, твит), отсортированных по id.
+        Ответ на удалённый твит (в том числе на удалённый первый твит беседы)
+        начинает собственную ветку без предков, после ветки первого твита.
+        """
+        by_id = {tweet_id: tweet for tweet_id, _, tweet in tweets}
+        children: dict[int, list[int]] = {}
+        tops = []
+        for tweet_id, parent_id, _ in tweets:
+            if parent_id is None or parent_id not in by_id:
+                tops.append(tweet_id)
+            else:
+                children.setdefault(parent_id, []).append(tweet_id)
+
+        items = []
+        stack = [(tweet_id,) for tweet_id in reversed(tops)]
+        while stack:
+            path = stack.pop()
+            items.append(ThreadItem(path=path, tweet=by_id[path[-1]]))
+            for child in reversed(children.get(path[-1], ())):
+                stack.append((*path, child))
+        return cls(root_id, items, organization_id, capped)
+
+    def __contains__(self, tweet_id: int) -> bool:
+        return tweet_id in self.positions
+
+    def page(
+        self,
+        tweet_id: int,
+        max_depth: int,
+        limit: int,
+        after: Optional[tuple[int, ...]] = None,
+    ) -> tuple[list[ThreadItem], list[ThreadItem]]:
+        """
+        Возвращает предков твита и страницу его ветки: сам твит и ответы
+        не глубже max_depth уровней под ним, начиная после пути after.
+        """
+        start = self.positions[tweet_id]
+        focus = self.items[start]
+        ancestors = [self.items[self.positions[i]] for i in focus.path[:-1]]
+        if after is not None:
+            start = max(start, bisect_right(self.paths, after))
+
+        size = len(focus.path)
+        page = []
+        for item in self.items[start:]:
+            if item.path[:size] != focus.path:
+                break
+            if item.depth - focus.depth > max_depth:
+                continue
+            page.append(item)
+            if len(page) == limit:
+                break
+        return ancestors, page
+
+
+class ThreadCache:
+    """
+    Кэш бесед в памяти процесса по id первого твита.
+    Запись живёт не дольше THREAD_CACHE_TTL и сбрасывается при новом ответе
+    или удалении твита в этом воркере, другие воркеры увидят изменения
+    не позже чем через THREAD_CACHE_TTL. Самые давние беседы вытесняются.
+    Твиты, не поместившиеся в урезанную беседу, запоминаются вместе с ней,
+    чтобы запросы к ним не загружали беседу заново.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[int, tuple[Thread, float]] = OrderedDict()
+        self._roots: dict[int, int] = {}
+        self._missing: dict[int, set[int]] = {}
+
+    def find(self, tweet_id: int) -> Optional[Thread]:
+        """
+        Возвращает закэшированную беседу, в которой есть твит tweet_id
+        или за пределами которой он остался.
+        """
+        root_id = self._roots.get(tweet_id)
+        if root_id is None:
+            return None
+        thread, deadline = self._entries[root_id]
+        if deadline <= time.monotonic():
+            self.invalidate(root_id)
+            return None
+        self._entries.move_to_end(root_id)
+        return thread
+
+    def set(self, thread: Thread):
+        self.invalidate(thread.root_id)
+        self._entries[thread.root_id] = (
+            thread,
+            time.monotonic() + settings.THREAD_CACHE_TTL,
+        )
+        for tweet_id in thread.positions:
+            self._roots[tweet_id] = thread.root_id
+        if len(self._entries) > self.max_size:
+            self.invalidate(next(iter(self._entries)))
+
+    def set_missing(self, thread: Thread, tweet_id: int):
+        """
+        Запоминает, что твита tweet_id нет в закэшированной беседе thread.
+        """
+        if thread.root_id in self._entries:
+            self._missing.setdefault(thread.root_id, set()).add(tweet_id)
+            self._roots[tweet_id] = thread.root_id
+
+    def invalidate(self, root_id: int):
+        entry = self._entries.pop(root_id, None)
+        if entry is None:
+            return
+        missing = self._missing.pop(root_id, set())
+        for tweet_id in [*entry[0].positions, *missing]:
+            if self._roots.get(tweet_id) == root_id:
+                del self._roots[tweet_id]
+
+    def clear(self):
+        self._entries.clear()
+        self._roots.clear()
+        self._missing.clear()
+
+
+thread_cache = ThreadCache(settings.THREAD_CACHE_SIZE)
+
+
+async def load_thread(repository: "Repository", tweet_id: int) -> Optional[Thread]:
+    """
+    Возвращает беседу, в которой есть твит tweet_id, или None.
+    Беседа загружается из БД одним запросом по индексу root_id,
+    собирается через app.core.loaders и дальше раздаётся из кэша.
+    Беседа другой организации из кэша не отдаётся, а ищется в хранилище запроса.
+    Для твитов за пределами первых THREAD_MAX_TWEETS твитов беседы
+    возвращается None, пока беседа в кэше.
+    """
+    from app.core.loaders import Loaders
+
+    thread = thread_cache.find(tweet_id)
+    if thread is not None and repository.organization_id in (
+        None,
+        thread.organization_id,
+    ):
+        return thread if tweet_id in thread else None
+    root_id = await repository.get_tweet_root_id(tweet_id)
+    if root_id is None:
+        return None
+    limit = settings.THREAD_MAX_TWEETS
+    tweets = await repository.get_thread_tweets(root_id, limit)
+    schemas = await Loaders(repository).tweet_schemas(tweets)
+    thread = Thread.build(
+        root_id,
+        [
+            (tweet.id, tweet.parent_id, schema.model_dump())
+            for tweet, schema in zip(tweets, schemas)
+        ],
+        repository.organization_id,
+        capped=len(tweets) == limit,
+    )
+    thread_cache.set(thread)
+    if tweet_id in thread:
+        return thread
+    if thread.capped:
+        thread_cache.set_missing(thread, tweet_id)
+    return None
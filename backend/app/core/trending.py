@@ -0,0 +1,167 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.trending import flush_hashtag_counts, get_top_hashtags
+
+logger = logging.getLogger(__name__)
+
+TRENDING_WINDOWS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+
+class SpaceSaving:
+    """
+    Счётчик частых элементов (алгоритм Space-Saving) с ограниченным числом ключей.
+    Когда ключей становится больше capacity, самый редкий ключ вытесняется,
+    а новый наследует его счётчик - частые элементы при этом не теряются.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: dict[str, int] = {}
+
+    def add(self, key: str, count: int = 1):
+        if key in self.counts or len(self.counts) < self.capacity:
+            self.counts[key] = self.counts.get(key, 0) + count
+            return
+        victim = min(self.counts, key=self.counts.__getitem__)
+        self.counts[key] = self.counts.pop(victim) + count
+
+
+class TrendingAggregator:
+    """
+    Накопитель счётчиков хэштегов в памяти процесса по временным корзинам
+    отдельно для каждой организации. Каждая корзина ограничена capacity ключами,
+    поэтому память не зависит от количества твитов между сбросами
+    в таблицу hashtag_counts.
+    """
+
+    def __init__(self, bucket_seconds: int, capacity: int):
+        self.bucket_seconds = bucket_seconds
+        self.capacity = capacity
+        self._buckets: dict[tuple[int, datetime], SpaceSaving] = {}
+
+    def bucket_start(self, now: datetime) -> datetime:
+        timestamp = int(now.timestamp()) // self.bucket_seconds * self.bucket_seconds
+        return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+    def _bucket(self, organization_id: int, start: datetime) -> SpaceSaving:
+        key = (organization_id, start)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = SpaceSaving(self.capacity)
+        return bucket
+
+    def record(
+        self, tags: list[str], organization_id: int, now: Optional[datetime] = None
+    ):
+        """
+        Учитывает хэштеги нового твита организации organization_id.
+        """
+        if not tags:
+            return
+        start = self.bucket_start(now or datetime.now(timezone.utc))
+        bucket = self._bucket(organization_id, start)
+        for tag in tags:
+            bucket.add(tag)
+
+    def restore(self, rows: list[dict]):
+        """
+        Возвращает в агрегатор строки, которые не удалось сбросить в БД.
+        """
+        for row in rows:
+            bucket = self._bucket(row["organization_id"], row["bucket_start"])
+            bucket.add(row["tag"], row["count"])
+
+    def drain(self) -> list[dict]:
+        """
+        Забирает накопленные счётчики в виде строк для hashtag_counts и очищает корзины.
+        """
+        buckets, self._buckets = self._buckets, {}
+        return [
+            {
+                "organization_id": organization_id,
+                "bucket_start": start,
+                "tag": tag,
+                "count": count,
+            }
+            for (organization_id, start), bucket in buckets.items()
+            for tag, count in bucket.counts.items()
+        ]
+
+
+@dataclass(frozen=True)
+class TrendingSnapshot:
+    """
+    Предвычисленный топ хэштегов по каждому окну для каждой организации.
+    """
+
+    windows: dict[str, dict[int, list[tuple[str, int]]]] = field(default_factory=dict)
+    updated_at: Optional[datetime] = None
+
+    def top(self, window: str, organization_id: int) -> list[tuple[str, int]]:
+        return self.windows.get(window, {}).get(organization_id, [])
+
+
+trending_aggregator = TrendingAggregator(
+    bucket_seconds=settings.TRENDING_BUCKET_SECONDS,
+    capacity=settings.TRENDING_CAPACITY,
+)
+_snapshot = TrendingSnapshot()
+
+
+def get_trending_snapshot() -> TrendingSnapshot:
+    """
+    Возвращает последний предвычисленный топ хэштегов.
+    """
+    return _snapshot
+
+
+async def sync_trending(db: AsyncSession):
+    """
+    Сбрасывает накопленные счётчики в БД и пересчитывает снимок топа хэштегов.
+    Снимок строится по таблице, поэтому учитывает твиты всех воркеров,
+    топ каждой организации считается только по её твитам.
+    """
+    global _snapshot
+    now = datetime.now(timezone.utc)
+    rows = trending_aggregator.drain()
+    try:
+        await flush_hashtag_counts(
+            db=db, rows=rows, expire_before=now - max(TRENDING_WINDOWS.values())
+        )
+    except BaseException:
+        # Счётчики не теряются - вернутся в агрегатор до следующего сброса
+        trending_aggregator.restore(rows)
+        raise
+
+    windows = {}
+    for name, window in TRENDING_WINDOWS.items():
+        windows[name] = await get_top_hashtags(
+            db=db, since=now - window, limit=settings.TRENDING_TOP_SIZE
+        )
+    _snapshot = TrendingSnapshot(windows=windows, updated_at=now)
+
+
+async def run_trending_worker(session_factory):
+    """
+    Фоновая задача: раз в TRENDING_REFRESH_SECONDS синхронизирует счётчики и снимок.
+    При отмене выполняет последний сброс счётчиков.
+    """
+    try:
+        while True:
+            await asyncio.sleep(settings.TRENDING_REFRESH_SECONDS)
+            try:
+                async with session_factory() as db:
+                    await sync_trending(db)
+            except Exception:
+                logger.exception("Failed to refresh trending hashtags")
+    except asyncio.CancelledError:
+        async with session_factory() as db:
+            await sync_trending(db)
+        raise
@@ -0,0 +1,124 @@
+import hmac
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.api_keys import api_key_prefix, generate_api_key, hash_api_key
+from app.models import ApiKey, User
+
+logger = logging.getLogger(__name__)
+
+
+async def verify_api_key(
+    db: AsyncSession, api_key: str
+) -> tuple[Optional[int], Optional[datetime]]:
+    """
+    Функция для проверки API-ключа.
+    Кандидаты ищутся по префиксу, хэши сравниваются за постоянное время.
+    Возвращает (id пользователя, срок действия ключа) или (None, None).
+    Устаревший ключ из users.api_key переносится в api_keys.
+    """
+    key_hash = hash_api_key(api_key)
+    now = datetime.now(timezone.utc)
+    query = select(ApiKey.user_id, ApiKey.key_hash, ApiKey.expires_at).where(
+        ApiKey.prefix == api_key_prefix(api_key), ApiKey.revoked_at.is_(None)
+    )
+    result = await db.execute(query)
+    for user_id, stored_hash, expires_at in result.all():
+        if hmac.compare_digest(stored_hash, key_hash):
+            if expires_at is not None and expires_at <= now:
+                return None, None
+            return user_id, expires_at
+
+    user_id = await db.scalar(select(User.id).where(User.api_key == api_key))
+    if user_id is None:
+        return None, None
+    await migrate_legacy_api_key(db, user_id, api_key)
+    return user_id, None
+
+
+async def migrate_legacy_api_key(db: AsyncSession, user_id: int, api_key: str):
+    """
+    Функция для переноса открытого ключа из users.api_key в api_keys.
+    """
+    db.add(
+        ApiKey(
+            user_id=user_id,
+            name="legacy",
+            prefix=api_key_prefix(api_key),
+            key_hash=hash_api_key(api_key),
+        )
+    )
+    try:
+        await db.execute(update(User).where(User.id == user_id).values(api_key=None))
+        await db.commit()
+    except SQLAlchemyError:
+        await db.rollback()
+        logger.exception(
+            "Failed to migrate legacy API key of user %s "
+            "(run python -m app.commands.migrate_api_keys)",
+            user_id,
+        )
+
+
+async def create_api_key(
+    db: AsyncSession,
+    user_id: int,
+    organization_id: int,
+    name: Optional[str] = None,
+    expires_at: Optional[datetime] = None,
+) -> tuple[str, ApiKey]:
+    """
+    Функция для выпуска нового API-ключа.
+    Ключ начинается с организации пользователя (см. app.core.api_keys).
+    Возвращает сам ключ (он больше нигде не сохраняется) и запись api_keys.
+    """
+    api_key = generate_api_key(organization_id)
+    record = ApiKey(
+        user_id=user_id,
+        name=name,
+        prefix=api_key_prefix(api_key),
+        key_hash=hash_api_key(api_key),
+        expires_at=expires_at,
+    )
+    db.add(record)
+    await db.commit()
+    await db.refresh(record)
+    return api_key, record
+
+
+async def get_api_keys(db: AsyncSession, user_id: int) -> list[ApiKey]:
+    """
+    Функция для получения действующих API-ключей пользователя.
+    """
+    query = (
+        select(ApiKey)
+        .where(ApiKey.user_id == user_id, ApiKey.revoked_at.is_(None))
+        .order_by(ApiKey.id)
+    )
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
+async def revoke_api_key(db: AsyncSession, user_id: int, key_id: int) -> bool:
+    """
+    Функция для отзыва API-ключа пользователя.
+    """
+    query = (
+        update(ApiKey)
+        .where(
+            ApiKey.id == key_id,
+            ApiKey.user_id == user_id,
+            ApiKey.revoked_at.is_(None),
+        )
+        .values(revoked_at=datetime.now(timezone.utc))
+        .returning(ApiKey.id)
+    )
+    result = await db.execute(query)
+    revoked = result.scalar_one_or_none() is not None
+    await db.commit()
+    return revoked
@@ -0,0 +1,46 @@
+from typing import AsyncIterator
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import FollowerAssociation, Like, Media, Tweet, User
+
+EXPORT_PARTITION_SIZE = 1000
+
+
+async def _stream_rows(db: AsyncSession, query) -> AsyncIterator[dict]:
+    """
+    Читает результат запроса серверным курсором пачками по EXPORT_PARTITION_SIZE строк.
+    """
+    result = await db.stream(query.execution_options(yield_per=EXPORT_PARTITION_SIZE))
+    async for partition in result.mappings().partitions():
+        for row in partition:
+            yield dict(row)
+
+
+async def stream_user_export(db: AsyncSession, user_id: int) -> AsyncIterator[dict]:
+    """
+    Функция для потоковой выгрузки всех данных пользователя:
+    профиль, твиты, медиа твитов, лайки, подписки и подписчики.
+    Каждая запись - словарь с полем type.
+    """
+    queries = {
+        "user": select(User.id, User.name).where(User.id == user_id),
+        "tweet": select(Tweet.id, Tweet.content)
+        .where(Tweet.author_id == user_id, Tweet.deleted_at.is_(None))
+        .order_by(Tweet.id),
+        "media": select(Media.id, Media.path, Media.tweet_id)
+        .join(Tweet, Tweet.id == Media.tweet_id)
+        .where(Tweet.author_id == user_id, Tweet.deleted_at.is_(None))
+        .order_by(Media.id),
+        "like": select(Like.tweet_id).where(Like.user_id == user_id).order_by(Like.id),
+        "following": select(FollowerAssociation.following_id.label("user_id"))
+        .where(FollowerAssociation.follower_id == user_id)
+        .order_by(FollowerAssociation.following_id),
+        "follower": select(FollowerAssociation.follower_id.label("user_id"))
+        .where(FollowerAssociation.following_id == user_id)
+        .order_by(FollowerAssociation.follower_id),
+    }
+    for record_type, query in queries.items():
+        async for row in _stream_rows(db, query):
+            yield {"type": record_type, **row}
@@ -1,24 +1,41 @@
-from sqlalchemy import delete, insert
+from typing import Optional
+
+from sqlalchemy import delete, insert, literal, or_, select
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import FollowerAssociation
+from app.core.graph import follow_graph
+from app.core.notifications import notification_buffer
+from app.crud.organizations import in_organization
+from app.models import FollowerAssociation, User
 
 
 async def follow_user(db: AsyncSession, following_id: int, follower_id: int):
     """
     Функция для создания записи в таблице follower_association.
+    Подписаться можно только на пользователя своей организации:
+    запись вставляется, только если организации обоих совпадают.
     """
-    query = insert(FollowerAssociation).values(
-        follower_id=follower_id, following_id=following_id
+    follower_organization = (
+        select(User.organization_id).where(User.id == follower_id).scalar_subquery()
+    )
+    source = select(literal(follower_id), User.id, User.organization_id).where(
+        User.id == following_id, User.organization_id == follower_organization
+    )
+    query = insert(FollowerAssociation).from_select(
+        ["follower_id", "following_id", "organization_id"], source
     )
     try:
-        await db.execute(query)
+        result = await db.execute(query)
         await db.commit()
-        return True
     except SQLAlchemyError:
         await db.rollback()
         return False
+    if not result.rowcount:
+        return False
+    follow_graph.follow(follower_id, following_id)
+    notification_buffer.add_follow(user_id=following_id, actor_id=follower_id)
+    return True
 
 
 async def delete_follow_association(
@@ -34,6 +51,32 @@ async def delete_follow_association(
     try:
         await db.execute(query)
         await db.commit()
-        return True
     except SQLAlchemyError:
         return False
+    follow_graph.unfollow(follower_id, following_id)
+    return True
+
+
+async def get_follow_ids(
+    db: AsyncSession, user_id: int, organization_id: Optional[int] = None
+) -> tuple[list[int], list[int]]:
+    """
+    Функция для получения id подписчиков и подписок пользователя одним запросом.
+    """
+    query = select(
+        FollowerAssociation.follower_id, FollowerAssociation.following_id
+    ).where(
+        in_organization(FollowerAssociation, organization_id),
+        or_(
+            FollowerAssociation.follower_id == user_id,
+            FollowerAssociation.following_id == user_id,
+        ),
+    )
+    result = await db.execute(query)
+    followers, following = [], []
+    for follower_id, following_id in result.all():
+        if following_id == user_id:
+            followers.append(follower_id)
+        if follower_id == user_id:
+            following.append(following_id)
+    return followers, following
@@ -0,0 +1,57 @@
+from typing import AsyncIterator
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import FollowerAssociation, Like, Tweet
+
+STREAM_PARTITION_SIZE = 10_000
+
+
+async def stream_follow_edges(
+    db: AsyncSession,
+) -> AsyncIterator[list[tuple[int, int]]]:
+    """
+    Функция для потокового чтения таблицы follower_association пачками.
+    Возвращает пары (follower_id, following_id), отсортированные по follower_id.
+    """
+    columns = (FollowerAssociation.follower_id, FollowerAssociation.following_id)
+    query = (
+        select(*columns)
+        .order_by(*columns)
+        .execution_options(yield_per=STREAM_PARTITION_SIZE)
+    )
+    result = await db.stream(query)
+    async for partition in result.partitions():
+        yield [tuple(row) for row in partition]
+
+
+async def stream_like_edges(
+    db: AsyncSession, min_tweet_id: int, by_tweet: bool = False
+) -> AsyncIterator[list[tuple[int, int]]]:
+    """
+    Функция для потокового чтения таблицы likes пачками, начиная с твита min_tweet_id.
+    Возвращает пары (user_id, tweet_id), отсортированные по первому элементу,
+    либо пары (tweet_id, user_id) при by_tweet=True.
+    """
+    if by_tweet:
+        columns = (Like.tweet_id, Like.user_id)
+    else:
+        columns = (Like.user_id, Like.tweet_id)
+    query = (
+        select(*columns)
+        .where(Like.tweet_id >= min_tweet_id)
+        .order_by(*columns)
+        .execution_options(yield_per=STREAM_PARTITION_SIZE)
+    )
+    result = await db.stream(query)
+    async for partition in result.partitions():
+        yield [tuple(row) for row in partition]
+
+
+async def get_max_tweet_id(db: AsyncSession) -> int:
+    """
+    Функция для получения максимального id в таблице tweets.
+    """
+    result = await db.execute(select(func.max(Tweet.id)))
+    return result.scalar() or 0
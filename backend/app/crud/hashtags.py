@@ -0,0 +1,119 @@
+from typing import Optional
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.entities import extract_hashtags, extract_mentions
+from app.crud.organizations import in_organization
+from app.models import Tweet, TweetHashtag, TweetMention, User
+
+
+async def save_tweet_entities(db: AsyncSession, tweets: list[Tweet]):
+    """
+    Функция для создания записей в таблицах tweet_hashtags и tweet_mentions.
+    Упоминания сопоставляются с пользователями организации твита
+    по имени без учёта регистра (индекс по organization_id, lower(name)).
+    Коммит не выполняется - записи сохраняются в транзакции вызывающего кода.
+    """
+    hashtag_rows = []
+    mentions_by_tweet = {}
+    organizations = {tweet.id: tweet.organization_id for tweet in tweets}
+    for tweet in tweets:
+        hashtag_rows += [
+            {"tag": tag, "tweet_id": tweet.id} for tag in extract_hashtags(tweet.content)
+        ]
+        names = extract_mentions(tweet.content)
+        if names:
+            mentions_by_tweet[tweet.id] = names
+
+    if hashtag_rows:
+        await db.execute(
+            insert(TweetHashtag).values(hashtag_rows).on_conflict_do_nothing()
+        )
+
+    if mentions_by_tweet:
+        all_names = {
+            (organizations[tweet_id], name)
+            for tweet_id, names in mentions_by_tweet.items()
+            for name in names
+        }
+        key = tuple_(User.organization_id, func.lower(User.name))
+        result = await db.execute(
+            select(User.id, User.organization_id, func.lower(User.name)).where(
+                key.in_(all_names)
+            )
+        )
+        users_by_name: dict[tuple[int, str], list[int]] = {}
+        for user_id, organization_id, name in result.all():
+            users_by_name.setdefault((organization_id, name), []).append(user_id)
+
+        mention_rows = [
+            {"user_id": user_id, "tweet_id": tweet_id}
+            for tweet_id, names in mentions_by_tweet.items()
+            for name in names
+            for user_id in users_by_name.get((organizations[tweet_id], name), [])
+        ]
+        if mention_rows:
+            await db.execute(
+                insert(TweetMention).values(mention_rows).on_conflict_do_nothing()
+            )
+
+
+async def get_tweets_by_hashtag(
+    db: AsyncSession,
+    tag: str,
+    limit: int,
+    before_id: Optional[int] = None,
+    organization_id: Optional[int] = None,
+) -> list[Tweet]:
+    """
+    Функция для получения твитов организации по хэштегу, от новых к старым.
+    Пагинация по ключу tweet_id - сканирование первичного ключа (tag, tweet_id).
+    Удалённые твиты отбрасываются до LIMIT, чтобы страница не оказалась короче limit.
+    Возвращаются только строки твитов: схемы ответа собирает app.core.loaders.
+    """
+    query = (
+        select(Tweet)
+        .join(TweetHashtag, TweetHashtag.tweet_id == Tweet.id)
+        .where(
+            TweetHashtag.tag == tag.lower(),
+            Tweet.deleted_at.is_(None),
+            in_organization(Tweet, organization_id),
+        )
+        .order_by(TweetHashtag.tweet_id.desc())
+        .limit(limit)
+    )
+    if before_id is not None:
+        query = query.where(TweetHashtag.tweet_id < before_id)
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
+async def get_mentions_for_user(
+    db: AsyncSession,
+    user_id: int,
+    limit: int,
+    before_id: Optional[int] = None,
+    organization_id: Optional[int] = None,
+) -> list[Tweet]:
+    """
+    Функция для получения твитов, в которых упомянут пользователь, от новых к старым.
+    Пагинация по ключу tweet_id - сканирование первичного ключа (user_id, tweet_id).
+    Удалённые твиты отбрасываются до LIMIT, как и в get_tweets_by_hashtag.
+    """
+    query = (
+        select(Tweet)
+        .join(TweetMention, TweetMention.tweet_id == Tweet.id)
+        .where(
+            TweetMention.user_id == user_id,
+            Tweet.deleted_at.is_(None),
+            in_organization(Tweet, organization_id),
+        )
+        .order_by(TweetMention.tweet_id.desc())
+        .limit(limit)
+    )
+    if before_id is not None:
+        query = query.where(TweetMention.tweet_id < before_id)
+    result = await db.execute(query)
+    return list(result.scalars().all())
@@ -1,32 +1,218 @@
-from sqlalchemy import delete
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Integer, column, delete, select, update, values
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import Like
+from app.core.events import events_enabled, publish_event
+from app.core.graph import follow_graph
+from app.core.likes import like_buffer, likes_write_behind
+from app.core.notifications import notification_buffer
+from app.crud.organizations import in_organization
+from app.models import Like, Tweet, User
+
+
+async def _publish_like_event(
+    db: AsyncSession, event_type: str, user_id: int, tweet_id: int
+):
+    """
+    Публикует событие лайка подписчикам автора твита.
+    Автор запрашивается из БД, только если событие есть кому доставить.
+    """
+    if not events_enabled():
+        return
+    author_id = await db.scalar(select(Tweet.author_id).where(Tweet.id == tweet_id))
+    if author_id is not None:
+        publish_event(event_type, tweet_id, author_id, user_id)
+
+
+# Пересчёт tweets.likes_count по таблице likes после загрузки или миграции
+SYNC_LIKES_COUNT_SQL = (
+    "UPDATE tweets SET likes_count = counts.likes "
+    "FROM (SELECT tweet_id, count(*) AS likes FROM likes GROUP BY tweet_id) counts "
+    "WHERE tweets.id = counts.tweet_id AND tweets.likes_count <> counts.likes"
+)
+
+
+def _change_likes_count(tweet_id: int, delta: int):
+    return (
+        update(Tweet)
+        .where(Tweet.id == tweet_id)
+        .values(likes_count=Tweet.likes_count + delta)
+    )
+
+
+def _same_organization(user_id):
+    """
+    Условие «твит из организации пользователя user_id».
+    """
+    user_organization = (
+        select(User.organization_id).where(User.id == user_id).scalar_subquery()
+    )
+    return Tweet.organization_id == user_organization
 
 
 async def create_like(db: AsyncSession, user_id: int, tweet_id: int):
     """
     Функция для создания записи в таблице likes.
+    Удалённые твиты и твиты чужой организации лайкнуть нельзя.
+    В режиме LIKES_WRITE_BEHIND лайк только ставится в буфер (см. app.core.likes)
+    и записывается в БД вместе с другими при очередном сбросе. Твит и повторный
+    лайк проверяются до буфера, так что ответ тот же, что и при прямой записи.
     """
-    new_like = Like(user_id=user_id, tweet_id=tweet_id)
+    query = select(Tweet.organization_id).where(
+        Tweet.id == tweet_id, Tweet.deleted_at.is_(None), _same_organization(user_id)
+    )
+    organization_id = await db.scalar(query)
+    if organization_id is None:
+        return None
+    if likes_write_behind():
+        if (user_id, tweet_id) in like_buffer:
+            return None
+        liked = await db.scalar(
+            select(Like.id).where(Like.user_id == user_id, Like.tweet_id == tweet_id)
+        )
+        if liked is not None:
+            return None
+        if like_buffer.add(user_id, tweet_id):
+            return True
+
+    new_like = Like(user_id=user_id, tweet_id=tweet_id, organization_id=organization_id)
     try:
         db.add(new_like)
+        await db.flush()
+        await db.execute(_change_likes_count(tweet_id, 1))
         await db.commit()
         await db.refresh(new_like)
-        return new_like
     except SQLAlchemyError:
+        await db.rollback()
         return None
+    follow_graph.like(user_id, tweet_id)
+    notification_buffer.add_like(tweet_id=tweet_id, actor_id=user_id)
+    await _publish_like_event(db, "like_created", user_id, tweet_id)
+    return new_like
 
 
-async def delete_like(db: AsyncSession, user_id: int, tweet_id: int):
+async def delete_like(
+    db: AsyncSession, user_id: int, tweet_id: int, organization_id: Optional[int] = None
+):
     """
     Функция для удаления записи в таблице likes.
+    Лайк, ещё не записанный из буфера, просто убирается из буфера.
+    Лайк, который сейчас записывает сброс буфера, помечается снятым
+    и удаляется сбросом после записи (см. app.core.likes.flush_like_buffer),
+    поэтому снятие лайка не ждёт окончания сброса.
     """
-    query = delete(Like).where(Like.tweet_id == tweet_id, Like.user_id == user_id)
+    if likes_write_behind() and like_buffer.discard(user_id, tweet_id):
+        return True
+    return await delete_stored_like(db, user_id, tweet_id, organization_id)
+
+
+async def delete_stored_like(
+    db: AsyncSession,
+    user_id: int,
+    tweet_id: int,
+    organization_id: Optional[int] = None,
+) -> bool:
+    """
+    Функция для удаления лайка из таблицы likes, минуя буфер.
+    """
+    query = (
+        delete(Like)
+        .where(
+            Like.tweet_id == tweet_id,
+            Like.user_id == user_id,
+            in_organization(Like, organization_id),
+        )
+        .returning(Like.id)
+    )
     try:
-        await db.execute(query)
+        result = await db.execute(query)
+        if result.first() is not None:
+            await db.execute(_change_likes_count(tweet_id, -1))
         await db.commit()
-        return True
     except SQLAlchemyError:
+        await db.rollback()
         return False
+    follow_graph.unlike(user_id, tweet_id)
+    await _publish_like_event(db, "like_deleted", user_id, tweet_id)
+    return True
+
+
+async def flush_likes(
+    db: AsyncSession, rows: list[tuple[int, int, datetime]]
+) -> list[tuple[int, int, Optional[int]]]:
+    """
+    Функция для записи пачки лайков (user_id, tweet_id, created_at).
+    Лайки вставляются одним INSERT ... ON CONFLICT DO NOTHING (повторные,
+    лайки удалённых твитов и твитов чужой организации пропускаются),
+    счётчики обновляются
+    одним UPDATE с одной строкой на твит.
+    Возвращает записанные лайки в виде (user_id, tweet_id, author_id).
+    """
+    pending = values(
+        column("user_id", Integer),
+        column("tweet_id", Integer),
+        column("created_at", DateTime(timezone=True)),
+        name="pending",
+    ).data(sorted(rows, key=lambda row: (row[1], row[0])))
+    source = (
+        select(
+            pending.c.user_id,
+            pending.c.tweet_id,
+            pending.c.created_at,
+            Tweet.organization_id,
+        )
+        .join(Tweet, Tweet.id == pending.c.tweet_id)
+        .join(User, User.id == pending.c.user_id)
+        .where(
+            Tweet.deleted_at.is_(None), Tweet.organization_id == User.organization_id
+        )
+    )
+    query = (
+        insert(Like)
+        .from_select(["user_id", "tweet_id", "created_at", "organization_id"], source)
+        .on_conflict_do_nothing()
+        .returning(Like.user_id, Like.tweet_id)
+    )
+    inserted = (await db.execute(query)).all()
+    if not inserted:
+        await db.commit()
+        return []
+
+    deltas: dict[int, int] = {}
+    for _, tweet_id in inserted:
+        deltas[tweet_id] = deltas.get(tweet_id, 0) + 1
+    counts = values(
+        column("id", Integer), column("delta", Integer), name="counts"
+    ).data(sorted(deltas.items()))
+    result = await db.execute(
+        update(Tweet)
+        .where(Tweet.id == counts.c.id)
+        .values(likes_count=Tweet.likes_count + counts.c.delta)
+        .returning(Tweet.id, Tweet.author_id)
+    )
+    authors = dict(result.all())
+    await db.commit()
+    return [(user_id, tweet_id, authors.get(tweet_id)) for user_id, tweet_id in inserted]
+
+
+async def get_likers_by_tweet_ids(
+    db: AsyncSession, tweet_ids: list[int], organization_id: Optional[int] = None
+) -> dict[int, list[int]]:
+    """
+    Функция для получения id лайкнувших пользователей по твитам одним запросом,
+    в порядке постановки лайков.
+    """
+    query = (
+        select(Like.tweet_id, Like.user_id)
+        .where(Like.tweet_id.in_(tweet_ids), in_organization(Like, organization_id))
+        .order_by(Like.tweet_id, Like.id)
+    )
+    result = await db.execute(query)
+    likers: dict[int, list[int]] = {}
+    for tweet_id, user_id in result.all():
+        likers.setdefault(tweet_id, []).append(user_id)
+    return likers
@@ -1,20 +1,30 @@
 from typing import Optional
 
-from sqlalchemy import update
+from sqlalchemy import func, select, update
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.storage import LEGACY_MEDIA_PREFIX, normalize_media_key
+from app.crud.organizations import in_organization
 from app.models.media import Media
 
 
-async def attach_media_to_tweet(db: AsyncSession, media_ids: Optional[list[int]], tweet_id: int):
+async def attach_media_to_tweet(
+    db: AsyncSession,
+    media_ids: Optional[list[int]],
+    tweet_id: int,
+    organization_id: Optional[int] = None,
+):
     """
     Функция для обновления записи в таблице media.
     Привязывает к записи tweet_id, который при создании остаётся Null.
+    Медиа чужой организации не привязываются.
     """
     quary = (
         update(Media)
         .where(Media.id.in_(media_ids), Media.tweet_id.is_(None)) # type: ignore # noqa
+        .where(in_organization(Media, organization_id))
         .values(tweet_id=tweet_id)
         .returning(Media.id)
     )
@@ -25,11 +35,24 @@ async def attach_media_to_tweet(db: AsyncSession, media_ids: Optional[list[int]]
         return False
 
 
-async def save_media_in_database(db: AsyncSession, path: str, tweet_id: Optional[int] = None):
+async def save_media_in_database(
+    db: AsyncSession,
+    path: str,
+    tweet_id: Optional[int] = None,
+    organization_id: Optional[int] = None,
+):
     """
     Функция для создания записи в таблице media.
+    В path сохраняется ключ файла в хранилище, в organization_id - организация
+    загрузившего пользователя (по умолчанию DEFAULT_ORGANIZATION_ID).
     """
-    media: Media = Media(path=path, tweet_id=tweet_id)
+    if organization_id is None:
+        organization_id = settings.DEFAULT_ORGANIZATION_ID
+    media: Media = Media(
+        path=normalize_media_key(path),
+        tweet_id=tweet_id,
+        organization_id=organization_id,
+    )
     try:
         db.add(media)
         await db.commit()
@@ -37,3 +60,34 @@ async def save_media_in_database(db: AsyncSession, path: str, tweet_id: Optional
         return media
     except SQLAlchemyError:
         return None
+
+
+async def normalize_media_paths(db: AsyncSession) -> int:
+    """
+    Функция для приведения старых путей вида /uploads/<имя>/<файл> к ключам хранилища,
+    тем же выражением, что и normalize_media_key.
+    Возвращает количество обновлённых записей.
+    """
+    normalized = func.regexp_replace(Media.path, LEGACY_MEDIA_PREFIX, "")
+    query = update(Media).where(Media.path != normalized).values(path=normalized)
+    result = await db.execute(query)
+    await db.commit()
+    return result.rowcount
+
+
+async def get_media_paths_by_tweet_ids(
+    db: AsyncSession, tweet_ids: list[int], organization_id: Optional[int] = None
+) -> dict[int, list[str]]:
+    """
+    Функция для получения ключей медиафайлов твитов одним запросом.
+    """
+    query = (
+        select(Media.tweet_id, Media.path)
+        .where(Media.tweet_id.in_(tweet_ids), in_organization(Media, organization_id))
+        .order_by(Media.id)
+    )
+    result = await db.execute(query)
+    paths: dict[int, list[str]] = {}
+    for tweet_id, path in result.all():
+        paths.setdefault(tweet_id, []).append(path)
+    return paths
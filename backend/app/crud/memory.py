@@ -0,0 +1,441 @@
+import heapq
+import itertools
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterator, Optional
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.entities import extract_hashtags, extract_mentions
+from app.core.events import events_enabled, publish_event
+from app.core.graph import follow_graph
+from app.core.ranking import Candidate
+from app.core.storage import normalize_media_key
+from app.core.threads import thread_cache
+from app.crud.repository import Repository
+from app.crud.tweet import rank_feed_candidates
+from app.models import Like, Media, Tweet, User
+
+
+@dataclass
+class MemoryStore:
+    """
+    Данные хранилища в памяти процесса с индексами, которые в Postgres
+    дают внешние ключи, уникальные ограничения и индексы таблиц:
+    likes - лайки по твитам в порядке постановки (пара пользователь-твит уникальна),
+    following/followers - подписки в обе стороны (пара уникальна),
+    author_tweets и replies - id твитов автора и беседы по возрастанию,
+    tweet_media - id медиа твита.
+    """
+
+    users: dict[int, User] = field(default_factory=dict)
+    api_keys: dict[str, int] = field(default_factory=dict)
+    following: dict[int, dict[int, None]] = field(default_factory=dict)
+    followers: dict[int, dict[int, None]] = field(default_factory=dict)
+    tweets: dict[int, Tweet] = field(default_factory=dict)
+    author_tweets: dict[int, list[int]] = field(default_factory=dict)
+    replies: dict[int, list[int]] = field(default_factory=dict)
+    likes: dict[int, dict[int, Like]] = field(default_factory=dict)
+    media: dict[int, Media] = field(default_factory=dict)
+    tweet_media: dict[int, list[int]] = field(default_factory=dict)
+    _sequences: dict[str, Iterator[int]] = field(default_factory=dict)
+
+    def next_id(self, table: str) -> int:
+        if table not in self._sequences:
+            self._sequences[table] = itertools.count(1)
+        return next(self._sequences[table])
+
+    def add_user(
+        self,
+        name: str,
+        api_key: Optional[str] = None,
+        organization_id: Optional[int] = None,
+    ) -> User:
+        """
+        Создаёт пользователя. Ключ api_key, как и users.api_key, уникален.
+        """
+        if api_key is not None and api_key in self.api_keys:
+            raise ValueError(f"API key is already used: {api_key}")
+        if organization_id is None:
+            organization_id = settings.DEFAULT_ORGANIZATION_ID
+        user = User(
+            id=self.next_id("users"),
+            name=name,
+            api_key=api_key,
+            organization_id=organization_id,
+        )
+        self.users[user.id] = user
+        if api_key is not None:
+            self.api_keys[api_key] = user.id
+        return user
+
+
+_store: Optional[MemoryStore] = None
+
+
+def get_memory_store() -> MemoryStore:
+    """
+    Возвращает текущее хранилище в памяти.
+    """
+    global _store
+    if _store is None:
+        _store = MemoryStore()
+    return _store
+
+
+def set_memory_store(store: MemoryStore) -> None:
+    """
+    Подменяет хранилище в памяти.
+    """
+    global _store
+    _store = store
+
+
+class MemoryRepository(Repository):
+    """
+    Хранилище в памяти процесса для тестов и бенчмарков без Postgres.
+    Повторяет поведение SqlRepository: уникальность лайков и подписок,
+    проверку существования пользователей и твитов, разделение по организациям,
+    ленту с теми же режимами, курсорами и ранжированием. Удалённый твит удаляется сразу
+    вместе с лайками и медиа - то, что в Postgres позже делает app.core.reaper.
+    Хэштеги и упоминания не индексируются: страницы хэштега и упоминаний
+    собираются полным просмотром твитов. Уведомления и тренды в памяти не ведутся:
+    эндпоинты поиска, трендов, уведомлений и API-ключей работают только с Postgres.
+    """
+
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    def _visible(self, item) -> bool:
+        """
+        Видна ли запись (пользователь, твит, медиа) организации хранилища.
+        """
+        return self.organization_id in (None, item.organization_id)
+
+    async def verify_api_key(self, api_key):
+        return self.store.api_keys.get(api_key), None
+
+    async def get_user_by_id(self, user_id):
+        user = self.store.users.get(user_id)
+        return user if user is not None and self._visible(user) else None
+
+    async def get_user_names(self, user_ids):
+        users = self.store.users
+        return {i: users[i].name for i in user_ids if i in users}
+
+    async def get_users_by_ids(self, user_ids):
+        users = self.store.users
+        return [users[i] for i in user_ids if i in users and self._visible(users[i])]
+
+    async def follow_user(self, following_id, follower_id):
+        store = self.store
+        if following_id not in store.users or follower_id not in store.users:
+            return False
+        following, follower = store.users[following_id], store.users[follower_id]
+        if following.organization_id != follower.organization_id:
+            return False
+        if following_id in store.following.get(follower_id, ()):
+            return False
+        store.following.setdefault(follower_id, {})[following_id] = None
+        store.followers.setdefault(following_id, {})[follower_id] = None
+        follow_graph.follow(follower_id, following_id)
+        return True
+
+    async def delete_follow_association(self, following_id, follower_id):
+        self.store.following.get(follower_id, {}).pop(following_id, None)
+        self.store.followers.get(following_id, {}).pop(follower_id, None)
+        follow_graph.unfollow(follower_id, following_id)
+        return True
+
+    async def get_follow_ids(self, user_id):
+        return (
+            list(self.store.followers.get(user_id, ())),
+            list(self.store.following.get(user_id, ())),
+        )
+
+    async def create_tweet(self, data):
+        store = self.store
+        author = store.users.get(data["author_id"])
+        if author is None or len(data["content"]) > 300:
+            return None
+        defaults = {
+            "parent_id": None,
+            "root_id": None,
+            "repost_of_id": None,
+            "organization_id": author.organization_id,
+        }
+        tweet = Tweet(
+            **{**defaults, **data},
+            id=store.next_id("tweets"),
+            likes_count=0,
+            created_at=datetime.now(timezone.utc),
+            deleted_at=None,
+        )
+        store.tweets[tweet.id] = tweet
+        store.author_tweets.setdefault(tweet.author_id, []).append(tweet.id)
+        if tweet.root_id is not None:
+            store.replies.setdefault(tweet.root_id, []).append(tweet.id)
+            thread_cache.invalidate(tweet.root_id)
+        publish_event("tweet_created", tweet.id, tweet.author_id, tweet.author_id)
+        return tweet
+
+    def _get_visible_tweet(self, tweet_id: int) -> Optional[Tweet]:
+        tweet = self.store.tweets.get(tweet_id)
+        return tweet if tweet is not None and self._visible(tweet) else None
+
+    async def get_tweet(self, tweet_id):
+        return self._get_visible_tweet(tweet_id)
+
+    async def get_tweets_by_ids(self, tweet_ids):
+        tweets = self.store.tweets
+        return {i: tweets[i] for i in tweet_ids if self._get_visible_tweet(i)}
+
+    async def get_repost_target_id(self, tweet_id):
+        tweet = self._get_visible_tweet(tweet_id)
+        if tweet is None:
+            return None
+        if not tweet.is_retweet:
+            return tweet.id
+        return tweet.repost_of_id if tweet.repost_of_id in self.store.tweets else None
+
+    async def get_tweet_root_id(self, tweet_id):
+        tweet = self._get_visible_tweet(tweet_id)
+        if tweet is None:
+            return None
+        return tweet.root_id if tweet.root_id is not None else tweet.id
+
+    async def get_thread_tweets(self, root_id, limit):
+        tweets = self.store.tweets
+        ids = [root_id] + self.store.replies.get(root_id, [])
+        return [tweets[i] for i in ids if self._get_visible_tweet(i)][:limit]
+
+    def _get_retweet_id(self, user_id: int, tweet_id: int) -> Optional[int]:
+        for i in self.store.author_tweets.get(user_id, ()):
+            tweet = self.store.tweets[i]
+            if tweet.repost_of_id == tweet_id and tweet.is_retweet:
+                return i
+        return None
+
+    async def create_retweet(self, user_id, tweet_id):
+        if self._get_retweet_id(user_id, tweet_id) is not None:
+            return None
+        return await self.create_tweet(
+            {"content": "", "author_id": user_id, "repost_of_id": tweet_id}
+        )
+
+    async def delete_retweet(self, user_id, tweet_id):
+        retweet_id = self._get_retweet_id(user_id, tweet_id)
+        if retweet_id is None:
+            return False
+        return await self.delete_tweet(user_id, retweet_id)
+
+    def _feed_tweets(self, user_id: int) -> Iterator[Tweet]:
+        """
+        Твиты пользователя и его подписок от новых к старым,
+        кроме ретвитов удалённых твитов.
+        """
+        store = self.store
+        authors = {user_id, *store.following.get(user_id, ())}
+        ids = heapq.merge(
+            *(reversed(store.author_tweets.get(a, [])) for a in authors), reverse=True
+        )
+        for tweet_id in ids:
+            tweet = store.tweets[tweet_id]
+            if not tweet.is_retweet or tweet.repost_of_id in store.tweets:
+                yield tweet
+
+    def _feed_min_tweet_id(self) -> int:
+        if not settings.FEED_WINDOW_DAYS:
+            return 1
+        since = datetime.now(timezone.utc) - timedelta(days=settings.FEED_WINDOW_DAYS)
+        for tweet in self.store.tweets.values():
+            if tweet.created_at >= since:
+                return tweet.id
+        return 1
+
+    async def get_feed_for_user(self, user_id, sort="top", limit=20, cursor=None):
+        min_tweet_id = self._feed_min_tweet_id()
+        tweets = itertools.takewhile(
+            lambda tweet: tweet.id >= min_tweet_id, self._feed_tweets(user_id)
+        )
+
+        if sort == "recent":
+            if cursor:
+                tweets = (t for t in tweets if (t.created_at, t.id) < tuple(cursor))
+            page = list(itertools.islice(tweets, limit))
+            rows, seen = [], set()
+            for tweet in page:
+                shown_id = tweet.repost_of_id if tweet.is_retweet else tweet.id
+                if shown_id not in seen:
+                    seen.add(shown_id)
+                    rows.append((tweet, (tweet.created_at, tweet.id)))
+            next_key = (page[-1].created_at, page[-1].id) if len(page) == limit else None
+            return rows, next_key
+
+        candidates, seen = [], set()
+        for tweet in itertools.islice(tweets, settings.FEED_CANDIDATE_LIMIT):
+            shown = self.store.tweets[tweet.repost_of_id] if tweet.is_retweet else tweet
+            if shown.id in seen:
+                continue
+            seen.add(shown.id)
+            candidates.append(
+                Candidate(
+                    tweet_id=tweet.id,
+                    author_id=tweet.author_id,
+                    created_at=tweet.created_at,
+                    likes=shown.likes_count,
+                )
+            )
+        page, next_key = rank_feed_candidates(candidates, sort, limit, cursor)
+        return [(self.store.tweets[i], key) for i, key in page], next_key
+
+    def _latest_tweets(
+        self, match: Callable[[Tweet], bool], limit: int, before_id: Optional[int]
+    ) -> list[Tweet]:
+        """
+        Видимые твиты, подходящие под match, от новых к старым, с id меньше before_id.
+        """
+        tweets = []
+        for tweet_id in sorted(self.store.tweets, reverse=True):
+            if before_id is not None and tweet_id >= before_id:
+                continue
+            tweet = self._get_visible_tweet(tweet_id)
+            if tweet is not None and match(tweet):
+                tweets.append(tweet)
+                if len(tweets) == limit:
+                    break
+        return tweets
+
+    async def get_tweets_by_hashtag(self, tag, limit, before_id=None):
+        tag = tag.lower()
+        return self._latest_tweets(
+            lambda tweet: tag in extract_hashtags(tweet.content), limit, before_id
+        )
+
+    async def get_mentions_for_user(self, user_id, limit, before_id=None):
+        user = self.store.users.get(user_id)
+        if user is None:
+            return []
+        name = user.name.lower()
+        return self._latest_tweets(
+            lambda tweet: tweet.organization_id == user.organization_id
+            and name in extract_mentions(tweet.content),
+            limit,
+            before_id,
+        )
+
+    async def delete_tweet(self, user_id, tweet_id):
+        store = self.store
+        tweet = store.tweets.get(tweet_id)
+        if tweet is None or not self._visible(tweet):
+            return False
+        if tweet.author_id != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only delete your own tweets",
+            )
+        del store.tweets[tweet_id]
+        store.author_tweets[tweet.author_id].remove(tweet_id)
+        if tweet.root_id is not None:
+            store.replies[tweet.root_id].remove(tweet_id)
+        store.likes.pop(tweet_id, None)
+        for media_id in store.tweet_media.pop(tweet_id, ()):
+            del store.media[media_id]
+        thread_cache.invalidate(tweet.root_id if tweet.root_id is not None else tweet_id)
+        publish_event("tweet_deleted", tweet_id, tweet.author_id, user_id)
+        return True
+
+    async def create_like(self, user_id, tweet_id):
+        store = self.store
+        tweet = store.tweets.get(tweet_id)
+        user = store.users.get(user_id)
+        if tweet is None or user is None:
+            return None
+        if tweet.organization_id != user.organization_id:
+            return None
+        likes = store.likes.setdefault(tweet_id, {})
+        if user_id in likes:
+            return None
+        like = Like(
+            id=store.next_id("likes"),
+            user_id=user_id,
+            tweet_id=tweet_id,
+            organization_id=tweet.organization_id,
+            created_at=datetime.now(timezone.utc),
+        )
+        likes[user_id] = like
+        tweet.likes_count += 1
+        follow_graph.like(user_id, tweet_id)
+        if events_enabled():
+            publish_event("like_created", tweet_id, tweet.author_id, user_id)
+        return like
+
+    async def delete_like(self, user_id, tweet_id):
+        tweet = self.store.tweets.get(tweet_id)
+        if tweet is not None and not self._visible(tweet):
+            return True
+        if self.store.likes.get(tweet_id, {}).pop(user_id, None) is not None:
+            tweet.likes_count -= 1
+        follow_graph.unlike(user_id, tweet_id)
+        if tweet is not None and events_enabled():
+            publish_event("like_deleted", tweet_id, tweet.author_id, user_id)
+        return True
+
+    async def get_likers_by_tweet_ids(self, tweet_ids):
+        store = self.store
+        return {
+            i: list(store.likes[i])
+            for i in tweet_ids
+            if store.likes.get(i) and self._visible(store.tweets[i])
+        }
+
+    async def get_max_tweet_id(self):
+        return max(self.store.tweets, default=0)
+
+    async def stream_follow_edges(self):
+        following = self.store.following
+        yield [
+            (source, target)
+            for source in sorted(following)
+            for target in sorted(following[source])
+        ]
+
+    async def stream_like_edges(self, min_tweet_id, by_tweet=False):
+        edges = [
+            (tweet_id, user_id) if by_tweet else (user_id, tweet_id)
+            for tweet_id, likes in self.store.likes.items()
+            if tweet_id >= min_tweet_id
+            for user_id in likes
+        ]
+        yield sorted(edges)
+
+    async def save_media_in_database(self, path, tweet_id=None):
+        organization_id = self.organization_id
+        if organization_id is None:
+            organization_id = settings.DEFAULT_ORGANIZATION_ID
+        media = Media(
+            id=self.store.next_id("media"),
+            path=normalize_media_key(path),
+            tweet_id=tweet_id,
+            organization_id=organization_id,
+        )
+        self.store.media[media.id] = media
+        if tweet_id is not None:
+            self.store.tweet_media.setdefault(tweet_id, []).append(media.id)
+        return media
+
+    async def attach_media_to_tweet(self, media_ids, tweet_id):
+        for media_id in sorted(set(media_ids or ())):
+            media = self.store.media.get(media_id)
+            if media is not None and media.tweet_id is None and self._visible(media):
+                media.tweet_id = tweet_id
+                self.store.tweet_media.setdefault(tweet_id, []).append(media_id)
+
+    async def get_media_paths_by_tweet_ids(self, tweet_ids):
+        store = self.store
+        return {
+            i: [store.media[m].path for m in store.tweet_media[i]]
+            for i in tweet_ids
+            if store.tweet_media.get(i) and self._visible(store.tweets[i])
+        }
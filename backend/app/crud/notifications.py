@@ -0,0 +1,133 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import (
+    DateTime,
+    Integer,
+    column,
+    func,
+    literal,
+    select,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models import Notification, Tweet
+
+
+def _upsert(query):
+    """
+    Схлопывает новое уведомление с непрочитанным уведомлением того же типа.
+    """
+    return query.on_conflict_do_update(
+        index_elements=[Notification.user_id, Notification.type, Notification.tweet_id],
+        index_where=Notification.is_read.is_(False),
+        set_={
+            "actors_count": Notification.actors_count + query.excluded.actors_count,
+            "actor_id": query.excluded.actor_id,
+            "updated_at": query.excluded.updated_at,
+        },
+    )
+
+
+async def flush_notifications(
+    db: AsyncSession, likes: list[dict], follows: list[dict]
+):
+    """
+    Функция для записи накопленных уведомлений в таблицу notifications.
+    likes - строки {tweet_id, actor_id, actors_count, updated_at}: получатель (автор твита)
+    определяется в том же запросе, лайки своих твитов пропускаются.
+    follows - строки {user_id, actor_id, actors_count, updated_at}.
+    Каждый вид уведомлений записывается одним INSERT ... ON CONFLICT.
+    """
+    if likes:
+        rows = values(
+            column("tweet_id", Integer),
+            column("actor_id", Integer),
+            column("actors_count", Integer),
+            column("updated_at", DateTime(timezone=True)),
+            name="pending",
+        ).data(
+            [
+                (row["tweet_id"], row["actor_id"], row["actors_count"], row["updated_at"])
+                for row in likes
+            ]
+        )
+        source = (
+            select(
+                Tweet.author_id,
+                literal("like"),
+                rows.c.tweet_id,
+                rows.c.actor_id,
+                rows.c.actors_count,
+                rows.c.updated_at,
+            )
+            .join(Tweet, Tweet.id == rows.c.tweet_id)
+            .where(Tweet.author_id != rows.c.actor_id, Tweet.deleted_at.is_(None))
+        )
+        query = insert(Notification).from_select(
+            ["user_id", "type", "tweet_id", "actor_id", "actors_count", "updated_at"],
+            source,
+        )
+        await db.execute(_upsert(query))
+
+    if follows:
+        query = insert(Notification).values(
+            [{**row, "type": "follow", "tweet_id": None} for row in follows]
+        )
+        await db.execute(_upsert(query))
+
+    await db.commit()
+
+
+async def get_notifications(
+    db: AsyncSession,
+    user_id: int,
+    limit: int,
+    cursor: Optional[tuple[datetime, int]] = None,
+) -> list[Notification]:
+    """
+    Функция для получения уведомлений пользователя, от новых к старым.
+    Пагинация по ключу (updated_at, id).
+    """
+    query = (
+        select(Notification)
+        .where(Notification.user_id == user_id)
+        .options(selectinload(Notification.actor))
+        .order_by(Notification.updated_at.desc(), Notification.id.desc())
+        .limit(limit)
+    )
+    if cursor:
+        query = query.where(
+            tuple_(Notification.updated_at, Notification.id) < tuple_(*cursor)
+        )
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
+async def count_unread_notifications(db: AsyncSession, user_id: int) -> int:
+    """
+    Функция для подсчёта непрочитанных уведомлений пользователя.
+    """
+    query = select(func.count()).where(
+        Notification.user_id == user_id, Notification.is_read.is_(False)
+    )
+    return await db.scalar(query) or 0
+
+
+async def mark_notifications_read(db: AsyncSession, user_id: int) -> bool:
+    """
+    Функция для отметки всех уведомлений пользователя прочитанными.
+    """
+    query = (
+        update(Notification)
+        .where(Notification.user_id == user_id, Notification.is_read.is_(False))
+        .values(is_read=True)
+    )
+    await db.execute(query)
+    await db.commit()
+    return True
@@ -0,0 +1,50 @@
+from typing import Optional
+
+from sqlalchemy import text, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Откуда строки таблиц берут организацию: колонка со ссылкой и таблица, на которую она ссылается.
+# Порядок важен: media берут организацию из уже заполненных tweets
+ORGANIZATION_SOURCES = {
+    "follower_association": ("follower_id", "users"),
+    "tweets": ("author_id", "users"),
+    "likes": ("user_id", "users"),
+    "media": ("tweet_id", "tweets"),
+}
+
+
+def in_organization(model, organization_id: Optional[int]):
+    """
+    Условие «строка принадлежит организации organization_id».
+    Без организации (запрос до аутентификации, команды, фоновые задачи)
+    условие не ограничивает выборку.
+    """
+    if organization_id is None:
+        return true()
+    return model.organization_id == organization_id
+
+
+def sync_organization_sql(table: str) -> str:
+    """
+    UPDATE, проставляющий строкам table организацию пользователя (или твита),
+    к которому они относятся.
+    """
+    column, source = ORGANIZATION_SOURCES[table]
+    return (
+        f"UPDATE {table} SET organization_id = source.organization_id "
+        f"FROM {source} source WHERE source.id = {table}.{column} "
+        f"AND {table}.organization_id <> source.organization_id"
+    )
+
+
+async def sync_organizations(db: AsyncSession) -> dict[str, int]:
+    """
+    Функция для заполнения organization_id подписок, твитов, лайков и медиа
+    по организациям пользователей. Возвращает количество исправленных строк по таблицам.
+    Коммит не выполняется.
+    """
+    updated = {}
+    for table in ORGANIZATION_SOURCES:
+        result = await db.execute(text(sync_organization_sql(table)))
+        updated[table] = result.rowcount
+    return updated
@@ -0,0 +1,76 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.partitions import create_partition_sql, partition_bounds, partition_name
+from app.models import Notification, TweetHashtag, TweetMention
+
+
+async def get_partition_indexes(db: AsyncSession, table: str) -> list[int]:
+    """
+    Функция для получения номеров присоединённых секций таблицы.
+    """
+    query = text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = :table"
+    )
+    result = await db.execute(query, {"table": table})
+    prefix = f"{table}_p"
+    return [
+        int(name[len(prefix) :])
+        for name in result.scalars().all()
+        if name.startswith(prefix) and name[len(prefix) :].isdigit()
+    ]
+
+
+async def create_partition(db: AsyncSession, table: str, index: int):
+    """
+    Функция для создания секции таблицы tweets или likes.
+    """
+    await db.execute(text(create_partition_sql(table, index)))
+
+
+async def get_partition_latest_created_at(
+    db: AsyncSession, name: str
+) -> Optional[datetime]:
+    """
+    Функция для получения времени создания самой новой записи секции.
+    """
+    return await db.scalar(text(f"SELECT max(created_at) FROM {name}"))
+
+
+async def archive_partition_dependents(db: AsyncSession, index: int):
+    """
+    Функция для освобождения секции твитов от внешних ссылок перед отсоединением.
+    Медиа переносятся в архивную таблицу media_pNNNN, хэштеги, упоминания
+    и уведомления удаляются.
+    """
+    lower, upper = partition_bounds(index)
+    archive = partition_name("media", index)
+    params = {"lower": lower, "upper": upper}
+    await db.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {archive} AS SELECT * FROM media "
+            "WHERE tweet_id >= :lower AND tweet_id < :upper"
+        ),
+        params,
+    )
+    await db.execute(
+        text("DELETE FROM media WHERE tweet_id >= :lower AND tweet_id < :upper"),
+        params,
+    )
+    for model in (TweetHashtag, TweetMention, Notification):
+        await db.execute(
+            delete(model).where(model.tweet_id >= lower, model.tweet_id < upper)
+        )
+
+
+async def detach_partition(db: AsyncSession, table: str, name: str):
+    """
+    Функция для отсоединения секции от таблицы.
+    """
+    await db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
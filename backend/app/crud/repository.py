@@ -0,0 +1,299 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.api_keys import verify_api_key
+from app.crud.followers import delete_follow_association, follow_user, get_follow_ids
+from app.crud.graph import get_max_tweet_id, stream_follow_edges, stream_like_edges
+from app.crud.hashtags import get_mentions_for_user, get_tweets_by_hashtag
+from app.crud.like import create_like, delete_like, get_likers_by_tweet_ids
+from app.crud.media import (
+    attach_media_to_tweet,
+    get_media_paths_by_tweet_ids,
+    save_media_in_database,
+)
+from app.crud.tweet import (
+    create_retweet,
+    create_tweet,
+    delete_retweet,
+    delete_tweet,
+    get_feed_for_user,
+    get_repost_target_id,
+    get_thread_tweets,
+    get_tweet,
+    get_tweet_root_id,
+    get_tweets_by_ids,
+)
+from app.crud.user import get_user_by_id, get_user_names, get_users_by_ids
+from app.models import Like, Media, Tweet, User
+
+
+class Repository(ABC):
+    """
+    Хранилище пользователей, подписок, твитов, лайков и медиа,
+    с которым работают основные эндпоинты API.
+    Методы повторяют одноимённые функции app.crud без параметра db.
+    Реализации: SqlRepository (Postgres) и MemoryRepository (app.crud.memory),
+    выбираются настройкой REPOSITORY_BACKEND.
+    organization_id - организация текущего пользователя, её проставляет
+    get_current_user после аутентификации. Твиты, пользователи, подписки,
+    лайки и медиа других организаций хранилище не находит и не изменяет.
+    """
+
+    organization_id: Optional[int] = None
+
+    @abstractmethod
+    async def verify_api_key(
+        self, api_key: str
+    ) -> tuple[Optional[int], Optional[datetime]]:
+        """
+        Возвращает (id пользователя, срок действия ключа) или (None, None).
+        """
+
+    @abstractmethod
+    async def get_user_by_id(self, user_id: int) -> Optional[User]: ...
+
+    @abstractmethod
+    async def get_user_names(self, user_ids: list[int]) -> dict[int, str]: ...
+
+    @abstractmethod
+    async def get_users_by_ids(self, user_ids: list[int]) -> list[User]: ...
+
+    @abstractmethod
+    async def follow_user(self, following_id: int, follower_id: int) -> bool:
+        """
+        Подписка. Повторная подписка на того же пользователя - False.
+        """
+
+    @abstractmethod
+    async def delete_follow_association(
+        self, following_id: int, follower_id: int
+    ) -> bool: ...
+
+    @abstractmethod
+    async def get_follow_ids(self, user_id: int) -> tuple[list[int], list[int]]:
+        """
+        Возвращает id подписчиков и подписок пользователя.
+        """
+
+    @abstractmethod
+    async def create_tweet(self, data: dict) -> Optional[Tweet]: ...
+
+    @abstractmethod
+    async def get_tweet(self, tweet_id: int) -> Optional[Tweet]: ...
+
+    @abstractmethod
+    async def get_tweets_by_ids(self, tweet_ids: list[int]) -> dict[int, Tweet]: ...
+
+    @abstractmethod
+    async def get_repost_target_id(self, tweet_id: int) -> Optional[int]: ...
+
+    @abstractmethod
+    async def get_tweet_root_id(self, tweet_id: int) -> Optional[int]: ...
+
+    @abstractmethod
+    async def get_thread_tweets(self, root_id: int, limit: int) -> list[Tweet]: ...
+
+    @abstractmethod
+    async def create_retweet(self, user_id: int, tweet_id: int) -> Optional[Tweet]: ...
+
+    @abstractmethod
+    async def delete_retweet(self, user_id: int, tweet_id: int) -> bool: ...
+
+    @abstractmethod
+    async def get_feed_for_user(
+        self,
+        user_id: int,
+        sort: str = "top",
+        limit: int = 20,
+        cursor: Optional[tuple] = None,
+    ) -> tuple[list[tuple[Tweet, tuple]], Optional[tuple]]: ...
+
+    @abstractmethod
+    async def get_tweets_by_hashtag(
+        self, tag: str, limit: int, before_id: Optional[int] = None
+    ) -> list[Tweet]:
+        """
+        Твиты с хэштегом от новых к старым, с id меньше before_id.
+        """
+
+    @abstractmethod
+    async def get_mentions_for_user(
+        self, user_id: int, limit: int, before_id: Optional[int] = None
+    ) -> list[Tweet]:
+        """
+        Твиты, в которых упомянут пользователь, от новых к старым, с id меньше before_id.
+        """
+
+    @abstractmethod
+    async def delete_tweet(self, user_id: int, tweet_id: int) -> bool:
+        """
+        Удаление твита. Для чужого твита выбрасывается HTTPException 403.
+        """
+
+    @abstractmethod
+    async def create_like(self, user_id: int, tweet_id: int) -> Optional[Like | bool]:
+        """
+        Лайк. Повторный лайк и лайк удалённого твита - None.
+        """
+
+    @abstractmethod
+    async def delete_like(self, user_id: int, tweet_id: int) -> bool: ...
+
+    @abstractmethod
+    async def get_likers_by_tweet_ids(
+        self, tweet_ids: list[int]
+    ) -> dict[int, list[int]]: ...
+
+    @abstractmethod
+    async def get_max_tweet_id(self) -> int: ...
+
+    @abstractmethod
+    def stream_follow_edges(self) -> AsyncIterator[list[tuple[int, int]]]:
+        """
+        Пары (follower_id, following_id) всех организаций пачками,
+        отсортированные по follower_id. Используется для построения app.core.graph.
+        """
+
+    @abstractmethod
+    def stream_like_edges(
+        self, min_tweet_id: int, by_tweet: bool = False
+    ) -> AsyncIterator[list[tuple[int, int]]]:
+        """
+        Пары (user_id, tweet_id) лайков твитов начиная с min_tweet_id пачками,
+        отсортированные по первому элементу, или (tweet_id, user_id) при by_tweet=True.
+        """
+
+    @abstractmethod
+    async def save_media_in_database(
+        self, path: str, tweet_id: Optional[int] = None
+    ) -> Optional[Media]: ...
+
+    @abstractmethod
+    async def attach_media_to_tweet(
+        self, media_ids: Optional[list[int]], tweet_id: int
+    ) -> None: ...
+
+    @abstractmethod
+    async def get_media_paths_by_tweet_ids(
+        self, tweet_ids: list[int]
+    ) -> dict[int, list[str]]: ...
+
+
+class SqlRepository(Repository):
+    """
+    Хранилище в Postgres: вызывает функции app.crud в сессии запроса.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def verify_api_key(self, api_key):
+        return await verify_api_key(self.db, api_key)
+
+    async def get_user_by_id(self, user_id):
+        return await get_user_by_id(self.db, user_id, self.organization_id)
+
+    async def get_user_names(self, user_ids):
+        return await get_user_names(self.db, user_ids)
+
+    async def get_users_by_ids(self, user_ids):
+        return await get_users_by_ids(self.db, user_ids, self.organization_id)
+
+    async def follow_user(self, following_id, follower_id):
+        return await follow_user(self.db, following_id, follower_id)
+
+    async def delete_follow_association(self, following_id, follower_id):
+        return await delete_follow_association(self.db, following_id, follower_id)
+
+    async def get_follow_ids(self, user_id):
+        return await get_follow_ids(self.db, user_id, self.organization_id)
+
+    async def create_tweet(self, data):
+        if self.organization_id is not None:
+            data = {**data, "organization_id": self.organization_id}
+        return await create_tweet(self.db, data)
+
+    async def get_tweet(self, tweet_id):
+        return await get_tweet(self.db, tweet_id, self.organization_id)
+
+    async def get_tweets_by_ids(self, tweet_ids):
+        return await get_tweets_by_ids(self.db, tweet_ids, self.organization_id)
+
+    async def get_repost_target_id(self, tweet_id):
+        return await get_repost_target_id(self.db, tweet_id, self.organization_id)
+
+    async def get_tweet_root_id(self, tweet_id):
+        return await get_tweet_root_id(self.db, tweet_id, self.organization_id)
+
+    async def get_thread_tweets(self, root_id, limit):
+        return await get_thread_tweets(self.db, root_id, limit, self.organization_id)
+
+    async def create_retweet(self, user_id, tweet_id):
+        return await create_retweet(self.db, user_id, tweet_id, self.organization_id)
+
+    async def delete_retweet(self, user_id, tweet_id):
+        return await delete_retweet(self.db, user_id, tweet_id, self.organization_id)
+
+    async def get_feed_for_user(self, user_id, sort="top", limit=20, cursor=None):
+        return await get_feed_for_user(
+            self.db, user_id, sort, limit, cursor, self.organization_id
+        )
+
+    async def get_tweets_by_hashtag(self, tag, limit, before_id=None):
+        return await get_tweets_by_hashtag(
+            self.db, tag, limit, before_id, self.organization_id
+        )
+
+    async def get_mentions_for_user(self, user_id, limit, before_id=None):
+        return await get_mentions_for_user(
+            self.db, user_id, limit, before_id, self.organization_id
+        )
+
+    async def delete_tweet(self, user_id, tweet_id):
+        return await delete_tweet(self.db, user_id, tweet_id, self.organization_id)
+
+    async def create_like(self, user_id, tweet_id):
+        return await create_like(self.db, user_id, tweet_id)
+
+    async def delete_like(self, user_id, tweet_id):
+        return await delete_like(self.db, user_id, tweet_id, self.organization_id)
+
+    async def get_likers_by_tweet_ids(self, tweet_ids):
+        return await get_likers_by_tweet_ids(self.db, tweet_ids, self.organization_id)
+
+    async def get_max_tweet_id(self):
+        return await get_max_tweet_id(self.db)
+
+    def stream_follow_edges(self):
+        return stream_follow_edges(self.db)
+
+    def stream_like_edges(self, min_tweet_id, by_tweet=False):
+        return stream_like_edges(self.db, min_tweet_id, by_tweet)
+
+    async def save_media_in_database(self, path, tweet_id=None):
+        return await save_media_in_database(
+            self.db, path, tweet_id, self.organization_id
+        )
+
+    async def attach_media_to_tweet(self, media_ids, tweet_id):
+        await attach_media_to_tweet(self.db, media_ids, tweet_id, self.organization_id)
+
+    async def get_media_paths_by_tweet_ids(self, tweet_ids):
+        return await get_media_paths_by_tweet_ids(
+            self.db, tweet_ids, self.organization_id
+        )
+
+
+def create_repository(db: AsyncSession) -> Repository:
+    """
+    Создаёт хранилище запроса согласно настройке REPOSITORY_BACKEND.
+    """
+    if settings.REPOSITORY_BACKEND == "memory":
+        from app.crud.memory import MemoryRepository, get_memory_store
+
+        return MemoryRepository(get_memory_store())
+    return SqlRepository(db)
@@ -0,0 +1,78 @@
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import Numeric, cast, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.crud.organizations import in_organization
+from app.models import Like, Tweet, User
+
+TS_CONFIG = "simple"
+
+
+async def search_tweets(
+    db: AsyncSession,
+    q: str,
+    limit: int,
+    cursor: Optional[tuple[Decimal, int]] = None,
+    organization_id: Optional[int] = None,
+) -> list[tuple[Tweet, Decimal]]:
+    """
+    Функция для полнотекстового поиска по твитам организации.
+    Совпадения ищутся по GIN-индексу на search_vector, ранжируются только
+    последние SEARCH_CANDIDATE_LIMIT совпадений, поэтому время запроса
+    не зависит от общего количества твитов.
+    Пагинация по ключу (rank, id).
+    """
+    ts_query = func.websearch_to_tsquery(TS_CONFIG, q)
+    rank = cast(func.ts_rank_cd(Tweet.search_vector, ts_query), Numeric(12, 6))
+    candidates = (
+        select(Tweet.id.label("id"), rank.label("rank"))
+        .where(
+            Tweet.search_vector.op("@@")(ts_query),
+            Tweet.deleted_at.is_(None),
+            in_organization(Tweet, organization_id),
+        )
+        .order_by(Tweet.id.desc())
+        .limit(settings.SEARCH_CANDIDATE_LIMIT)
+        .subquery()
+    )
+
+    query = (
+        select(Tweet, candidates.c.rank)
+        .join(candidates, candidates.c.id == Tweet.id)
+        .options(
+            selectinload(Tweet.author),
+            selectinload(Tweet.likes).selectinload(Like.user),
+            selectinload(Tweet.medias),
+        )
+        .order_by(candidates.c.rank.desc(), candidates.c.id.desc())
+        .limit(limit)
+    )
+    if cursor:
+        query = query.where(
+            tuple_(candidates.c.rank, candidates.c.id) < tuple_(*cursor)
+        )
+
+    result = await db.execute(query)
+    return [(row[0], row[1]) for row in result.all()]
+
+
+async def search_users(
+    db: AsyncSession, q: str, limit: int, organization_id: Optional[int] = None
+) -> list[User]:
+    """
+    Функция для поиска по именам пользователей организации.
+    ILIKE использует триграммный GIN-индекс, результаты сортируются по похожести.
+    """
+    pattern = "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    query = (
+        select(User)
+        .where(User.name.ilike(pattern), in_organization(User, organization_id))
+        .order_by(func.similarity(User.name, q).desc(), User.id)
+        .limit(limit)
+    )
+    result = await db.execute(query)
+    return list(result.scalars().all())
@@ -0,0 +1,67 @@
+from datetime import datetime
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import HashtagCount
+
+
+async def flush_hashtag_counts(
+    db: AsyncSession, rows: list[dict], expire_before: datetime
+):
+    """
+    Функция для прибавления накопленных счётчиков к записям таблицы hashtag_counts.
+    Заодно удаляет корзины старше expire_before.
+    """
+    if rows:
+        query = insert(HashtagCount).values(rows)
+        query = query.on_conflict_do_update(
+            index_elements=[
+                HashtagCount.organization_id,
+                HashtagCount.bucket_start,
+                HashtagCount.tag,
+            ],
+            set_={"count": HashtagCount.count + query.excluded.count},
+        )
+        await db.execute(query)
+    await db.execute(
+        delete(HashtagCount).where(HashtagCount.bucket_start < expire_before)
+    )
+    await db.commit()
+
+
+async def get_top_hashtags(
+    db: AsyncSession, since: datetime, limit: int
+) -> dict[int, list[tuple[str, int]]]:
+    """
+    Функция для получения самых частых хэштегов каждой организации
+    начиная с момента since: не больше limit хэштегов на организацию.
+    """
+    total = func.sum(HashtagCount.count)
+    ranked = (
+        select(
+            HashtagCount.organization_id,
+            HashtagCount.tag,
+            total.label("total"),
+            func.row_number()
+            .over(
+                partition_by=HashtagCount.organization_id,
+                order_by=(total.desc(), HashtagCount.tag),
+            )
+            .label("rank"),
+        )
+        .where(HashtagCount.bucket_start >= since)
+        .group_by(HashtagCount.organization_id, HashtagCount.tag)
+        .subquery()
+    )
+    query = (
+        select(ranked.c.organization_id, ranked.c.tag, ranked.c.total)
+        .where(ranked.c.rank <= limit)
+        .order_by(ranked.c.organization_id, ranked.c.rank)
+    )
+    result = await db.execute(query)
+    top: dict[int, list[tuple[str, int]]] = {}
+    for organization_id, tag, count in result.all():
+        top.setdefault(organization_id, []).append((tag, int(count)))
+    return top
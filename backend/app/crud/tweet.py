@@ -1,72 +1,491 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
 from fastapi import HTTPException, status
-from sqlalchemy import func, or_, select
+from sqlalchemy import and_, case, delete, func, not_, or_, select, tuple_, update
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased
 
-from app.models import FollowerAssociation, Like, Tweet
+from app.core.config import settings
+from app.core.entities import extract_hashtags
+from app.core.events import publish_event
+from app.core.ranking import Candidate, get_ranking_pipeline
+from app.core.single_flight import single_flight
+from app.core.threads import thread_cache
+from app.core.trending import trending_aggregator
+from app.crud.hashtags import save_tweet_entities
+from app.crud.organizations import in_organization
+from app.models import FollowerAssociation, Like, Media, Tweet, User
 
 
 async def create_tweet(db: AsyncSession, data: dict):
     """
     Функция для создания записи в таблице tweets.
+    В той же транзакции сохраняются хэштеги и упоминания из текста твита,
+    после коммита хэштеги учитываются в счётчиках трендов.
+    Для ответа сбрасывается закэшированная беседа.
+    Твит относится к организации автора: если organization_id не передан,
+    он берётся из users.
     """
+    if "organization_id" not in data:
+        query = select(User.organization_id).where(User.id == data["author_id"])
+        data = {**data, "organization_id": await db.scalar(query)}
     new_tweet = Tweet(**data)
     try:
         db.add(new_tweet)
+        await db.flush()
+        await save_tweet_entities(db=db, tweets=[new_tweet])
         await db.commit()
         await db.refresh(new_tweet)
-        return new_tweet
     except SQLAlchemyError:
+        await db.rollback()
+        return None
+    trending_aggregator.record(
+        extract_hashtags(new_tweet.content), new_tweet.organization_id
+    )
+    if new_tweet.root_id is not None:
+        thread_cache.invalidate(new_tweet.root_id)
+    publish_event("tweet_created", new_tweet.id, new_tweet.author_id, new_tweet.author_id)
+    return new_tweet
+
+
+def _is_retweet(tweet):
+    """
+    Условие «твит - ретвит»: ссылка на оригинал без собственного текста.
+    """
+    return and_(tweet.repost_of_id.is_not(None), tweet.content == "")
+
+
+def _original_is_live():
+    """
+    Условие «твит не ретвит или его оригинал не удалён».
+    """
+    original = aliased(Tweet)
+    live_original = (
+        select(original.id)
+        .where(original.id == Tweet.repost_of_id, original.deleted_at.is_(None))
+        .exists()
+    )
+    return or_(not_(_is_retweet(Tweet)), live_original)
+
+
+async def get_tweet(
+    db: AsyncSession, tweet_id: int, organization_id: Optional[int] = None
+) -> Optional[Tweet]:
+    """
+    Функция для получения неудалённого твита организации organization_id.
+    Автор, лайки, медиа и оригинал загружаются через app.core.loaders.
+    """
+    query = select(Tweet).where(
+        Tweet.id == tweet_id,
+        Tweet.deleted_at.is_(None),
+        in_organization(Tweet, organization_id),
+    )
+    return await db.scalar(query)
+
+
+async def get_tweets_by_ids(
+    db: AsyncSession, tweet_ids: list[int], organization_id: Optional[int] = None
+) -> dict[int, Tweet]:
+    """
+    Функция для получения неудалённых твитов организации по списку id одним запросом.
+    """
+    query = select(Tweet).where(
+        Tweet.id.in_(tweet_ids),
+        Tweet.deleted_at.is_(None),
+        in_organization(Tweet, organization_id),
+    )
+    result = await db.execute(query)
+    return {tweet.id: tweet for tweet in result.scalars().all()}
+
+
+async def get_repost_target_id(
+    db: AsyncSession, tweet_id: int, organization_id: Optional[int] = None
+) -> Optional[int]:
+    """
+    Функция для получения id твита, на который будет ссылаться ретвит или цитата.
+    Ретвит ретвита ссылается на оригинал. Если твит или оригинал удалён
+    или твит из другой организации - None.
+    """
+    query = select(Tweet.id, Tweet.repost_of_id, Tweet.content).where(
+        Tweet.id == tweet_id,
+        Tweet.deleted_at.is_(None),
+        in_organization(Tweet, organization_id),
+    )
+    row = (await db.execute(query)).first()
+    if row is None:
         return None
+    if row.repost_of_id is None or row.content:
+        return row.id
+    query = select(Tweet.id).where(
+        Tweet.id == row.repost_of_id, Tweet.deleted_at.is_(None)
+    )
+    return await db.scalar(query)
+
+
+async def get_retweet_id(
+    db: AsyncSession, user_id: int, tweet_id: int, organization_id: Optional[int] = None
+) -> Optional[int]:
+    """
+    Функция для получения id ретвита твита tweet_id пользователем.
+    Ретвит всегда новее оригинала, поэтому условие id > tweet_id
+    отсекает более ранние секции tweets.
+    """
+    query = select(Tweet.id).where(
+        in_organization(Tweet, organization_id),
+        Tweet.repost_of_id == tweet_id,
+        Tweet.author_id == user_id,
+        Tweet.content == "",
+        Tweet.id > tweet_id,
+        Tweet.deleted_at.is_(None),
+    )
+    return await db.scalar(query)
+
+
+async def create_retweet(
+    db: AsyncSession, user_id: int, tweet_id: int, organization_id: Optional[int] = None
+) -> Optional[Tweet]:
+    """
+    Функция для создания ретвита - строки tweets без текста со ссылкой на оригинал.
+    Если пользователь уже ретвитнул этот твит - None.
+    Уникальный индекс на секционированной tweets обязан включать id,
+    поэтому проверка и вставка выполняются под транзакционной advisory-блокировкой
+    по (user_id, tweet_id): конкурентные ретвиты одного твита идут по очереди.
+    """
+    await db.execute(select(func.pg_advisory_xact_lock(user_id, tweet_id)))
+    if await get_retweet_id(db, user_id, tweet_id, organization_id) is not None:
+        await db.rollback()
+        return None
+    data = {"content": "", "author_id": user_id, "repost_of_id": tweet_id}
+    if organization_id is not None:
+        data["organization_id"] = organization_id
+    return await create_tweet(db, data)
+
+
+async def delete_retweet(
+    db: AsyncSession, user_id: int, tweet_id: int, organization_id: Optional[int] = None
+) -> bool:
+    """
+    Функция для отмены ретвита твита tweet_id пользователем.
+    """
+    retweet_id = await get_retweet_id(db, user_id, tweet_id, organization_id)
+    if retweet_id is None:
+        return False
+    return await delete_tweet(db, user_id, retweet_id)
+
+
+async def get_tweet_root_id(
+    db: AsyncSession, tweet_id: int, organization_id: Optional[int] = None
+) -> Optional[int]:
+    """
+    Функция для получения id первого твита беседы, в которой находится твит.
+    Для удалённого, несуществующего или чужой организации твита возвращается None.
+    """
+    query = select(func.coalesce(Tweet.root_id, Tweet.id)).where(
+        Tweet.id == tweet_id,
+        Tweet.deleted_at.is_(None),
+        in_organization(Tweet, organization_id),
+    )
+    return await db.scalar(query)
+
+
+@single_flight
+async def get_thread_tweets(
+    db: AsyncSession, root_id: int, limit: int, organization_id: Optional[int] = None
+) -> list[Tweet]:
+    """
+    Функция для загрузки не больше limit первых твитов беседы по индексу root_id.
+    Ответы всегда новее первого твита, поэтому условие id >= root_id
+    отсекает более ранние секции tweets.
+    Одинаковые конкурентные запросы объединяются в один запрос к БД.
+    """
+    query = (
+        select(Tweet)
+        .where(
+            in_organization(Tweet, organization_id),
+            or_(Tweet.id == root_id, Tweet.root_id == root_id),
+            Tweet.id >= root_id,
+            Tweet.deleted_at.is_(None),
+        )
+        .order_by(Tweet.id)
+        .limit(limit)
+    )
+    result = await db.execute(query)
+    return list(result.scalars().all())
 
 
-async def get_feed_for_user(db: AsyncSession, user_id: int) -> list[Tweet]:
+async def get_first_tweet_id_since(
+    db: AsyncSession, since: datetime, organization_id: Optional[int] = None
+) -> Optional[int]:
     """
-    Функция для получения записей из таблицы tweets с сортировкой по количеству лайков.
+    Функция для получения id первого твита организации, созданного не раньше since.
+    """
+    query = (
+        select(Tweet.id)
+        .where(in_organization(Tweet, organization_id), Tweet.created_at >= since)
+        .order_by(Tweet.created_at, Tweet.id)
+        .limit(1)
+    )
+    return await db.scalar(query)
+
+
+def _feed_authors(user_id: int, organization_id: Optional[int]):
+    """
+    Условие «твит организации, автор - сам пользователь или тот, на кого он подписан».
     """
     following_subquery = (
         select(FollowerAssociation.following_id)
-        .where(FollowerAssociation.follower_id == user_id)
+        .where(
+            in_organization(FollowerAssociation, organization_id),
+            FollowerAssociation.follower_id == user_id,
+        )
         .scalar_subquery()
     )
+    return and_(
+        in_organization(Tweet, organization_id),
+        or_(Tweet.author_id.in_(following_subquery), Tweet.author_id == user_id),
+    )
 
+
+async def _feed_min_tweet_id(
+    db: AsyncSession, organization_id: Optional[int]
+) -> int:
+    """
+    Нижняя граница id твитов ленты: первый твит организации
+    за последние FEED_WINDOW_DAYS дней.
+    Условие задаётся по id, поэтому планировщик читает только секции
+    tweets и likes этого периода. Если за это время твитов не было,
+    лента читается без ограничения, а не оказывается пустой.
+    """
+    if not settings.FEED_WINDOW_DAYS:
+        return 1
+    since = datetime.now(timezone.utc) - timedelta(days=settings.FEED_WINDOW_DAYS)
+    return await get_first_tweet_id_since(db, since, organization_id) or 1
+
+
+async def get_feed_candidates(
+    db: AsyncSession,
+    user_id: int,
+    min_tweet_id: int,
+    limit: int,
+    organization_id: Optional[int] = None,
+) -> list[Candidate]:
+    """
+    Функция для выборки кандидатов в ленту: последние limit твитов
+    пользователя и его подписок, начиная с твита min_tweet_id,
+    вместе со счётчиком лайков.
+    Ретвит получает лайки оригинала, ретвиты удалённых твитов пропускаются.
+    Из нескольких ретвитов одного твита (и самого твита) остаётся самый новый.
+    """
+    original = aliased(Tweet)
+    retweet = _is_retweet(Tweet)
     query = (
-        select(Tweet, func.count(Like.id).label("likes_count"))
-        .where(or_(Tweet.author_id.in_(following_subquery), Tweet.author_id == user_id))
-        .outerjoin(Like, Like.tweet_id == Tweet.id)
-        .options(
-            selectinload(Tweet.author),
-            selectinload(Tweet.likes).selectinload(Like.user),
-            selectinload(Tweet.medias),
+        select(
+            Tweet.id,
+            Tweet.author_id,
+            Tweet.created_at,
+            case((retweet, original.likes_count), else_=Tweet.likes_count),
+            case((retweet, Tweet.repost_of_id), else_=Tweet.id),
         )
-        .group_by(Tweet.id)
-        .order_by(func.count(Like.id).desc())
+        .outerjoin(
+            original,
+            and_(
+                retweet,
+                original.id == Tweet.repost_of_id,
+                original.deleted_at.is_(None),
+            ),
+        )
+        .where(
+            _feed_authors(user_id, organization_id),
+            Tweet.deleted_at.is_(None),
+            Tweet.id >= min_tweet_id,
+            or_(not_(retweet), original.id.is_not(None)),
+        )
+        .order_by(Tweet.id.desc())
+        .limit(limit)
     )
-
     result = await db.execute(query)
-    tweets = [row[0] for row in result.all()]
-    return tweets
+    candidates, seen = [], set()
+    for tweet_id, author_id, created_at, likes, shown_id in result.all():
+        if shown_id in seen:
+            continue
+        seen.add(shown_id)
+        candidates.append(
+            Candidate(
+                tweet_id=tweet_id, author_id=author_id, created_at=created_at, likes=likes
+            )
+        )
+    return candidates
 
 
-async def delete_tweet(db: AsyncSession, user_id: int, tweet_id: int) -> bool:
+@single_flight
+async def get_feed_for_user(
+    db: AsyncSession,
+    user_id: int,
+    sort: str = "top",
+    limit: int = 20,
+    cursor: Optional[tuple] = None,
+    organization_id: Optional[int] = None,
+) -> tuple[list[tuple[Tweet, tuple]], Optional[tuple]]:
     """
-    Функция для удаления записи из таблицы tweets.
+    Функция для получения страницы ленты пользователя.
+    Все условия начинаются с organization_id, как и индексы tweets,
+    поэтому лента читает только строки организации пользователя.
+    Возвращает пары (твит, ключ пагинации) и ключ, после которого начинается
+    следующая страница (None, если страница последняя).
+    Ретвиты удалённых твитов пропускаются, повторные ретвиты одного твита
+    в пределах страницы отбрасываются, поэтому страница может быть короче limit.
+    Авторы, лайки, медиа и оригиналы ретвитов загружаются через app.core.loaders.
+    sort:
+        recent - от новых к старым, ключ (created_at, id);
+        top - по количеству лайков, ключ (лайки, id);
+        ranked - по затухающей со временем популярности, ключ (оценка, id, момент расчёта).
+    top и ranked ранжируют не больше FEED_CANDIDATE_LIMIT последних твитов
+    конвейером из app.core.ranking. Момент расчёта передаётся в курсоре,
+    чтобы оценки не менялись между страницами.
+    Одинаковые конкурентные запросы объединяются в один запрос к БД.
     """
-    query = select(Tweet).where(Tweet.id == tweet_id)
-    result = await db.execute(query)
-    tweet = result.scalar_one_or_none()
-    if tweet is None:
+    min_tweet_id = await _feed_min_tweet_id(db, organization_id)
+
+    if sort == "recent":
+        query = (
+            select(Tweet)
+            .where(
+                _feed_authors(user_id, organization_id),
+                Tweet.deleted_at.is_(None),
+                Tweet.id >= min_tweet_id,
+                _original_is_live(),
+            )
+            .order_by(Tweet.created_at.desc(), Tweet.id.desc())
+            .limit(limit)
+        )
+        if cursor:
+            query = query.where(tuple_(Tweet.created_at, Tweet.id) < tuple_(*cursor))
+        tweets = list((await db.execute(query)).scalars().all())
+        rows, seen = [], set()
+        for tweet in tweets:
+            shown_id = tweet.repost_of_id if tweet.is_retweet else tweet.id
+            if shown_id not in seen:
+                seen.add(shown_id)
+                rows.append((tweet, (tweet.created_at, tweet.id)))
+        next_key = (tweets[-1].created_at, tweets[-1].id) if len(tweets) == limit else None
+        return rows, next_key
+
+    candidates = await get_feed_candidates(
+        db, user_id, min_tweet_id, settings.FEED_CANDIDATE_LIMIT, organization_id
+    )
+    page, next_key = rank_feed_candidates(candidates, sort, limit, cursor)
+    by_id = await get_tweets_by_ids(
+        db, [tweet_id for tweet_id, _ in page], organization_id
+    )
+    return [(by_id[i], key) for i, key in page if i in by_id], next_key
+
+
+def rank_feed_candidates(
+    candidates: list[Candidate], sort: str, limit: int, cursor: Optional[tuple]
+) -> tuple[list[tuple[int, tuple]], Optional[tuple]]:
+    """
+    Ранжирует кандидатов ленты в режимах top и ranked.
+    Возвращает пары (id твита, ключ пагинации) и ключ следующей страницы.
+    """
+    now = datetime.now(timezone.utc)
+    if sort == "ranked" and cursor:
+        now = cursor[2]
+    page = get_ranking_pipeline(sort).rank(
+        candidates, now, limit, after=cursor[:2] if cursor else None
+    )
+    keys = [
+        (c.score, c.tweet_id, now) if sort == "ranked" else (c.likes, c.tweet_id)
+        for c in page
+    ]
+    next_key = keys[-1] if len(page) == limit else None
+    return [(c.tweet_id, key) for c, key in zip(page, keys)], next_key
+
+
+async def delete_tweet(
+    db: AsyncSession, user_id: int, tweet_id: int, organization_id: Optional[int] = None
+) -> bool:
+    """
+    Функция для удаления твита.
+    Твит только помечается удалённым и сразу пропадает из выдачи,
+    лайки, медиа и сама запись удаляются позже фоновой задачей (см. app.core.reaper).
+    """
+    query = select(Tweet.author_id, func.coalesce(Tweet.root_id, Tweet.id)).where(
+        Tweet.id == tweet_id,
+        Tweet.deleted_at.is_(None),
+        in_organization(Tweet, organization_id),
+    )
+    row = (await db.execute(query)).first()
+    if row is None:
         return False
-    if tweet.author_id != user_id:
+    author_id, root_id = row
+    if author_id != user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You can only delete your own tweets",
         )
     try:
-        await db.delete(tweet)
+        await db.execute(
+            update(Tweet)
+            .where(Tweet.id == tweet_id, Tweet.deleted_at.is_(None))
+            .values(deleted_at=func.now())
+        )
         await db.commit()
-        return True
-    except (SQLAlchemyError, HTTPException):
+    except SQLAlchemyError:
         await db.rollback()
         return False
+    thread_cache.invalidate(root_id)
+    publish_event("tweet_deleted", tweet_id, author_id, user_id)
+    return True
+
+
+async def get_deleted_tweet_ids(db: AsyncSession, limit: int) -> list[int]:
+    """
+    Функция для получения id твитов, помеченных удалёнными.
+    """
+    query = (
+        select(Tweet.id)
+        .where(Tweet.deleted_at.is_not(None))
+        .order_by(Tweet.deleted_at)
+        .limit(limit)
+    )
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
+async def purge_tweet_likes(db: AsyncSession, tweet_ids: list[int], limit: int) -> int:
+    """
+    Функция для удаления не более limit лайков удалённых твитов.
+    Возвращает количество удалённых записей.
+    """
+    batch = select(Like.id).where(Like.tweet_id.in_(tweet_ids)).limit(limit)
+    result = await db.execute(
+        delete(Like).where(Like.tweet_id.in_(tweet_ids), Like.id.in_(batch))
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def purge_tweet_media(db: AsyncSession, tweet_ids: list[int]) -> list[str]:
+    """
+    Функция для удаления записей media удалённых твитов.
+    Возвращает ключи файлов, которые нужно удалить из хранилища.
+    """
+    result = await db.execute(
+        delete(Media).where(Media.tweet_id.in_(tweet_ids)).returning(Media.path)
+    )
+    await db.commit()
+    return list(result.scalars().all())
+
+
+async def purge_tweets(db: AsyncSession, tweet_ids: list[int]) -> int:
+    """
+    Функция для физического удаления твитов, помеченных удалёнными.
+    Хэштеги, упоминания и уведомления удаляются каскадно.
+    """
+    result = await db.execute(
+        delete(Tweet).where(Tweet.id.in_(tweet_ids), Tweet.deleted_at.is_not(None))
+    )
+    await db.commit()
+    return result.rowcount
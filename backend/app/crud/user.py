@@ -1,47 +1,48 @@
+from typing import Optional
+
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
 
-from app.models import FollowerAssociation, User
+from app.core.single_flight import single_flight
+from app.crud.organizations import in_organization
+from app.models import User
 
 
-async def get_user_by_id(db: AsyncSession, user_id: int) -> User | None:
+@single_flight
+async def get_user_by_id(
+    db: AsyncSession, user_id: int, organization_id: Optional[int] = None
+) -> User | None:
     """
-    Функция для получения записи из таблицы users по id.
+    Функция для получения записи из таблицы users по id
+    (с organization_id - только пользователя этой организации).
+    Подписчики и подписки не загружаются: профиль собирается через app.core.loaders.
+    Одинаковые конкурентные запросы объединяются в один запрос к БД.
     """
-    query = (
-        select(User)
-        .where(User.id == user_id)
-        .options(
-            joinedload(User.followers).joinedload(FollowerAssociation.follower_user),
-            joinedload(User.following).joinedload(FollowerAssociation.following_user),
-        )
+    query = select(User).where(
+        User.id == user_id, in_organization(User, organization_id)
     )
-    result = await db.execute(query)
-    user = result.unique().scalar_one_or_none()
-    if user:
-        user.followers_users = [assoc.follower_user for assoc in user.followers]
-        user.following_users = [assoc.following_user for assoc in user.following]
+    return await db.scalar(query)
+
 
-    return user
+async def get_user_names(db: AsyncSession, user_ids: list[int]) -> dict[int, str]:
+    """
+    Функция для получения имён пользователей по списку id одним запросом.
+    """
+    result = await db.execute(select(User.id, User.name).where(User.id.in_(user_ids)))
+    return dict(result.all())
 
 
-async def get_user_by_api_key(db: AsyncSession, api_key: str) -> User | None:
+async def get_users_by_ids(
+    db: AsyncSession, user_ids: list[int], organization_id: Optional[int] = None
+) -> list[User]:
     """
-    Функция для получения записи из таблицы users по api_key.
+    Функция для получения записей из таблицы users по списку id с сохранением порядка.
     """
-    query = (
-        select(User)
-        .where(User.api_key == api_key)
-        .options(
-            joinedload(User.followers).joinedload(FollowerAssociation.follower_user),
-            joinedload(User.following).joinedload(FollowerAssociation.following_user),
-        )
+    if not user_ids:
+        return []
+    query = select(User).where(
+        User.id.in_(user_ids), in_organization(User, organization_id)
     )
     result = await db.execute(query)
-    user = result.unique().scalar_one_or_none()
-    if user:
-        user.followers_users = [assoc.follower_user for assoc in user.followers]
-        user.following_users = [assoc.following_user for assoc in user.following]
-
-    return user
+    users = {user.id: user for user in result.scalars().all()}
+    return [users[user_id] for user_id in user_ids if user_id in users]
@@ -1,19 +1,56 @@
+from sqlalchemy import DDL, event, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 
 from app.core.config import settings
 
-DATABASE_URL = settings.DATABASE_URL
+
+def parse_database_routes(value: str) -> dict[int, str]:
+    """
+    Разбирает ORGANIZATION_DATABASE_URLS вида "7=postgresql+asyncpg://...,12=..."
+    в словарь id организации -> URL её БД.
+    """
+    routes = {}
+    for item in value.split(","):
+        if item.strip():
+            organization_id, _, url = item.partition("=")
+            routes[int(organization_id)] = url.strip()
+    return routes
+
+
+def get_database_url(organization_id: int = 0) -> str:
+    """
+    URL БД организации: отдельная БД из ORGANIZATION_DATABASE_URLS
+    или общая DATABASE_URL для остальных организаций.
+    """
+    routes = parse_database_routes(settings.ORGANIZATION_DATABASE_URLS)
+    return routes.get(organization_id, settings.DATABASE_URL)
+
+
+# Воркер с ORGANIZATION_ID работает только с БД своей организации:
+# кэши, буферы и граф подписок в памяти процесса относятся к одной БД
+DATABASE_URL = get_database_url(settings.ORGANIZATION_ID)
 
 engine = create_async_engine(DATABASE_URL)
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 Base = declarative_base()
 
+# Расширение pg_trgm нужно для триграммного индекса по именам пользователей
+event.listen(
+    Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+)
+
 
 async def init_db():
     """
     Функция инициализации базы данных.
+    create_all не меняет существующие таблицы, поэтому users.api_key,
+    обязательный в старых схемах, делается необязательным отдельно:
+    иначе перенос ключей в api_keys не сможет его стереть.
     """
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            text("ALTER TABLE users ALTER COLUMN api_key DROP NOT NULL")
+        )
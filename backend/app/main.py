@@ -1,5 +1,8 @@
+# Профиль запуска импортируется первым, чтобы учесть время импорта всего остального
+from app.core.startup import startup_profile, warm_up  # isort: skip
+
 import asyncio
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI, HTTPException
 from fastapi.exceptions import RequestValidationError
@@ -7,9 +10,28 @@ from pydantic import ValidationError
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.api.handlers import universal_exception_handler
+from app.api.middleware import (
+    CacheHeadersMiddleware,
+    CompressionMiddleware,
+    FirstRequestMiddleware,
+    UploadSizeLimitMiddleware,
+)
+from app.api.routers.metrics import metrics_routers
+from app.api.routers.notifications import notification_routers
+from app.api.routers.search import search_routers
+from app.api.routers.stream import stream_routers
 from app.api.routers.tweets import tweet_routers
 from app.api.routers.users import user_routers
-from app.db.database import engine, init_db
+from app.core.config import settings
+from app.core.events import create_broadcaster, set_broadcaster
+from app.core.graph import run_graph_worker
+from app.core.likes import run_like_worker
+from app.core.media_validation import shutdown_validation_pool
+from app.core.notifications import run_notification_worker
+from app.core.partitions import run_partition_worker
+from app.core.reaper import run_reaper_worker
+from app.core.trending import run_trending_worker
+from app.db.database import async_session, engine, init_db
 
 
 @asynccontextmanager
@@ -17,15 +39,67 @@ async def lifespan(app: FastAPI):
     """
     Асинхронный контекстный менеджер жизненного цикла приложения FastAPI.
     Выполняет инициализацию при запуске приложения и очистку при завершении.
+    Создание схемы БД выполняется только при DB_CREATE_SCHEMA,
+    прогрев (STARTUP_WARMUP) идёт в фоне и не задерживает приём запросов.
+    С REPOSITORY_BACKEND=memory БД не используется и фоновые задачи не запускаются.
+    Без API_KEY_SECRET приложение с БД не запускается: ключи хэшировались бы
+    без секрета.
     """
     import app.models # type: ignore # noqa
 
-    await init_db()
+    with_db = settings.REPOSITORY_BACKEND != "memory"
+    if with_db and not settings.API_KEY_SECRET:
+        raise RuntimeError("API_KEY_SECRET must be set")
+    if with_db and settings.DB_CREATE_SCHEMA:
+        await init_db()
+        startup_profile.mark("init_db")
+    broadcaster = create_broadcaster()
+    await broadcaster.start()
+    set_broadcaster(broadcaster)
+    startup_profile.mark("broadcaster")
+    # Буфер лайков сбрасывается раньше буфера уведомлений,
+    # чтобы уведомления о последних лайках тоже были записаны
+    tasks = []
+    if with_db:
+        if settings.LIKES_WRITE_BEHIND:
+            tasks.append(asyncio.create_task(run_like_worker(async_session)))
+        tasks += [
+            asyncio.create_task(run_trending_worker(async_session)),
+            asyncio.create_task(run_graph_worker(async_session)),
+            asyncio.create_task(run_notification_worker(async_session)),
+            asyncio.create_task(run_reaper_worker(async_session)),
+            asyncio.create_task(run_partition_worker(async_session)),
+        ]
+    if settings.STARTUP_WARMUP:
+        tasks.append(asyncio.create_task(asyncio.to_thread(warm_up, app)))
+    startup_profile.mark_ready()
     yield
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await broadcaster.stop()
+    shutdown_validation_pool()
     await engine.dispose()
 
 
-app = FastAPI(lifespan=lifespan)
+startup_profile.mark("imports")
+
+if settings.DOCS_ENABLED:
+    app = FastAPI(lifespan=lifespan)
+else:
+    app = FastAPI(lifespan=lifespan, openapi_url=None, docs_url=None, redoc_url=None)
+
+app.add_middleware(UploadSizeLimitMiddleware, paths=("/api/medias",))
+app.add_middleware(CacheHeadersMiddleware)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        compresslevel=settings.COMPRESSION_LEVEL,
+        excluded_paths=("/api/users/me/export",),
+    )
+app.add_middleware(FirstRequestMiddleware)
 
 app.add_exception_handler(HTTPException, universal_exception_handler)
 app.add_exception_handler(RequestValidationError, universal_exception_handler)
@@ -35,3 +109,9 @@ app.add_exception_handler(Exception, universal_exception_handler)
 
 app.include_router(user_routers)
 app.include_router(tweet_routers)
+app.include_router(notification_routers)
+app.include_router(search_routers)
+app.include_router(stream_routers)
+app.include_router(metrics_routers)
+
+startup_profile.mark("app")
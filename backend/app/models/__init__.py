@@ -1,7 +1,22 @@
+from .api_key import ApiKey
 from .followers import FollowerAssociation
+from .hashtag import TweetHashtag, TweetMention
 from .like import Like
 from .media import Media
+from .notification import Notification
+from .trending import HashtagCount
 from .tweet import Tweet
 from .user import User
 
-__all__ = ["User", "Tweet", "Like", "Media", "FollowerAssociation"]
+__all__ = [
+    "User",
+    "Tweet",
+    "Like",
+    "Media",
+    "FollowerAssociation",
+    "TweetHashtag",
+    "TweetMention",
+    "HashtagCount",
+    "Notification",
+    "ApiKey",
+]
@@ -1,8 +1,9 @@
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import ForeignKey, Index, Integer, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.core.config import settings
 from app.db.database import Base
 
 if TYPE_CHECKING:
@@ -12,6 +13,7 @@ if TYPE_CHECKING:
 class FollowerAssociation(Base):
     """
     Модель ассоциативной таблицы для подписок между пользователями.
+    Подписки возможны только внутри организации, organization_id - организация обоих.
     """
 
     __tablename__ = "follower_association"
@@ -21,6 +23,9 @@ class FollowerAssociation(Base):
     following_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
     )
+    organization_id: Mapped[int] = mapped_column(
+        Integer, server_default=str(settings.DEFAULT_ORGANIZATION_ID)
+    )
 
     follower_user: Mapped["User"] = relationship(
         foreign_keys=[follower_id], back_populates="following"
@@ -30,5 +35,10 @@ class FollowerAssociation(Base):
     )
 
     __table_args__ = (
-        UniqueConstraint("follower_id", "following_id", name="unique_followership"),
+        UniqueConstraint(
+            "organization_id", "follower_id", "following_id", name="unique_followership"
+        ),
+        Index(
+            "ix_follower_association_org_following", "organization_id", "following_id"
+        ),
     )
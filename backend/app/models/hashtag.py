@@ -0,0 +1,34 @@
+from sqlalchemy import ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.database import Base
+
+
+class TweetHashtag(Base):
+    """
+    Модель таблицы хэштегов твитов.
+    Первичный ключ (tag, tweet_id) служит индексом для выборки твитов по хэштегу.
+    """
+
+    __tablename__ = "tweet_hashtags"
+
+    tag: Mapped[str] = mapped_column(String(100), primary_key=True)
+    tweet_id: Mapped[int] = mapped_column(
+        ForeignKey("tweets.id", ondelete="CASCADE"), primary_key=True
+    )
+
+
+class TweetMention(Base):
+    """
+    Модель таблицы упоминаний пользователей в твитах.
+    Первичный ключ (user_id, tweet_id) служит индексом для выборки упоминаний пользователя.
+    """
+
+    __tablename__ = "tweet_mentions"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    tweet_id: Mapped[int] = mapped_column(
+        ForeignKey("tweets.id", ondelete="CASCADE"), primary_key=True
+    )
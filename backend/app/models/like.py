@@ -1,8 +1,11 @@
+from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import DateTime, ForeignKey, Integer, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.core.config import settings
+from app.core.partitions import add_initial_partitions
 from app.db.database import Base
 
 if TYPE_CHECKING:
@@ -13,19 +16,38 @@ if TYPE_CHECKING:
 class Like(Base):
     """
     Модель таблицы лайков твитов.
+    Секционирована по tweet_id теми же диапазонами, что и tweets,
+    поэтому первичный ключ включает tweet_id.
+    organization_id совпадает с организацией пользователя и твита.
     """
 
     __tablename__ = "likes"
 
-    id: Mapped[int] = mapped_column(primary_key=True)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
-    tweet_id: Mapped[int] = mapped_column(ForeignKey("tweets.id", ondelete="CASCADE"))
+    tweet_id: Mapped[int] = mapped_column(
+        ForeignKey("tweets.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    organization_id: Mapped[int] = mapped_column(
+        Integer, server_default=str(settings.DEFAULT_ORGANIZATION_ID)
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
 
     user: Mapped["User"] = relationship(back_populates="likes")
     tweet: Mapped["Tweet"] = relationship(back_populates="likes")
 
-    __table_args__ = (UniqueConstraint("user_id", "tweet_id", name="unique_user_like"),)
+    __table_args__ = (
+        UniqueConstraint(
+            "organization_id", "user_id", "tweet_id", name="unique_user_like"
+        ),
+        {"postgresql_partition_by": "RANGE (tweet_id)"},
+    )
 
     @property
     def name(self) -> str:
         return self.user.name if self.user else ""
+
+
+add_initial_partitions(Like.__table__)
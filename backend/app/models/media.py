@@ -1,8 +1,9 @@
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.core.config import settings
 from app.db.database import Base
 
 if TYPE_CHECKING:
@@ -12,6 +13,8 @@ if TYPE_CHECKING:
 class Media(Base):
     """
     Модель таблицы для медиа-файлов, прикреплённых к твитам.
+    organization_id - организация загрузившего пользователя: прикрепить
+    медиа можно только к твиту той же организации.
     """
 
     __tablename__ = "media"
@@ -21,5 +24,12 @@ class Media(Base):
     tweet_id: Mapped[Optional[int]] = mapped_column(
         ForeignKey("tweets.id", ondelete="CASCADE"), nullable=True
     )
+    organization_id: Mapped[int] = mapped_column(
+        Integer, server_default=str(settings.DEFAULT_ORGANIZATION_ID)
+    )
 
     tweet: Mapped["Tweet"] = relationship(back_populates="medias")
+
+    __table_args__ = (
+        Index("ix_media_org_tweet", "organization_id", "tweet_id"),
+    )
@@ -0,0 +1,48 @@
+from datetime import datetime
+from typing import TYPE_CHECKING, Optional
+
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.db.database import Base
+
+if TYPE_CHECKING:
+    from .user import User
+
+
+class Notification(Base):
+    """
+    Модель таблицы уведомлений.
+    Непрочитанные уведомления одного типа об одном твите схлопываются в одну запись:
+    actors_count хранит количество действий, actor_id - последнего автора действия.
+    """
+
+    __tablename__ = "notifications"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    type: Mapped[str] = mapped_column(String(20))
+    tweet_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("tweets.id", ondelete="CASCADE"), nullable=True
+    )
+    actor_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    actors_count: Mapped[int] = mapped_column(Integer, default=1)
+    is_read: Mapped[bool] = mapped_column(Boolean, default=False, server_default="false")
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+    actor: Mapped["User"] = relationship(foreign_keys=[actor_id])
+
+    __table_args__ = (
+        Index(
+            "uq_notifications_unread",
+            "user_id",
+            "type",
+            "tweet_id",
+            unique=True,
+            postgresql_nulls_not_distinct=True,
+            postgresql_where=is_read.is_(False),
+        ),
+        Index("ix_notifications_user_updated", "user_id", "updated_at", "id"),
+    )
@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.config import settings
+from app.db.database import Base
+
+
+class HashtagCount(Base):
+    """
+    Модель таблицы счётчиков хэштегов по временным корзинам.
+    Счётчики ведутся отдельно для каждой организации: первичный ключ
+    (organization_id, bucket_start, tag) служит индексом для выборки
+    по окну времени внутри организации.
+    """
+
+    __tablename__ = "hashtag_counts"
+
+    organization_id: Mapped[int] = mapped_column(
+        Integer,
+        primary_key=True,
+        server_default=str(settings.DEFAULT_ORGANIZATION_ID),
+    )
+    bucket_start: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True
+    )
+    tag: Mapped[str] = mapped_column(String(100), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0)
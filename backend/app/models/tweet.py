@@ -1,9 +1,22 @@
-from typing import TYPE_CHECKING, List
+from datetime import datetime
+from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import (
+    Computed,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.config import settings
+from app.core.partitions import add_initial_partitions
+from app.core.storage import get_media_storage
 from app.db.database import Base
 
 if TYPE_CHECKING:
@@ -15,6 +28,16 @@ if TYPE_CHECKING:
 class Tweet(Base):
     """
     Модель таблицы твитов.
+    Удалённые твиты помечаются deleted_at и физически удаляются фоновой задачей.
+    Таблица секционирована диапазонами id (см. app.core.partitions):
+    id растут со временем, поэтому каждая секция хранит твиты одного периода.
+    Ответ хранит parent_id - твит, на который он отвечает, и root_id - первый твит
+    беседы. Внешних ключей на tweets у этих колонок нет: ответы остаются
+    после удаления родителя, а секции с твитами можно отсоединять.
+    Ретвит и цитата ссылаются на оригинал через repost_of_id и не копируют
+    его текст и медиа: у ретвита пустой content, у цитаты - собственный текст.
+    organization_id - организация автора, с неё начинаются составные индексы,
+    поэтому выборки одной организации не затрагивают строки других.
     """
 
     __tablename__ = "tweets"
@@ -22,6 +45,24 @@ class Tweet(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     content: Mapped[str] = mapped_column(String(300))
     author_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    organization_id: Mapped[int] = mapped_column(
+        Integer, server_default=str(settings.DEFAULT_ORGANIZATION_ID)
+    )
+    parent_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    root_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    repost_of_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed("to_tsvector('simple', coalesce(content, ''))", persisted=True),
+        deferred=True,
+    )
+    likes_count: Mapped[int] = mapped_column(Integer, server_default="0", default=0)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
 
     author: Mapped["User"] = relationship(back_populates="tweets")
     likes: Mapped[List["Like"]] = relationship(
@@ -32,9 +73,47 @@ class Tweet(Base):
         back_populates="tweet", cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        Index("ix_tweets_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_tweets_org_author_created_live",
+            "organization_id",
+            "author_id",
+            "created_at",
+            "id",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        Index("ix_tweets_org_created_at", "organization_id", "created_at"),
+        Index(
+            "ix_tweets_org_root_id",
+            "organization_id",
+            "root_id",
+            "id",
+            postgresql_where=text("root_id IS NOT NULL"),
+        ),
+        Index(
+            "ix_tweets_org_repost_of",
+            "organization_id",
+            "repost_of_id",
+            "author_id",
+            postgresql_where=text("repost_of_id IS NOT NULL"),
+        ),
+        Index(
+            "ix_tweets_deleted_at",
+            "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+        ),
+        {"postgresql_partition_by": "RANGE (id)"},
+    )
+
+    @property
+    def is_retweet(self) -> bool:
+        return self.repost_of_id is not None and not self.content
+
     @property
     def attachments(self) -> list[str]:
-        return [
-            f"{settings.PUBLIC_BASE_URL}/{media.path.lstrip('/')}"
-            for media in (self.medias or [])
-        ]
+        storage = get_media_storage()
+        return [storage.url(media.path) for media in (self.medias or [])]
+
+
+add_initial_partitions(Tweet.__table__)
@@ -1,11 +1,13 @@
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import String
+from sqlalchemy import Index, Integer, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.core.config import settings
 from app.db.database import Base
 
 if TYPE_CHECKING:
+    from .api_key import ApiKey
     from .followers import FollowerAssociation
     from .like import Like
     from .tweet import Tweet
@@ -14,16 +16,29 @@ if TYPE_CHECKING:
 class User(Base):
     """
     Модель таблицы пользователей.
+    api_key - устаревший ключ в открытом виде: при первом использовании
+    он переносится в api_keys в виде хэша и стирается.
+    organization_id - организация (арендатор) пользователя: его твиты, лайки,
+    медиа и подписки относятся к той же организации, а данные других
+    организаций ему не видны.
     """
 
     __tablename__ = "users"
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(50))
-    api_key: Mapped[str] = mapped_column(String(100), nullable=False, unique=True)
+    api_key: Mapped[Optional[str]] = mapped_column(String(100), nullable=True, unique=True)
+    organization_id: Mapped[int] = mapped_column(
+        Integer,
+        default=settings.DEFAULT_ORGANIZATION_ID,
+        server_default=str(settings.DEFAULT_ORGANIZATION_ID),
+    )
 
     tweets: Mapped[List["Tweet"]] = relationship(back_populates="author")
     likes: Mapped[List["Like"]] = relationship(back_populates="user")
+    api_keys: Mapped[List["ApiKey"]] = relationship(
+        back_populates="user", cascade="all, delete-orphan"
+    )
 
     followers: Mapped[List["FollowerAssociation"]] = relationship(
         foreign_keys="FollowerAssociation.following_id", back_populates="following_user"
@@ -32,3 +47,13 @@ class User(Base):
     following: Mapped[List["FollowerAssociation"]] = relationship(
         foreign_keys="FollowerAssociation.follower_id", back_populates="follower_user"
     )
+
+    __table_args__ = (
+        Index(
+            "ix_users_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index("ix_users_org_name_lower", "organization_id", text("lower(name)")),
+    )
@@ -0,0 +1,48 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class ApiKeySchema(BaseModel):
+    """
+    Схема для отображения API-ключа (без самого ключа).
+    """
+
+    id: int
+    name: Optional[str] = None
+    prefix: str
+    created_at: datetime
+    expires_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ApiKeyCreate(BaseModel):
+    """
+    Схема для выпуска API-ключа.
+    """
+
+    name: Optional[str] = Field(None, max_length=50)
+    expires_in_days: Optional[int] = Field(None, ge=1)
+
+
+class ApiKeyCreateResponse(BaseModel):
+    """
+    Схема для успешного ответа сервера с новым API-ключом.
+    Ключ показывается только один раз.
+    """
+
+    result: bool = Field(True)
+    api_key: str
+    key: ApiKeySchema
+
+
+class ApiKeyListResponse(BaseModel):
+    """
+    Схема для успешного ответа сервера со списком API-ключей.
+    """
+
+    result: bool = Field(True)
+    api_keys: List[ApiKeySchema]
@@ -0,0 +1,36 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from app.schemas.user import UserBaseSchema
+
+
+class NotificationSchema(BaseModel):
+    """
+    Схема для отображения уведомления.
+    actor - последний пользователь, совершивший действие,
+    actors_count - общее количество схлопнутых действий.
+    """
+
+    id: int
+    type: str
+    tweet_id: Optional[int] = None
+    actor: UserBaseSchema
+    actors_count: int
+    is_read: bool
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class NotificationsResponse(BaseModel):
+    """
+    Схема для успешного ответа сервера со страницей уведомлений.
+    """
+
+    result: bool = Field(True)
+    notifications: List[NotificationSchema]
+    unread_count: int
+    next_cursor: Optional[str] = None
@@ -0,0 +1,17 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from app.schemas.tweet import TweetSchema
+from app.schemas.user import UserBaseSchema
+
+
+class SearchResponse(BaseModel):
+    """
+    Схема для успешного ответа сервера после поиска.
+    """
+
+    result: bool = Field(True)
+    tweets: List[TweetSchema]
+    users: List[UserBaseSchema]
+    next_cursor: Optional[str] = None
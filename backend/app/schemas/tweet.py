@@ -1,4 +1,5 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -9,10 +10,14 @@ from app.schemas.user import UserBaseSchema
 class TweetCreate(BaseModel):
     """
     Схема для создания твита.
+    parent_id - твит, на который пишется ответ,
+    quote_tweet_id - цитируемый твит.
     """
 
     content: str = Field(alias="tweet_data")
     tweet_media_ids: Optional[List[int]] = []
+    parent_id: Optional[int] = None
+    quote_tweet_id: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -22,6 +27,8 @@ class TweetCreate(BaseModel):
 class TweetSchema(BaseModel):
     """
     Схема для отображения твита.
+    Для ретвита (is_retweet) и цитаты в repost_of передаётся оригинал,
+    author ретвита - тот, кто ретвитнул.
     """
 
     id: int
@@ -29,11 +36,23 @@ class TweetSchema(BaseModel):
     author: UserBaseSchema
     likes: List[LikeSchema] = Field(default_factory=list)
     attachments: List[str] = Field(default_factory=list)
+    parent_id: Optional[int] = None
+    is_retweet: bool = False
+    repost_of: Optional["TweetSchema"] = None
 
     class Config:
         from_attributes = True
 
 
+class ThreadTweetSchema(TweetSchema):
+    """
+    Схема для отображения твита в ветке беседы.
+    depth - глубина твита от начала беседы (у первого твита 0).
+    """
+
+    depth: int
+
+
 class SuccessTweetCreateResponse(BaseModel):
     """
     Схема для успешного ответа сервера после создания твита.
@@ -52,6 +71,37 @@ class SuccessMediaUploadResponse(BaseModel):
     media_id: int
 
 
+class MediaPresignRequest(BaseModel):
+    """
+    Схема запроса на прямую загрузку изображения в хранилище.
+    """
+
+    filename: str
+    content_type: str
+
+
+class MediaConfirmRequest(BaseModel):
+    """
+    Схема запроса на подтверждение прямой загрузки изображения.
+    upload_key - ключ из ответа /api/medias/presign.
+    """
+
+    upload_key: str
+
+
+class SuccessMediaPresignResponse(BaseModel):
+    """
+    Схема для успешного ответа сервера с подписанным URL для прямой загрузки.
+    После загрузки upload_key передаётся в /api/medias/confirm, который возвращает media_id.
+    """
+
+    result: bool
+    upload_key: str
+    upload_url: str
+    method: str
+    headers: Dict[str, str] = Field(default_factory=dict)
+
+
 class SuccessfullTweetGetResponse(BaseModel):
     """
     Схема для успешного ответа сервера после ленты твитов.
@@ -59,3 +109,56 @@ class SuccessfullTweetGetResponse(BaseModel):
 
     result: bool
     tweets: List[TweetSchema]
+
+
+class TweetPageResponse(BaseModel):
+    """
+    Схема для успешного ответа сервера со страницей твитов и курсором следующей страницы.
+    """
+
+    result: bool
+    tweets: List[TweetSchema]
+    next_cursor: Optional[str] = None
+
+
+class SuccessTweetResponse(BaseModel):
+    """
+    Схема для успешного ответа сервера с одним твитом.
+    """
+
+    result: bool
+    tweet: TweetSchema
+
+
+class ThreadResponse(BaseModel):
+    """
+    Схема для успешного ответа сервера с веткой беседы.
+    ancestors - цепочка твитов от начала беседы до запрошенного (только на первой странице),
+    tweets - запрошенный твит и ответы на него в порядке обхода дерева.
+    """
+
+    result: bool
+    root_id: int
+    ancestors: List[ThreadTweetSchema] = Field(default_factory=list)
+    tweets: List[ThreadTweetSchema]
+    next_cursor: Optional[str] = None
+
+
+class TrendingHashtagSchema(BaseModel):
+    """
+    Схема для отображения хэштега в топе.
+    """
+
+    tag: str
+    count: int
+
+
+class TrendingResponse(BaseModel):
+    """
+    Схема для успешного ответа сервера с топом хэштегов.
+    """
+
+    result: bool
+    window: Literal["hour", "day"]
+    hashtags: List[TrendingHashtagSchema]
+    updated_at: Optional[datetime] = None
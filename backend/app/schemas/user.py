@@ -32,3 +32,12 @@ class UserSuccessResponse(BaseModel):
 
     result: bool = Field(True)
     user: UserInfoSchema
+
+
+class UserSuggestionsResponse(BaseModel):
+    """
+    Схема для успешного ответа сервера с рекомендациями пользователей.
+    """
+
+    result: bool = Field(True)
+    users: List[UserBaseSchema]
@@ -1,3 +1,4 @@
+from typing import Optional
 from uuid import uuid4
 
 import pytest
@@ -7,14 +8,38 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_asyn
 from testcontainers.postgres import PostgresContainer
 
 from app.api.dependencies import get_db
+from app.core.config import settings
+from app.crud.memory import get_memory_store
 from app.db.database import Base
 from app.main import app
 from app.models.user import User
 
+# С REPOSITORY_BACKEND=memory тесты идут без Docker и Postgres:
+# тесты, которым нужна БД (фикстура db_session или метка postgres), пропускаются
+MEMORY_BACKEND = settings.REPOSITORY_BACKEND == "memory"
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "postgres: тест использует возможности, доступные только с Postgres"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if not MEMORY_BACKEND:
+        return
+    skip = pytest.mark.skip(reason="Requires Postgres (REPOSITORY_BACKEND=memory)")
+    for item in items:
+        if "postgres" in item.keywords:
+            item.add_marker(skip)
+
 
 @pytest.fixture(scope="session")
 def postgres_container():
     """Генератор, который запускает PostgreSQL в Docker контейнере."""
+    if MEMORY_BACKEND:
+        yield None
+        return
     with PostgresContainer(image="postgres:15", driver="asyncpg") as container:
         container.start()
         yield container
@@ -23,6 +48,8 @@ def postgres_container():
 @pytest.fixture(scope="session")
 def test_database_url(postgres_container):
     """Возвращает URL для подключения к тестовой БД."""
+    if postgres_container is None:
+        return None
     url = postgres_container.get_connection_url()
     print(f"\n\n{url}\n\n")
     return url
@@ -33,6 +60,9 @@ async def engine(test_database_url):
     """Создаёт и возвращает асинхронный engine базы данных для тестов."""
     import app.models
 
+    if test_database_url is None:
+        yield None
+        return
     engine = create_async_engine(test_database_url, future=True)
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
@@ -43,22 +73,36 @@ async def engine(test_database_url):
 @pytest_asyncio.fixture(scope="function")
 async def session_maker(engine):
     """Создаёт фабрику асинхронных сессий для тестовой БД."""
+    if engine is None:
+        return None
     return async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
 
 
 @pytest_asyncio.fixture
-async def db_session(session_maker):
-    """Предоставляет асинхронную сессию базы данных для теста."""
+async def session(session_maker):
+    """Сессия тестовой БД или None при REPOSITORY_BACKEND=memory."""
+    if session_maker is None:
+        yield None
+        return
     async with session_maker() as session:
         yield session
 
 
+@pytest_asyncio.fixture
+async def db_session(session):
+    """Предоставляет асинхронную сессию базы данных для теста."""
+    if session is None:
+        pytest.skip("Requires Postgres (REPOSITORY_BACKEND=memory)")
+    yield session
+
+
 @pytest_asyncio.fixture(autouse=True)
-async def override_db(db_session):
-    """Переопределяет зависимость get_db для тестов."""
+async def override_db(session):
+    """Переопределяет зависимость get_db для тестов.
+    Без Postgres сессия ни к чему не привязана и не открывает соединений."""
 
     async def _get_db():
-        yield db_session
+        yield session if session is not None else AsyncSession()
 
     app.dependency_overrides[get_db] = _get_db
     yield
@@ -72,21 +116,28 @@ async def client():
         yield client
 
 
+async def create_test_user(session, organization_id: Optional[int] = None) -> User:
+    """Создаёт пользователя в тестовой БД или в хранилище в памяти."""
+    api_key = f"test-{uuid4()}"
+    organization_id = organization_id or settings.DEFAULT_ORGANIZATION_ID
+    if session is None:
+        return get_memory_store().add_user(
+            name="Test", api_key=api_key, organization_id=organization_id
+        )
+    user = User(name="Test", api_key=api_key, organization_id=organization_id)
+    session.add(user)
+    await session.commit()
+    await session.refresh(user)
+    return user
+
+
 @pytest_asyncio.fixture
-async def test_user(db_session):
+async def test_user(session):
     """Создаёт и возвращает тестового пользователя в базе данных."""
-    user = User(name="Test", api_key=f"test-{uuid4()}")
-    db_session.add(user)
-    await db_session.commit()
-    await db_session.refresh(user)
-    return user
+    return await create_test_user(session)
 
 
 @pytest_asyncio.fixture
-async def test_another_user(db_session):
+async def test_another_user(session):
     """Создаёт и возвращает тестового пользователя в базе данных."""
-    user = User(name="Test", api_key=f"test-{uuid4()}")
-    db_session.add(user)
-    await db_session.commit()
-    await db_session.refresh(user)
-    return user
+    return await create_test_user(session)